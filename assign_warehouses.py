@@ -0,0 +1,40 @@
+# assign_warehouses.py
+"""
+Place orders in warehouses automatically and rebalance full warehouses.
+
+Usage:
+    python assign_warehouses.py                      # put New/Processing orders without a warehouse in the best one
+    python assign_warehouses.py --dry-run            # only count where they would go
+    python assign_warehouses.py --rebalance          # suggest transfers out of warehouses over 90% full
+    python assign_warehouses.py --rebalance --apply  # and carry them out
+"""
+import sys
+
+from database.db_connection import engine
+from database.migrations import run_migrations
+from services.warehouse_service import WarehouseService
+
+args = sys.argv[1:]
+
+# The occupancy counters are added by a migration
+run_migrations(engine)
+
+service = WarehouseService()
+if "--rebalance" not in args:
+    success, message, _ = service.auto_assign_orders(dry_run="--dry-run" in args)
+    print(message)
+    sys.exit(0 if success else 1)
+
+transfers = service.suggest_rebalancing()
+if not transfers:
+    print("Không có kho nào cần cân bằng.")
+    sys.exit(0)
+names = {warehouse.id: warehouse.name for warehouse in service.get_all_warehouses()}
+for transfer in transfers:
+    print(f"{names.get(transfer.from_warehouse_id)} → {names.get(transfer.to_warehouse_id)}: "
+          f"{len(transfer.order_ids)} đơn")
+if "--apply" in args:
+    success, message = service.apply_rebalancing(transfers)
+    print(message)
+    sys.exit(0 if success else 1)
+print("Chạy thêm --apply để chuyển kho.")
@@ -0,0 +1,87 @@
+# benchmarks/bench_batch_pricing.py
+"""
+Batch pricing benchmark: PricingEngine vs. one calculate_shipping_cost call per order.
+
+Usage:
+    python benchmarks/bench_batch_pricing.py [orders] [routes]
+
+Prices every seeded order with the scalar RouteService/TransportService
+calls and with PricingEngine, checks that both agree, then changes the route
+tariffs and times OrderService.reprice_orders over the whole database,
+checking that the repriced orders are stamped after the last batch was read.
+"""
+import sys
+from datetime import datetime
+
+import numpy as np
+
+from sqlalchemy import func, select
+
+from common import Timer, log, scratch_database, seed_routes, use_engine
+from models.order import Order
+from services.order_service import OrderService
+from services.pricing_engine import PricingEngine
+from services.route_service import RouteService
+from services.transport_service import TransportService
+
+DEFAULT_ORDERS = 1_000_000
+DEFAULT_ROUTES = 1122
+
+
+def main():
+    n_orders = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ORDERS
+    n_routes = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_ROUTES
+    engine = scratch_database(n_orders, "batch_pricing")
+    use_engine(engine)
+    seed_routes(engine, n_routes)
+    service = OrderService()
+    routes = RouteService()
+    transport = TransportService()
+
+    origins, dests, weights = map(list, zip(*service.iter_order_rows(
+        [Order.sender_province, Order.receiver_province, Order.weight], batch_size=50000
+    )))
+    log(f"Pricing {len(weights):,} orders against {n_routes:,} routes")
+
+    with Timer() as t:
+        scalar = [routes.calculate_shipping_cost(o, d, w) for o, d, w in zip(origins, dests, weights)]
+    log(f"calculate_shipping_cost loop  : {t.ms:>9.1f} ms  ({len(weights) / t.ms:>9,.0f} prices/ms)")
+    with Timer() as t:
+        pricing = PricingEngine()
+    log(f"PricingEngine build           : {t.ms:>9.1f} ms")
+    with Timer() as t:
+        batch = pricing.price(origins, dests, weights)
+    log(f"PricingEngine.price           : {t.ms:>9.1f} ms  ({len(weights) / t.ms:>9,.0f} prices/ms)")
+    assert np.allclose(batch, scalar), "batch and scalar route prices differ"
+    origin_codes, dest_codes, weight_array = pricing.encode(origins), pricing.encode(dests), np.array(weights)
+    with Timer() as t:
+        pricing.price_codes(origin_codes, dest_codes, weight_array)
+    log(f"PricingEngine.price_codes     : {t.ms:>9.1f} ms  ({len(weights) / t.ms:>9,.0f} prices/ms)")
+
+    with Timer() as t:
+        scalar = [transport.calculate_shipping_fee(w) for w in weights]
+    log(f"calculate_shipping_fee loop   : {t.ms:>9.1f} ms  ({len(weights) / t.ms:>9,.0f} prices/ms)")
+    with Timer() as t:
+        batch = transport.calculate_shipping_fees(weight_array)
+    log(f"calculate_shipping_fees       : {t.ms:>9.1f} ms  ({len(weights) / t.ms:>9,.0f} prices/ms)")
+    assert np.allclose(batch, scalar), "batch and scalar weight-table prices differ"
+
+    # New tariffs for every route, then reprice the whole book
+    seed_routes(engine, n_routes, seed=7)
+    started = datetime.now()
+    scanned = []
+    with Timer() as t:
+        _, message, _ = service.reprice_orders(progress=lambda done, total: scanned.append(datetime.now()))
+    log(f"reprice_orders (all orders)   : {t.ms:>9.1f} ms  ({message})")
+    updated_at = Order.__table__.c.updated_at
+    with engine.connect() as conn:
+        first_stamp = conn.execute(select(func.min(updated_at)).where(updated_at >= started)).scalar()
+    assert first_stamp is not None and first_stamp >= scanned[-1], "repriced orders stamped before commit"
+    with Timer() as t:
+        _, message, _ = service.reprice_orders()
+    log(f"reprice_orders (nothing to do): {t.ms:>9.1f} ms  ({message})")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
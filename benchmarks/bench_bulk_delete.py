@@ -0,0 +1,52 @@
+# benchmarks/bench_bulk_delete.py
+"""
+Bulk delete benchmark: delete_orders + restore_orders vs. the old per-order loop.
+
+Usage:
+    python benchmarks/bench_bulk_delete.py [orders_to_delete] [orders]
+
+Works on a copy of the seeded database. The old way is what
+delete_multiple_orders did (delete_order per ID, one commit each); the bulk
+call deletes a second batch in one transaction, then the undo path
+(restore_orders) re-inserts it with the original IDs.
+"""
+import sys
+
+from common import Timer, log, scratch_database, use_engine
+from services.order_service import OrderService
+
+DEFAULT_DELETES = 10_000
+DEFAULT_ORDERS = 100_000
+LEGACY_SAMPLE = 1000
+
+
+def main():
+    n_deletes = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_DELETES
+    n_orders = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_ORDERS
+    engine = scratch_database(n_orders, "bulk_delete")
+    use_engine(engine)
+    service = OrderService()
+
+    log(f"Deleting {n_deletes:,} orders ({n_orders:,}-order database)")
+
+    # The loop is slow; time a sample and extrapolate
+    sample = list(range(1, min(LEGACY_SAMPLE, n_deletes) + 1))
+    with Timer() as t:
+        for order_id in sample:
+            service.delete_order(order_id)
+    log(f"per-order loop : {t.ms * n_deletes / len(sample):>9.1f} ms (extrapolated from {len(sample):,})")
+
+    batch = list(range(n_orders - n_deletes + 1, n_orders + 1))
+    with Timer() as t:
+        _, message, snapshot = service.delete_orders(batch)
+    log(f"bulk delete    : {t.ms:>9.1f} ms  ({message})")
+
+    with Timer() as t:
+        _, message = service.restore_orders(snapshot)
+    log(f"bulk restore   : {t.ms:>9.1f} ms  ({message})")
+    log(f"{service.count_orders():,} orders after restore")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# benchmarks/bench_db_profile.py
+"""
+Database profile benchmark: write throughput with a concurrent reader.
+
+Usage:
+    python benchmarks/bench_db_profile.py [writes] [orders]
+
+For each profile in database.db_connection.DB_PROFILES it copies a seeded
+database, then commits `writes` single orders through OrderService.create_order
+(one transaction each, like the add-order dialog) while a reader thread keeps
+running the dashboard status summary.
+"""
+import sys
+import threading
+import time
+
+from common import Timer, log, scratch_database, seeded_database, use_engine
+from database.db_connection import DB_PROFILES
+from services.order_service import OrderService
+
+DEFAULT_WRITES = 2000
+DEFAULT_ORDERS = 100_000
+
+
+def reader_loop(stop, stats):
+    service = OrderService()
+    while not stop.is_set():
+        start = time.perf_counter()
+        service.get_status_summary()
+        elapsed = (time.perf_counter() - start) * 1000
+        stats['queries'] += 1
+        stats['worst_ms'] = max(stats['worst_ms'], elapsed)
+
+
+def run_profile(profile, n_writes, n_orders):
+    engine = scratch_database(n_orders, f"profile_{profile}", profile)
+    use_engine(engine)
+    service = OrderService()
+
+    stats = {'queries': 0, 'worst_ms': 0.0}
+    stop = threading.Event()
+    reader = threading.Thread(target=reader_loop, args=(stop, stats))
+    reader.start()
+
+    with Timer() as t:
+        for i in range(n_writes):
+            service.create_order({
+                "tracking_code": f"#BENCH{i:06d}",
+                "sender_name": "Nguyễn Văn Bench",
+                "sender_province": "Hà Nội",
+                "receiver_province": "Đà Nẵng",
+                "weight": 1.5,
+                "shipping_cost": 45000
+            })
+    stop.set()
+    reader.join()
+
+    mode = engine.connect().exec_driver_sql("PRAGMA journal_mode").scalar()
+    engine.dispose()
+    log(f"{profile:<12} | journal {mode:<6} | {n_writes / (t.ms / 1000):>8.0f} commits/s | "
+        f"reader {stats['queries'] / (t.ms / 1000):>6.1f} queries/s, worst {stats['worst_ms']:>7.1f} ms")
+
+
+def main():
+    n_writes = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_WRITES
+    n_orders = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_ORDERS
+    seeded_database(n_orders).dispose()
+
+    log(f"{n_writes:,} single-order commits on a {n_orders:,}-order database, with one concurrent reader")
+    for profile in DB_PROFILES:
+        run_profile(profile, n_writes, n_orders)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# benchmarks/bench_delivery_routes.py
+"""
+Last-mile routing benchmark: one warehouse's deliveries inside its province.
+
+Usage:
+    python benchmarks/bench_delivery_routes.py [stops] [province]
+
+Creates a warehouse and moves `stops` orders into it, addressed to random
+wards of its province. Times loading the stops, the sweep construction alone
+and the full local search, checks the plan against the capacity and shift
+limits and that a second run returns the identical plan.
+"""
+import random
+import sys
+
+from common import Timer, log, scratch_database, use_engine
+from services.delivery_routing import (DEFAULT_CAPACITY_KG, DEFAULT_SHIFT_HOURS, DeliveryRouter, WardMap)
+from services.dispatch_service import DispatchService
+from services.ward_service import WardService
+from services.warehouse_service import WarehouseService
+
+DEFAULT_STOPS = 5000
+DEFAULT_PROVINCE = "TP. Hồ Chí Minh"
+
+
+def seed_deliveries(engine, n_stops, province):
+    """A warehouse in the province holding n_stops orders, one per address, for its wards; returns its ID."""
+    WarehouseService().create_warehouse({'name': f"Kho {province}", 'province': province, 'capacity': n_stops})
+    wards = WardService().get_wards(province)
+    rng = random.Random(7)
+    with engine.begin() as conn:
+        warehouse_id = conn.exec_driver_sql("SELECT max(id) FROM warehouses").scalar()
+        conn.exec_driver_sql(
+            "UPDATE orders SET receiver_province = ?, receiver_ward = ?, receiver_address = ?, "
+            "current_warehouse_id = ?, status = 'Processing' WHERE id = ?",
+            [(province, rng.choice(wards), f"{order_id} Lê Lợi", warehouse_id, order_id)
+             for order_id in range(1, n_stops + 1)]
+        )
+    return warehouse_id
+
+
+def main():
+    n_stops = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_STOPS
+    province = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_PROVINCE
+    engine = scratch_database(max(n_stops, 20000), "delivery_routes")
+    use_engine(engine)
+    warehouse_id = seed_deliveries(engine, n_stops, province)
+    service = DispatchService()
+
+    with Timer() as t:
+        _, stops = service.load_deliveries(warehouse_id)
+    log(f"load {len(stops):,} stops ({len(WardService().get_wards(province))} wards) : {t.ms:>8.1f} ms")
+    with Timer() as t:
+        sweep = DeliveryRouter(WardMap(WardService().get_wards(province))).solve(stops, improve=False)
+    log(f"sweep construction          : {t.ms:>8.1f} ms  {len(sweep.routes)} routes, {sweep.distance_km:,.1f} km")
+    with Timer() as t:
+        plan = service.plan_deliveries(warehouse_id)
+    log(f"sweep + local search        : {t.ms:>8.1f} ms  {len(plan.routes)} routes, {plan.distance_km:,.1f} km "
+        f"({1 - plan.distance_km / sweep.distance_km:.1%} shorter)")
+
+    served = [stop for route in plan.routes for stop in route.stops]
+    assert sorted(served + plan.unassigned) == sorted(stops), "stops lost"
+    assert all(route.load_kg <= DEFAULT_CAPACITY_KG and route.hours <= DEFAULT_SHIFT_HOURS for route in plan.routes)
+    assert service.plan_deliveries(warehouse_id) == plan, "plan is not deterministic"
+    log(f"per driver: up to {max(r.hours for r in plan.routes):.2f} h, {max(r.load_kg for r in plan.routes):.1f} kg, "
+        f"{max(len(r.stops) for r in plan.routes)} stops; {len(plan.unassigned)} unassigned")
+
+    with Timer() as t:
+        capped = service.plan_deliveries(warehouse_id, max_drivers=len(plan.routes) // 2)
+    log(f"with {len(plan.routes) // 2} drivers             : {t.ms:>8.1f} ms  {len(capped.routes)} routes, "
+        f"{sum(len(r.stops) for r in capped.routes):,} stops served, {len(capped.unassigned):,} left")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# benchmarks/bench_dispatch.py
+"""
+Dispatch planner benchmark: vehicle loads for every pending order.
+
+Usage:
+    python benchmarks/bench_dispatch.py [orders]
+
+Seeds routes and one warehouse per province, makes every other order pending
+('Processing') and stores half of those in the warehouse of their sender
+province, then
+times loading the pending orders, packing them into vehicle loads and
+dispatching every load to 'Shipping' in one transaction.
+"""
+import sys
+
+from common import Timer, log, scratch_database, seed_routes, use_engine
+from services.dispatch_service import DISPATCH_STATUSES, DispatchService
+from services.ward_service import WardService
+from services.warehouse_service import WarehouseService
+
+DEFAULT_ORDERS = 200_000  # half of them pending
+
+
+def seed_pending(engine):
+    """Every other order pending; one warehouse per province holding half of them."""
+    service = WarehouseService()
+    for province in WardService().get_provinces():
+        service.create_warehouse({'name': f"Kho {province}", 'province': province, 'capacity': 100_000})
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "UPDATE orders SET status = CASE WHEN id % 2 = 0 THEN ? ELSE 'Delivered' END",
+            (DISPATCH_STATUSES[-1],)
+        )
+        conn.exec_driver_sql(
+            "UPDATE orders SET current_warehouse_id = "
+            "(SELECT id FROM warehouses WHERE province = orders.sender_province) WHERE id % 4 = 0"
+        )
+
+
+def main():
+    n_orders = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ORDERS
+    engine = scratch_database(n_orders, "dispatch")
+    use_engine(engine)
+    seed_routes(engine, 1122)
+    seed_pending(engine)
+    service = DispatchService()
+
+    with Timer() as t_load:
+        orders = service.load_pending_orders()
+    log(f"load {len(orders):,} pending orders : {t_load.ms:>8.1f} ms")
+    with Timer() as t_plan:
+        manifests = service.plan_dispatch(orders=orders)
+    log(f"pack into {len(manifests):,} loads    : {t_plan.ms:>8.1f} ms")
+
+    assert sorted(i for m in manifests for i in m.order_ids) == sorted(o[0] for o in orders), "orders lost"
+    assert all(not m.oversized for m in manifests if len(m.order_ids) > 1), "overloaded vehicle"
+    item_types = {o[0]: o[4] for o in orders}
+    assert all(len({item_types[i] for i in m.order_ids}) == 1 for m in manifests), "item types mixed"
+    full = [m for m in manifests if len(m.order_ids) > 1]
+    log(f"utilization: weight {sum(m.weight_utilization for m in full) / max(len(full), 1):.0%}, "
+        f"volume {sum(m.volume_utilization for m in full) / max(len(full), 1):.0%} "
+        f"(mean over {len(full):,} multi-order loads), "
+        f"{sum(m.oversized for m in manifests):,} oversized single orders")
+
+    with Timer() as t:
+        success, message = service.dispatch(manifests, changed_by="bench")
+    log(f"dispatch all loads           : {t.ms:>8.1f} ms  ({message})")
+    assert success, message
+    assert not service.load_pending_orders(), "orders left pending"
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
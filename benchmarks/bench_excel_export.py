@@ -0,0 +1,79 @@
+# benchmarks/bench_excel_export.py
+"""
+Excel export benchmark: streaming ReportService.export_to_excel vs. the old pandas export.
+
+Usage:
+    python benchmarks/bench_excel_export.py [--legacy] [sizes...]
+
+Each size runs in a fresh subprocess so the peak RSS figures don't leak into each other.
+The legacy mode exports the way ReportService used to (a list of dicts, then a
+pandas DataFrame, then DataFrame.to_excel); it needs pandas installed.
+"""
+import os
+import subprocess
+import sys
+import tempfile
+
+from common import Timer, log, peak_rss_mb, seeded_database, use_engine
+
+DEFAULT_SIZES = [100_000, 1_000_000]
+
+
+def run_streaming(file_path):
+    from services.report_service import ReportService
+
+    success, message = ReportService().export_to_excel(file_path)
+    if not success:
+        raise RuntimeError(message)
+
+
+def run_legacy(file_path):
+    import pandas as pd
+    from services.order_service import OrderService
+
+    data = []
+    for order in OrderService().iter_orders():
+        data.append({
+            "ID": order.id,
+            "Tracking Code": order.tracking_code,
+            "Sender": order.sender_name,
+            "Receiver": order.receiver_name,
+            "Phone": order.receiver_phone,
+            "Address": order.receiver_address,
+            "Weight (kg)": order.weight,
+            "Cost (VND)": order.shipping_cost,
+            "Status": order.status,
+            "Created At": order.created_at
+        })
+    pd.DataFrame(data).to_excel(file_path, index=False)
+
+
+def run_one(n_orders, legacy):
+    use_engine(seeded_database(n_orders))
+    file_path = os.path.join(tempfile.gettempdir(), "pbl3_bench_export.xlsx")
+    base_rss = peak_rss_mb()
+    with Timer() as t:
+        (run_legacy if legacy else run_streaming)(file_path)
+    mode = "legacy" if legacy else "stream"
+    log(f"{mode:>6} | {n_orders:>9,} orders | export {t.ms / 1000:>7.1f} s | "
+        f"peak RSS {peak_rss_mb():>7.1f} MB (+{peak_rss_mb() - base_rss:.1f} MB) | "
+        f"file {os.path.getsize(file_path) / 1024 / 1024:.1f} MB")
+
+
+def main():
+    args = sys.argv[1:]
+    if args and args[0] == "--one":
+        run_one(int(args[1]), legacy=len(args) > 2 and args[2] == "legacy")
+        return
+
+    legacy = "--legacy" in args
+    sizes = [int(a) for a in args if a.isdigit()] or DEFAULT_SIZES
+    for n_orders in sizes:
+        # Seed in the parent so the child only measures the export
+        seeded_database(n_orders).dispose()
+        cmd = [sys.executable, __file__, "--one", str(n_orders)] + (["legacy"] if legacy else [])
+        subprocess.run(cmd, check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# benchmarks/bench_order_cache.py
+"""
+Order lookup cache benchmark: get_order_by_id with and without order_cache.
+
+Usage:
+    python benchmarks/bench_order_cache.py [actions] [orders]
+
+Replays user actions on a copy of the seeded database. Each action opens an
+order (80% of them one of the 200 most recently worked on) and looks it up
+twice, as the edit/delete handlers do; every tenth action also changes its
+status, which invalidates the entry. Reports time per lookup and the cache's
+hit rate.
+"""
+import random
+import sys
+
+from common import Timer, log, scratch_database, use_engine
+from services.order_cache import order_cache
+from services.order_service import OrderService
+
+DEFAULT_ACTIONS = 20_000
+DEFAULT_ORDERS = 100_000
+HOT_ORDERS = 200
+
+
+def actions(n_actions, n_orders):
+    rng = random.Random(3)
+    hot = rng.sample(range(1, n_orders + 1), HOT_ORDERS)
+    for i in range(n_actions):
+        order_id = rng.choice(hot) if rng.random() < 0.8 else rng.randint(1, n_orders)
+        yield order_id, i % 10 == 0
+
+
+def run(service, n_actions, n_orders, cached):
+    order_cache.clear()
+    lookups = 0
+    with Timer() as t:
+        for order_id, write in actions(n_actions, n_orders):
+            for _ in range(2):
+                if not cached:
+                    order_cache.clear()
+                service.get_order_by_id(order_id)
+                lookups += 1
+            if write:
+                service.update_order_status(order_id, "Processing" if order_id % 2 else "New")
+    return t.ms, lookups
+
+
+def main():
+    n_actions = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ACTIONS
+    n_orders = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_ORDERS
+    engine = scratch_database(n_orders, "order_cache")
+    use_engine(engine)
+    service = OrderService()
+
+    log(f"{n_actions:,} actions ({n_orders:,}-order database)")
+    for label, cached in (("no cache", False), ("order_cache", True)):
+        before = order_cache.stats()
+        ms, lookups = run(service, n_actions, n_orders, cached)
+        after = order_cache.stats()
+        hits, misses = after['hits'] - before['hits'], after['misses'] - before['misses']
+        log(f"{label:<12}: {ms:>9.1f} ms  ({ms * 1000 / n_actions:>6.0f} us per action, "
+            f"{hits / (hits + misses):.0%} of {lookups:,} lookups hit)")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+# benchmarks/bench_order_import.py
+"""
+Bulk import benchmark: ImportService.import_file vs. create_order per row.
+
+Usage:
+    python benchmarks/bench_order_import.py [rows] [orders]
+
+Writes a manifest CSV of generated orders (1% of rows deliberately invalid,
+plus duplicates of existing tracking codes), then imports it into a copy of
+the seeded database. A second pass stops after the first chunk and resumes,
+to time the checkpoint path. Finally checks that non-finite numbers (nan, inf,
+1e400), ambiguous separators and fractional package counts are rejected into
+the error report rather than imported, that "2,5" kg imports as 2.5, and that an
+import dying between a chunk's commit and its checkpoint resumes without
+reporting that chunk's orders as duplicates.
+"""
+import csv
+import os
+import sys
+import tempfile
+
+from common import ORDER_COLUMNS, Timer, _order_rows, log, scratch_database, seed_routes, use_engine
+from services.import_service import ImportService
+from services.order_service import OrderService
+
+NON_FINITE = ["nan", "inf", "-nan", "1e400"]
+DEFAULT_ROWS = 50_000
+DEFAULT_ORDERS = 100_000
+LEGACY_SAMPLE = 1000
+MANIFEST_COLUMNS = [c for c in ORDER_COLUMNS if c not in ('order_type', 'has_cod', 'status', 'created_at', 'updated_at')]
+
+
+def write_manifest(path, n_rows, prefix):
+    """Write n_rows orders to a CSV manifest; every 100th row is broken or a duplicate."""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(MANIFEST_COLUMNS)
+        for i, row in enumerate(_order_rows(n_rows, seed=7)):
+            values = dict(zip(ORDER_COLUMNS, row))
+            values['tracking_code'] = f"#{prefix}{i + 1:07d}"
+            values['shipping_cost'] = ""  # priced by the importer
+            if i % 300 == 1:
+                values['sender_province'] = "Tỉnh không tồn tại"
+            elif i % 300 == 101:
+                values['weight'] = "nặng"
+            elif i % 300 == 201:
+                values['tracking_code'] = f"#DH{i + 1:07d}"  # already in the database
+            writer.writerow([values[c] for c in MANIFEST_COLUMNS])
+
+
+def check_non_finite(path):
+    """One row per non-finite weight and shipping cost, plus one valid row: only the valid row is imported."""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(MANIFEST_COLUMNS)
+        rows = _order_rows(2 * len(NON_FINITE) + 1, seed=13)
+        for i, row in enumerate(rows):
+            values = dict(zip(ORDER_COLUMNS, row))
+            values['tracking_code'] = f"#NF{i + 1:07d}"
+            values['shipping_cost'] = ""
+            if i < 2 * len(NON_FINITE):
+                values['weight' if i % 2 == 0 else 'shipping_cost'] = NON_FINITE[i // 2]
+            writer.writerow([values[c] for c in MANIFEST_COLUMNS])
+    _, message, summary = ImportService().import_file(path, restart=True)
+    assert summary['imported'] == 1 and summary['failed'] == 2 * len(NON_FINITE), message
+    with open(summary['error_report'], newline="", encoding="utf-8-sig") as f:
+        rejected = {int(row['row']) for row in csv.DictReader(f) if "hữu hạn" in row['error']}
+    assert rejected == set(range(1, 2 * len(NON_FINITE) + 1)), f"non-finite rows not reported: {rejected}"
+    log(f"non-finite numbers: rejected ({message})")
+
+
+def check_number_formats(path):
+    """A decimal comma is read as one; an ambiguous separator or a fractional package count is reported."""
+    cells = [("weight", "2,5"), ("weight", "1,250"), ("weight", "1.234,5"), ("package_count", "2.7")]
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(MANIFEST_COLUMNS)
+        for i, row in enumerate(_order_rows(len(cells), seed=17)):
+            values = dict(zip(ORDER_COLUMNS, row))
+            values['tracking_code'] = f"#NUM{i + 1:07d}"
+            values['shipping_cost'] = ""
+            field, text = cells[i]
+            values[field] = text
+            writer.writerow([values[c] for c in MANIFEST_COLUMNS])
+    _, message, summary = ImportService().import_file(path, restart=True)
+    assert (summary['imported'], summary['failed']) == (1, len(cells) - 1), message
+    with open(summary['error_report'], newline="", encoding="utf-8-sig") as f:
+        rejected = [int(row['row']) for row in csv.DictReader(f)]
+    assert rejected == list(range(2, len(cells) + 1)), f"number format rows not reported: {rejected}"
+    weight = OrderService().search_orders("#NUM0000001")[0].weight
+    assert weight == 2.5, f"'2,5' kg imported as {weight}"
+    log(f"number formats    : checked ({message})")
+
+
+def check_crash_after_commit(path):
+    """Fail the error report write of the second chunk, then resume: every row is counted once."""
+    write_manifest(path, 300, "CR")
+    crashing = ImportService()
+    crashing.CHUNK_SIZE = 100
+    calls = []
+    append_errors = crashing._append_errors
+
+    def fail_second(error_path, errors):
+        calls.append(len(errors))
+        if len(calls) == 2:
+            raise OSError("disk full")
+        append_errors(error_path, errors)
+
+    crashing._append_errors = fail_second
+    success, message, _ = crashing.import_file(path, restart=True)
+    assert not success, message
+    resumed = ImportService()
+    resumed.CHUNK_SIZE = 100
+    _, message, summary = resumed.import_file(path)
+    assert (summary['imported'], summary['failed']) == (297, 3), message
+    with open(summary['error_report'], newline="", encoding="utf-8-sig") as f:
+        reported = [int(row['row']) for row in csv.DictReader(f)]
+    assert reported == [2, 102, 202], f"error report after resume: {reported}"
+    log(f"crash after commit: resumed ({message})")
+
+
+def legacy_import(service, path, limit):
+    """The only way before ImportService: one create_order call (and commit) per row."""
+    with open(path, newline="", encoding="utf-8") as f:
+        for i, values in enumerate(csv.DictReader(f)):
+            if i >= limit:
+                break
+            values['tracking_code'] = "#LEG" + values['tracking_code'][1:]
+            values['shipping_cost'] = 0.0
+            service.create_order(values)
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS
+    n_orders = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_ORDERS
+    engine = scratch_database(n_orders, "order_import")
+    use_engine(engine)
+    seed_routes(engine, 1122)
+
+    manifest = os.path.join(tempfile.gettempdir(), "pbl3_bench_import.csv")
+    resume_manifest = os.path.join(tempfile.gettempdir(), "pbl3_bench_import_resume.csv")
+    non_finite_manifest = os.path.join(tempfile.gettempdir(), "pbl3_bench_import_non_finite.csv")
+    crash_manifest = os.path.join(tempfile.gettempdir(), "pbl3_bench_import_crash.csv")
+    formats_manifest = os.path.join(tempfile.gettempdir(), "pbl3_bench_import_formats.csv")
+    for path in (manifest, resume_manifest, non_finite_manifest, crash_manifest, formats_manifest):
+        for suffix in (".import.json", ".errors.csv"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+    write_manifest(manifest, n_rows, "IM")
+    write_manifest(resume_manifest, n_rows, "RS")
+    log(f"Importing {n_rows:,} rows ({n_orders:,}-order database)")
+
+    with Timer() as t:
+        legacy_import(OrderService(), manifest, LEGACY_SAMPLE)
+    log(f"create_order loop : {t.ms * n_rows / LEGACY_SAMPLE:>9.1f} ms (extrapolated from {LEGACY_SAMPLE:,})")
+
+    with Timer() as t:
+        _, message, summary = ImportService().import_file(manifest)
+    log(f"import_file       : {t.ms:>9.1f} ms  ({message}, {n_rows / t.ms * 1000:,.0f} rows/s)")
+
+    # Interrupt after the first chunk, then resume from the checkpoint
+    chunks = []
+    with Timer() as t:
+        _, message, summary = ImportService().import_file(
+            resume_manifest, progress=lambda done, total: chunks.append(done), is_cancelled=lambda: bool(chunks)
+        )
+    log(f"interrupted       : {t.ms:>9.1f} ms  ({message})")
+    with Timer() as t:
+        _, message, summary = ImportService().import_file(resume_manifest)
+    log(f"resumed           : {t.ms:>9.1f} ms  ({message}, from row {summary['resumed_from']:,})")
+    log(f"{OrderService().count_orders():,} orders after import, error report: {summary['error_report']}")
+    check_non_finite(non_finite_manifest)
+    check_number_formats(formats_manifest)
+    check_crash_after_commit(crash_manifest)
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# benchmarks/bench_order_search.py
+"""
+Order search benchmark: FTS5 index vs. the old ILIKE '%q%' scan.
+
+Usage:
+    python benchmarks/bench_order_search.py [sizes...]
+
+For each query it times what the orders tab does per keystroke (count + first
+page of the filter bar search) and a full search_orders() call.
+"""
+import sys
+
+from common import Timer, log, seeded_database, use_engine
+from database import order_search
+from services.order_service import OrderService
+
+DEFAULT_SIZES = [1_000_000]
+QUERIES = ["Nguyen", "Đặng Văn", "Hương", "#DH00012", "0905", "Phúc Quân"]
+
+
+def time_queries(service, query):
+    with Timer() as filter_timer:
+        service.count_orders(search_query=query)
+        service.get_order_rows(limit=200, search_query=query)
+    with Timer() as search_timer:
+        found = len(service.search_orders(query))
+    return filter_timer.ms, search_timer.ms, found
+
+
+def run(n_orders):
+    engine = seeded_database(n_orders)
+    use_engine(engine)
+    service = OrderService()
+    url = str(engine.url)
+
+    log(f"\n{n_orders:,} orders")
+    log(f"{'query':<12} | {'mode':<4} | {'filter bar':>11} | {'search_orders':>13} | {'hits':>7}")
+    for query in QUERIES:
+        for mode, fts in (("like", False), ("fts", True)):
+            # Force the search path by overriding the cached availability check
+            order_search._availability[url] = fts
+            filter_ms, search_ms, found = time_queries(service, query)
+            log(f"{query:<12} | {mode:<4} | {filter_ms:>8.1f} ms | {search_ms:>10.1f} ms | {found:>7,}")
+    order_search._availability.pop(url, None)
+
+
+def main():
+    sizes = [int(a) for a in sys.argv[1:]] or DEFAULT_SIZES
+    for n_orders in sizes:
+        run(n_orders)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# benchmarks/bench_order_table.py
+"""
+Order table refresh benchmark: lazy OrderTableModel vs. the old QTableWidget fill.
+
+Usage:
+    python benchmarks/bench_order_table.py [--legacy] [sizes...]
+
+Each size runs in a fresh subprocess so the peak RSS figures don't leak into each other.
+The legacy mode rebuilds the table the way MainController._update_table used to
+(get_all_orders + seven QTableWidgetItems per row).
+"""
+import os
+import subprocess
+import sys
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from common import Timer, log, peak_rss_mb, seeded_database, use_engine  # noqa: E402
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+
+
+def run_lazy(n_orders):
+    from PyQt6.QtWidgets import QApplication, QTableView
+    from services.order_service import OrderService
+    from ui.order_table_model import OrderTableModel
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    service = OrderService()
+    view = QTableView()
+    model = OrderTableModel(service)
+    view.setModel(model)
+    view.resize(1200, 700)
+    view.show()
+
+    with Timer() as t:
+        summary = service.get_status_summary()
+        model.set_filters({}, total=sum(count for count, _ in summary.values()))
+        app.processEvents()
+    return t.ms, model.rowCount()
+
+
+def run_legacy(n_orders):
+    from PyQt6.QtCore import Qt
+    from PyQt6.QtWidgets import QApplication, QTableWidget, QTableWidgetItem
+    from services.order_service import OrderService
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    service = OrderService()
+    table = QTableWidget()
+    table.setColumnCount(7)
+    table.resize(1200, 700)
+    table.show()
+
+    with Timer() as t:
+        orders = service.get_all_orders()
+        table.setRowCount(0)
+        for row_idx, order in enumerate(orders):
+            table.insertRow(row_idx)
+            item = QTableWidgetItem(order.tracking_code)
+            item.setData(Qt.ItemDataRole.UserRole, order.id)
+            table.setItem(row_idx, 0, item)
+            table.setItem(row_idx, 1, QTableWidgetItem(order.status))
+            table.setItem(row_idx, 2, QTableWidgetItem(f"{order.sender_name} → {order.receiver_name}"))
+            table.setItem(row_idx, 3, QTableWidgetItem(order.get_route_summary()))
+            table.setItem(row_idx, 4, QTableWidgetItem(order.get_package_summary()))
+            table.setItem(row_idx, 5, QTableWidgetItem(f"{order.get_total_cost():,.0f} VND"))
+            table.setItem(row_idx, 6, QTableWidgetItem(order.created_at.strftime("%d/%m/%Y %H:%M")))
+        app.processEvents()
+    return t.ms, table.rowCount()
+
+
+def run_one(n_orders, legacy):
+    use_engine(seeded_database(n_orders))
+    elapsed, rows = run_legacy(n_orders) if legacy else run_lazy(n_orders)
+    mode = "legacy" if legacy else "lazy"
+    log(f"{mode:>6} | {n_orders:>9,} orders | refresh {elapsed:>10.1f} ms | "
+        f"rows built {rows:>9,} | peak RSS {peak_rss_mb():>7.1f} MB")
+
+
+def main():
+    args = sys.argv[1:]
+    if args and args[0] == "--one":
+        run_one(int(args[1]), legacy=len(args) > 2 and args[2] == "legacy")
+        return
+
+    legacy = "--legacy" in args
+    sizes = [int(a) for a in args if a.isdigit()] or DEFAULT_SIZES
+    for n_orders in sizes:
+        # Seed in the parent so the child only measures the refresh
+        seeded_database(n_orders)
+        cmd = [sys.executable, __file__, "--one", str(n_orders)] + (["legacy"] if legacy else [])
+        subprocess.run(cmd, check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# benchmarks/bench_route_matrix.py
+"""
+Route matrix benchmark: persisted province x province matrix vs. rebuilding or querying.
+
+Usage:
+    python benchmarks/bench_route_matrix.py [routes] [lookups]
+
+Seeds the routes, then times:
+- the first start (planner + matrix build, saved next to the database),
+- later starts (signature check + memory-mapped load of the saved file),
+- route_estimate lookups vs. a find_route query per lookup,
+- the rebuild after a route price changes.
+Then checks that a .npy replaced without its .json (a crash inside save) is
+not loaded under the newer signature.
+"""
+import os
+import random
+import sys
+
+import numpy as np
+
+from common import Timer, log, scratch_database, seed_routes, use_engine
+from services.route_matrix import RouteMatrix
+from services.route_service import RouteService
+
+DEFAULT_ROUTES = 1122
+DEFAULT_LOOKUPS = 100_000
+QUERY_SAMPLE = 2000
+
+
+def cold_start():
+    """What every start cost before: load the routes and build the matrix."""
+    RouteService.invalidate_pricing_index()
+    return RouteService.route_matrix()
+
+
+def main():
+    n_routes = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROUTES
+    n_lookups = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_LOOKUPS
+    engine = scratch_database(1000, "route_matrix")
+    use_engine(engine)
+    seed_routes(engine, n_routes)
+    service = RouteService()
+    stem = service._matrix_stem()
+    for path in RouteMatrix.paths(stem):
+        if os.path.exists(path):
+            os.remove(path)
+
+    with Timer() as t:
+        matrix = cold_start()
+    size_kb = os.path.getsize(RouteMatrix.paths(stem)[0]) / 1024
+    log(f"first start (build + save)  : {t.ms:>8.1f} ms  ({len(matrix.provinces)} provinces, {size_kb:.0f} KB .npy)")
+    with Timer() as t:
+        matrix = cold_start()
+    log(f"next start (mmap load)      : {t.ms:>8.1f} ms  (file-backed: {matrix.data.base is not None})")
+
+    rng = random.Random(9)
+    pairs = [(rng.choice(matrix.provinces), rng.choice(matrix.provinces)) for _ in range(n_lookups)]
+    with Timer() as t:
+        for origin, dest in pairs:
+            service.route_estimate(origin, dest)
+    log(f"route_estimate              : {t.ms * 1000 / n_lookups:>8.2f} us per lookup")
+    with Timer() as t:
+        for origin, dest in pairs[:QUERY_SAMPLE]:
+            service.find_route(origin, dest)
+    log(f"find_route query            : {t.ms * 1000 / QUERY_SAMPLE:>8.2f} us per lookup")
+
+    route = service.get_all_routes()[0]
+    with Timer() as t:
+        service.update_route(route.id, {'base_price': (route.base_price or 0) + 5000})
+        service.route_matrix()
+    log(f"route price change + rebuild: {t.ms:>8.1f} ms")
+
+    rebuilt = service.route_matrix()
+    assert RouteMatrix.load(stem, rebuilt.signature) is not None, "saved matrix not loaded"
+    np.save(RouteMatrix.paths(stem)[0], np.ascontiguousarray(matrix.data))  # the older array, current .json
+    assert RouteMatrix.load(stem, rebuilt.signature) is None, "mismatched .npy/.json pair loaded"
+    log("half-written matrix         : rejected")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
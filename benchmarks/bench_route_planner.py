@@ -0,0 +1,80 @@
+# benchmarks/bench_route_planner.py
+"""
+Route planner benchmark: all-pairs multi-hop routing over the route graph.
+
+Usage:
+    python benchmarks/bench_route_planner.py [routes_left] [updates]
+
+Seeds a route between every pair of provinces, then deletes random routes
+through RouteService.delete_route until routes_left remain, so most province
+pairs need a multi-hop route. Times building the planner, path lookups for
+every pair and metric, and the incremental refresh after route updates
+(compared with rebuilding the planner from scratch).
+"""
+import random
+import sys
+
+from common import Timer, log, scratch_database, seed_routes, use_engine
+from services.route_planner import METRICS, RoutePlanner
+from services.route_service import RouteService
+
+DEFAULT_ROUTES_LEFT = 150
+DEFAULT_UPDATES = 200
+
+
+def main():
+    routes_left = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROUTES_LEFT
+    n_updates = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_UPDATES
+    engine = scratch_database(1000, "route_planner")
+    use_engine(engine)
+    seed_routes(engine, 1122)
+    service = RouteService()
+    rng = random.Random(5)
+
+    with Timer() as t:
+        planner = service.route_planner()
+    log(f"build, {len(service.pricing_index()):,} routes : {t.ms:>8.1f} ms")
+
+    routes = service.get_all_routes()
+    rng.shuffle(routes)
+    for route in routes[routes_left:]:
+        service.delete_route(route.id)
+    planner = service.route_planner()
+    provinces = planner.provinces
+    with Timer() as t:
+        RoutePlanner(service.pricing_index())
+    full_ms = t.ms
+    log(f"build, {len(service.pricing_index()):,} routes  : {full_ms:>8.1f} ms")
+
+    pairs = [(o, d) for o in provinces for d in provinces if o != d]
+    for metric in METRICS:
+        with Timer() as t:
+            planned = [planner.path(o, d, metric) for o, d in pairs]
+        reachable = [p for p in planned if p]
+        with Timer() as t_memo:
+            for o, d in pairs:
+                planner.path(o, d, metric)
+        log(f"{metric:<8} {len(pairs):,} pairs: {t.ms * 1000 / len(pairs):>6.1f} us/path first, "
+            f"{t_memo.ms * 1000 / len(pairs):>5.2f} us/path memoized | {len(reachable):,} reachable, "
+            f"{sum(p.hops > 1 for p in reachable):,} multi-hop, up to {max(p.hops for p in reachable)} hops")
+
+    # Price changes on random remaining routes: incremental refresh vs full rebuild
+    routes = service.get_all_routes()
+    with Timer() as t:
+        for _ in range(n_updates):
+            route = rng.choice(routes)
+            service.update_route(route.id, {'base_price': rng.randint(2, 6) * 10000,
+                                            'est_hours': round(rng.uniform(1, 30), 1)})
+    log(f"update_route incl. refresh: {t.ms / n_updates:>8.2f} ms per update "
+        f"(a full planner rebuild alone takes {full_ms:.1f} ms)")
+    # Ties may pick different paths, so compare path lengths
+    refreshed = RoutePlanner(service.pricing_index())
+    assert all(
+        abs(refreshed.trees[metric][o][0].get(d, -1) - planner.trees[metric][o][0].get(d, -1)) < 1e-6
+        for o, d in pairs for metric in METRICS
+    ), "incremental refresh diverged from a full rebuild"
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# benchmarks/bench_route_pricing.py
+"""
+Shipping cost benchmark: pricing index vs. a find_route query per price.
+
+Usage:
+    python benchmarks/bench_route_pricing.py [prices] [routes]
+
+Prices the (sender province, receiver province, weight) of seeded orders,
+the way the order dialogs recalculate the cost on every province or weight
+change: first with the old find_route query each time, then through
+RouteService.calculate_shipping_cost and its in-memory pricing index.
+"""
+import sys
+
+from common import Timer, log, scratch_database, seed_routes, use_engine
+from services.order_service import OrderService
+from services.route_service import RouteService
+
+DEFAULT_PRICES = 100_000
+DEFAULT_ROUTES = 1122
+LEGACY_SAMPLE = 2000
+
+
+def legacy_cost(service, origin, dest, weight):
+    """What auto_calculate_cost did before the pricing index."""
+    route = service.find_route(origin, dest)
+    if route:
+        return route.calculate_shipping_cost(weight)
+    return weight * 10000
+
+
+def main():
+    n_prices = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PRICES
+    n_routes = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_ROUTES
+    engine = scratch_database(n_prices, "route_pricing")
+    use_engine(engine)
+    seed_routes(engine, n_routes)
+    service = RouteService()
+    orders = list(OrderService().iter_order_rows(
+        [OrderService.TABLE_COLUMNS[5], OrderService.TABLE_COLUMNS[6], OrderService.TABLE_COLUMNS[8]]
+    ))[:n_prices]
+
+    log(f"Pricing {len(orders):,} orders against {n_routes:,} routes")
+    sample = orders[:LEGACY_SAMPLE]
+    with Timer() as t:
+        legacy = [legacy_cost(service, origin, dest, weight) for origin, dest, weight in sample]
+    log(f"find_route per price : {t.ms * len(orders) / len(sample):>9.1f} ms "
+        f"(extrapolated from {len(sample):,}, {len(sample) / t.ms:,.1f} prices/ms)")
+
+    with Timer() as t:
+        RouteService.pricing_index()
+    log(f"index load           : {t.ms:>9.1f} ms")
+
+    with Timer() as t:
+        costs = [service.calculate_shipping_cost(origin, dest, weight) for origin, dest, weight in orders]
+    log(f"pricing index        : {t.ms:>9.1f} ms  ({len(orders) / t.ms:,.0f} prices/ms)")
+    assert costs[:len(legacy)] == legacy, "pricing index disagrees with find_route"
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
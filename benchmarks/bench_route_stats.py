@@ -0,0 +1,67 @@
+# benchmarks/bench_route_stats.py
+"""
+Route statistics benchmark: one grouped join vs. the old per-route COUNT loop.
+
+Usage:
+    python benchmarks/bench_route_stats.py [routes] [orders]
+
+The benchmark database's routes table is replaced with `routes` generated
+routes (see common.seed_routes) before timing RouteService.get_route_stats.
+"""
+import sys
+
+from sqlalchemy import and_
+
+from common import Timer, log, seed_routes, seeded_database, use_engine
+from database.db_connection import SessionLocal
+from models.order import Order
+from models.route import Route
+from services.route_service import RouteService
+
+DEFAULT_ROUTES = 3000
+DEFAULT_ORDERS = 1_000_000
+
+
+def legacy_route_stats():
+    """RouteService.get_route_stats before the grouped query: one COUNT per route."""
+    session = SessionLocal()
+    try:
+        stats = []
+        for route in session.query(Route).all():
+            order_count = session.query(Order).filter(
+                and_(
+                    Order.sender_province == route.origin_province,
+                    Order.receiver_province == route.dest_province
+                )
+            ).count()
+            stats.append({'route': route, 'order_count': order_count})
+        stats.sort(key=lambda x: x['order_count'], reverse=True)
+        return stats
+    finally:
+        session.close()
+
+
+def main():
+    n_routes = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROUTES
+    n_orders = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_ORDERS
+    engine = seeded_database(n_orders)
+    seed_routes(engine, n_routes)
+    use_engine(engine)
+
+    log(f"{n_routes:,} routes, {n_orders:,} orders")
+    with Timer() as legacy:
+        legacy_stats = legacy_route_stats()
+    log(f"per-route COUNT loop : {legacy.ms:>9.1f} ms")
+
+    with Timer() as grouped:
+        stats = RouteService().get_route_stats()
+    log(f"grouped join         : {grouped.ms:>9.1f} ms")
+
+    legacy_counts = {s['route'].id: s['order_count'] for s in legacy_stats}
+    assert all(legacy_counts[s['route'].id] == s['order_count'] for s in stats)
+    log(f"{sum(s['order_count'] for s in stats):,} orders on routes, "
+        f"revenue {sum(s['revenue'] for s in stats):,.0f} VND")
+
+
+if __name__ == "__main__":
+    main()
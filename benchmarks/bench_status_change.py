@@ -0,0 +1,52 @@
+# benchmarks/bench_status_change.py
+"""
+Bulk status change benchmark: update_orders_status vs. the old per-order loop.
+
+Usage:
+    python benchmarks/bench_status_change.py [orders_to_change] [orders]
+
+Works on a copy of the seeded database. The old way is what the context menu
+did per selected order (get_order_by_id + update_order_status, one commit each);
+the bulk call re-statuses the same orders in one transaction, and
+restore_orders_status (the undo path) puts them back.
+"""
+import sys
+
+from common import Timer, log, scratch_database, use_engine
+from services.order_service import OrderService
+
+DEFAULT_CHANGES = 10_000
+DEFAULT_ORDERS = 100_000
+LEGACY_SAMPLE = 1000
+
+
+def main():
+    n_changes = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_CHANGES
+    n_orders = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_ORDERS
+    engine = scratch_database(n_orders, "status_change")
+    use_engine(engine)
+    service = OrderService()
+    order_ids = list(range(1, n_changes + 1))
+
+    log(f"Re-statusing {n_changes:,} orders ({n_orders:,}-order database)")
+
+    # The loop is slow; time a sample and extrapolate
+    sample = order_ids[:min(LEGACY_SAMPLE, n_changes)]
+    with Timer() as t:
+        for order_id in sample:
+            service.get_order_by_id(order_id)
+            service.update_order_status(order_id, "Processing")
+    log(f"per-order loop : {t.ms * n_changes / len(sample):>9.1f} ms (extrapolated from {len(sample):,})")
+
+    with Timer() as t:
+        _, message, old_statuses = service.update_orders_status(order_ids, "Shipping", changed_by="bench")
+    log(f"bulk update    : {t.ms:>9.1f} ms  ({message})")
+
+    with Timer() as t:
+        _, message = service.restore_orders_status(old_statuses)
+    log(f"bulk undo      : {t.ms:>9.1f} ms  ({message})")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# benchmarks/bench_unit_of_work.py
+"""
+Unit-of-work benchmark: database work per UI action, with and without a shared session.
+
+Usage:
+    python benchmarks/bench_unit_of_work.py [repeats] [orders]
+
+Replays the service calls behind three UI actions (the same calls the
+controllers make) on a copy of the seeded database:
+- open edit:  get_order_by_id + the dialog's tariff lookups + status history
+- delete:     get_order_by_id (undo snapshot) + delete_order
+- reload:     status summary + count + first table page
+and reports sessions, commits, statements and time per action, first with a
+session per service call, then inside unit_of_work().
+"""
+import sys
+from contextlib import nullcontext
+
+from common import Timer, log, scratch_database, seed_routes, use_engine
+from database.unit_of_work import db_stats, unit_of_work
+from services.order_service import OrderService
+from services.route_service import RouteService
+
+DEFAULT_REPEATS = 500
+DEFAULT_ORDERS = 100_000
+
+
+def open_edit(service, routes, order_id):
+    order = service.get_order_by_id(order_id)
+    # EditOrderDialog.fill_data triggers auto_calculate_cost for province and weight changes
+    for _ in range(3):
+        routes.get_tariff(order['sender_province'], order['receiver_province'])
+    service.get_status_history(order_id)
+
+
+def delete(service, order_id):
+    service.order_to_dict(service.get_order_by_id(order_id))
+    service.delete_order(order_id)
+
+
+def reload(service):
+    summary = service.get_status_summary()
+    service.count_orders()
+    service.get_order_rows(limit=200)
+    return summary
+
+
+def run(label, action, repeats, shared):
+    with db_stats.track(label) as stats, Timer() as t:
+        for i in range(repeats):
+            with unit_of_work(label) if shared else nullcontext():
+                action(i)
+    mode = "unit of work" if shared else "per call"
+    log(f"{label:<10} {mode:<13}| {stats['sessions'] / repeats:>5.1f} sessions | "
+        f"{stats['commits'] / repeats:>4.1f} commits | {stats['statements'] / repeats:>5.1f} statements | "
+        f"{t.ms / repeats:>7.2f} ms per action")
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_REPEATS
+    n_orders = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_ORDERS
+    engine = scratch_database(n_orders, "unit_of_work")
+    use_engine(engine)
+    seed_routes(engine, 1122)
+    service = OrderService()
+    routes = RouteService()
+
+    log(f"{repeats:,} actions each ({n_orders:,}-order database)")
+    for shared in (False, True):
+        offset = repeats if shared else 0
+        run("open edit", lambda i: open_edit(service, routes, n_orders - i), repeats, shared)
+        run("delete", lambda i: delete(service, offset + i + 1), repeats, shared)
+        run("reload", lambda i: reload(service), repeats // 10 or 1, shared)
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# benchmarks/bench_warehouse_allocation.py
+"""
+Warehouse allocation benchmark: automatic placement and rebalancing.
+
+Usage:
+    python benchmarks/bench_warehouse_allocation.py [orders_to_place] [db_orders]
+
+Seeds routes and one warehouse per province with mixed capacities, then times:
+- suggest_warehouses for one order, and ranking on a cached allocator (what
+  AddOrderDialog runs per province change),
+- auto_assign_orders for the first `orders_to_place` pending orders without a
+  warehouse (computing the picks alone, then placing them),
+- suggest_rebalancing / apply_rebalancing after shrinking some warehouses
+  to over 90% full.
+Checks that no warehouse ends over capacity and the counters match the orders,
+and that a rebalancing whose last transfer is refused leaves nothing moved.
+"""
+import random
+import sys
+
+from common import Timer, log, scratch_database, seed_routes, use_engine
+from services.ward_service import WardService
+from services.warehouse_allocation import FULL_THRESHOLD, Transfer
+from services.warehouse_service import WarehouseService
+
+DEFAULT_ORDERS = 50_000
+DEFAULT_DB_ORDERS = 200_000
+CAPACITIES = [500, 1000, 2000, 4000]
+
+
+def pending_without_warehouse(engine, limit):
+    with engine.connect() as conn:
+        return [row[0] for row in conn.exec_driver_sql(
+            "SELECT id FROM orders WHERE current_warehouse_id IS NULL AND status IN ('New', 'Processing') "
+            "ORDER BY id LIMIT ?", (limit,)
+        )]
+
+
+def main():
+    n_orders = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ORDERS
+    db_orders = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_DB_ORDERS
+    engine = scratch_database(db_orders, "warehouse_allocation")
+    use_engine(engine)
+    seed_routes(engine, 1122)
+    service = WarehouseService()
+    rng = random.Random(11)
+    for province in WardService().get_provinces():
+        service.create_warehouse({'name': f"Kho {province}", 'province': province,
+                                  'capacity': rng.choice(CAPACITIES)})
+    order_ids = pending_without_warehouse(engine, n_orders)
+
+    service.suggest_warehouses("Hà Nội")  # loads the route matrix
+    with Timer() as t:
+        for _ in range(100):
+            service.suggest_warehouses("Hà Nội")
+    log(f"suggest_warehouses           : {t.ms / 100:>8.2f} ms per call")
+    allocator = service.get_allocator()
+    with Timer() as t:
+        for _ in range(100):
+            allocator.rank("Hà Nội")
+    log(f"cached allocator rank        : {t.ms / 100:>8.2f} ms per call")
+
+    with Timer() as t:
+        _, message, picks = service.auto_assign_orders(order_ids, dry_run=True)
+    log(f"pick warehouses, {len(order_ids):,} orders : {t.ms:>8.1f} ms  ({message})")
+    with Timer() as t:
+        success, message, picks = service.auto_assign_orders(order_ids)
+    log(f"pick + place                 : {t.ms:>8.1f} ms  ({message})")
+    assert success, message
+    same_province = sum(
+        1 for row in engine.connect().exec_driver_sql(
+            "SELECT o.sender_province = w.province FROM orders o JOIN warehouses w ON w.id = o.current_warehouse_id"
+        ) if row[0]
+    )
+    log(f"placed in the sender's own province: {same_province / max(len(picks), 1):.0%}")
+
+    # Shrink every fourth warehouse so it is 95% full
+    for warehouse in service.get_all_warehouses()[::4]:
+        if warehouse.current_load:
+            service.update_warehouse(warehouse.id, {'capacity': int(warehouse.current_load / 0.95)})
+    overfull = [w for w in service.get_all_warehouses() if w.capacity and w.current_load > FULL_THRESHOLD * w.capacity]
+    with Timer() as t:
+        transfers = service.suggest_rebalancing()
+    log(f"suggest_rebalancing          : {t.ms:>8.1f} ms  ({len(overfull)} warehouses over 90%, "
+        f"{len(transfers)} transfers, {sum(len(tr.order_ids) for tr in transfers):,} orders)")
+    with Timer() as t:
+        success, message = service.apply_rebalancing(transfers)
+    log(f"apply_rebalancing            : {t.ms:>8.1f} ms  ({message})")
+    assert success, message
+
+    warehouses = service.get_all_warehouses()
+    assert all(not w.capacity or w.current_load <= w.capacity for w in warehouses), "over capacity"
+    assert not any(w.capacity and w.current_load > FULL_THRESHOLD * w.capacity for w in warehouses), \
+        "still over 90%"
+    assert not service.reconcile_warehouse_load(), "warehouse counters drifted"
+    check_refused_rebalancing(engine, service)
+    engine.dispose()
+
+
+def check_refused_rebalancing(engine, service):
+    """Two transfers into a warehouse with room for two orders: the second is refused, so neither may persist."""
+    source, target = sorted((w for w in service.get_all_warehouses() if w.current_load >= 4), key=lambda w: w.id)[:2]
+    service.update_warehouse(target.id, {'capacity': target.current_load + 2})
+    with engine.connect() as conn:
+        moved = [row[0] for row in conn.exec_driver_sql(
+            "SELECT id FROM orders WHERE current_warehouse_id = ? ORDER BY id LIMIT 4", (source.id,)
+        )]
+        history_before = conn.exec_driver_sql("SELECT count(*) FROM order_warehouse_history").scalar()
+    success, message = service.apply_rebalancing([
+        Transfer(source.id, target.id, moved[:1]), Transfer(source.id, target.id, moved[1:])
+    ])
+    assert not success, message
+    with engine.connect() as conn:
+        placed = {row[0] for row in conn.exec_driver_sql(
+            f"SELECT current_warehouse_id FROM orders WHERE id IN ({', '.join('?' * len(moved))})", tuple(moved)
+        )}
+        history_after = conn.exec_driver_sql("SELECT count(*) FROM order_warehouse_history").scalar()
+    assert placed == {source.id}, "refused rebalancing left orders moved"
+    assert history_after == history_before, "refused rebalancing left history rows"
+    assert service.get_warehouse_by_id(target.id).current_load == target.current_load
+    assert not service.reconcile_warehouse_load(), "warehouse counters drifted"
+    log(f"refused rebalancing          : rolled back ({message})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# benchmarks/bench_warehouse_transfer.py
+"""
+Warehouse transfer benchmark: assign_orders_to_warehouse vs. the old per-order loop.
+
+Usage:
+    python benchmarks/bench_warehouse_transfer.py [orders_to_move] [orders]
+
+Works on a copy of the seeded database with two warehouses. The same batch of
+orders is moved from warehouse 1 to warehouse 2 the old way (one
+assign_order_to_warehouse call per order, as the context menu used to) and
+back with one bulk call; then the counters are checked against the orders table.
+"""
+import sys
+
+from common import Timer, log, scratch_database, use_engine
+from services.warehouse_service import WarehouseService
+
+DEFAULT_MOVES = 5000
+DEFAULT_ORDERS = 100_000
+
+
+def main():
+    n_moves = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_MOVES
+    n_orders = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_ORDERS
+    engine = scratch_database(n_orders, "transfer")
+    use_engine(engine)
+
+    service = WarehouseService()
+    service.create_warehouse({'name': 'Kho A', 'province': 'Hà Nội', 'capacity': n_moves})
+    service.create_warehouse({'name': 'Kho B', 'province': 'Đà Nẵng', 'capacity': n_moves})
+    order_ids = list(range(1, n_moves + 1))
+
+    log(f"Moving {n_moves:,} orders ({n_orders:,}-order database)")
+    with Timer() as t:
+        service.assign_orders_to_warehouse(order_ids, 1)
+    log(f"bulk, into empty warehouse : {t.ms:>9.1f} ms")
+
+    with Timer() as t:
+        for order_id in order_ids:
+            service.assign_order_to_warehouse(order_id, 2)
+    log(f"per-order loop, A -> B     : {t.ms:>9.1f} ms")
+
+    with Timer() as t:
+        _, message, _ = service.assign_orders_to_warehouse(order_ids, 1)
+    log(f"bulk, B -> A               : {t.ms:>9.1f} ms  ({message})")
+
+    drift = service.reconcile_warehouse_load()
+    log("counters consistent" if not drift else f"counter drift: {drift}")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
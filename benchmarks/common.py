@@ -0,0 +1,198 @@
+# benchmarks/common.py
+"""
+Shared helpers for the benchmark scripts.
+
+Benchmarks never touch logistics.db: they seed a throwaway SQLite file in the
+temp directory (reused between runs of the same size) and rebind SessionLocal
+to it, so the services run exactly as they do in the app.
+"""
+import os
+import random
+import resource
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Allow "python benchmarks/xxx.py" from the project root
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from database.db_connection import SessionLocal, create_db_engine  # noqa: E402
+from database.migrations import run_migrations  # noqa: E402
+from models.base import Base  # noqa: E402
+from models.order import Order  # noqa: E402, F401
+from models.user import User  # noqa: E402, F401
+from models.warehouse import Warehouse, OrderWarehouseHistory  # noqa: E402, F401
+from models.route import Route  # noqa: E402, F401
+from models.order_status_history import OrderStatusHistory  # noqa: E402, F401
+from models.order_tombstone import OrderTombstone  # noqa: E402, F401
+from services.route_service import RouteService  # noqa: E402
+from services.ward_service import WardService  # noqa: E402
+
+STATUSES = ['New', 'Processing', 'Shipping', 'Delivered', 'Cancelled']
+ITEM_TYPES = ['normal', 'normal', 'normal', 'fragile', 'frozen', 'dangerous']
+SERVICE_TYPES = ['standard', 'express', 'urgent']
+FIRST_NAMES = ['Nguyễn', 'Trần', 'Lê', 'Phạm', 'Hoàng', 'Huỳnh', 'Phan', 'Vũ', 'Võ', 'Đặng', 'Bùi', 'Đỗ']
+LAST_NAMES = ['An', 'Bình', 'Cường', 'Dũng', 'Giang', 'Hương', 'Khánh', 'Linh', 'Minh', 'Ngọc', 'Phúc', 'Quân']
+ITEMS = ['Quần áo', 'Điện thoại', 'Sách', 'Mỹ phẩm', 'Thực phẩm khô', 'Linh kiện', 'Đồ gia dụng']
+
+ORDER_COLUMNS = [
+    'tracking_code', 'order_type', 'sender_name', 'sender_phone', 'sender_address',
+    'sender_province', 'sender_ward', 'receiver_name', 'receiver_phone', 'receiver_address',
+    'receiver_province', 'receiver_ward', 'item_name', 'item_type', 'package_count',
+    'weight', 'dimensions', 'service_type', 'payment_type', 'shipping_cost', 'has_cod',
+    'cod_amount', 'status', 'created_at', 'updated_at'
+]
+
+
+def log(message):
+    """Print a line and flush, so progress shows up when piped to a file."""
+    print(message, flush=True)
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB."""
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KB on Linux, bytes on macOS
+    return usage / (1024 * 1024) if sys.platform == 'darwin' else usage / 1024
+
+
+class Timer:
+    """Context manager measuring wall time in milliseconds."""
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        self.ms = 0.0
+        return self
+
+    def __exit__(self, *exc):
+        self.ms = (time.perf_counter() - self.start) * 1000
+
+
+def _random_name(rng):
+    return f"{rng.choice(FIRST_NAMES)} Văn {rng.choice(LAST_NAMES)}"
+
+
+def _db_datetime(value):
+    """Format a datetime the way SQLAlchemy stores it in SQLite."""
+    return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+def _order_rows(n_orders, seed):
+    """Generate n_orders deterministic order tuples in ORDER_COLUMNS order."""
+    rng = random.Random(seed)
+    wards = WardService()
+    provinces = wards.get_provinces()
+    ward_lists = {p: wards.get_wards(p) or [''] for p in provinces}
+    start = datetime(2025, 1, 1)
+
+    for i in range(n_orders):
+        sender_province = rng.choice(provinces)
+        receiver_province = rng.choice(provinces)
+        weight = round(rng.uniform(0.2, 30.0), 2)
+        has_cod = rng.random() < 0.3
+        created_at = _db_datetime(start + timedelta(seconds=i * 30))
+        yield (
+            f"#DH{i + 1:07d}", 'domestic',
+            _random_name(rng), f"09{rng.randint(0, 99999999):08d}", f"{rng.randint(1, 500)} Đường số {rng.randint(1, 50)}",
+            sender_province, rng.choice(ward_lists[sender_province]),
+            _random_name(rng), f"03{rng.randint(0, 99999999):08d}", f"{rng.randint(1, 500)} Lê Lợi",
+            receiver_province, rng.choice(ward_lists[receiver_province]),
+            rng.choice(ITEMS), rng.choice(ITEM_TYPES), rng.randint(1, 3),
+            weight, f"{rng.randint(10, 60)}x{rng.randint(10, 40)}x{rng.randint(5, 30)}",
+            rng.choice(SERVICE_TYPES), 'sender', 30000 + weight * 5000, has_cod,
+            rng.randint(1, 50) * 10000 if has_cod else 0.0,
+            rng.choice(STATUSES), created_at, created_at
+        )
+
+
+def create_schema(engine):
+    """Create the app schema on a benchmark engine (same steps as main.init_database)."""
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+
+
+def seeded_database_path(n_orders, name="orders"):
+    """Path of the cached benchmark database for this size."""
+    return os.path.join(tempfile.gettempdir(), f"pbl3_bench_{name}_{n_orders}.db")
+
+
+def seeded_database(n_orders, seed=42, name="orders", profile=None):
+    """
+    Return a SQLAlchemy engine for a temp database holding n_orders orders.
+    The file is cached in the temp directory and reused by later runs.
+    :param profile: database profile name (None = same as the app)
+    """
+    path = seeded_database_path(n_orders, name)
+    engine = create_db_engine(f"sqlite:///{path}", profile)
+    if not os.path.exists(path):
+        log(f"Seeding {n_orders:,} orders into {path} ...")
+        create_schema(engine)
+        conn = sqlite3.connect(path)
+        placeholders = ", ".join("?" for _ in ORDER_COLUMNS)
+        sql = f"INSERT INTO orders ({', '.join(ORDER_COLUMNS)}) VALUES ({placeholders})"
+        batch = []
+        for row in _order_rows(n_orders, seed):
+            batch.append(row)
+            if len(batch) >= 50000:
+                conn.executemany(sql, batch)
+                batch.clear()
+        if batch:
+            conn.executemany(sql, batch)
+        conn.commit()
+        conn.close()
+    else:
+        create_schema(engine)
+    return engine
+
+
+def seed_routes(engine, n_routes, seed=42):
+    """
+    Replace the routes table with n_routes deterministic routes: every ordered
+    pair of real provinces first (these match seeded orders), then pairs of
+    synthetic "Tỉnh ảo" provinces once the real ones run out.
+    """
+    rng = random.Random(seed)
+    provinces = WardService().get_provinces()
+    pairs = [(o, d) for o in provinces for d in provinces if o != d]
+    extra = 0
+    while len(pairs) < n_routes:
+        pairs.append((f"Tỉnh ảo {extra:04d}", rng.choice(provinces)))
+        extra += 1
+
+    rows = []
+    for origin, dest in pairs[:n_routes]:
+        distance = rng.randint(20, 1800)
+        rows.append((origin, dest, distance, round(distance / 50, 1),
+                     rng.randint(2, 6) * 10000, rng.randint(3, 8) * 1000))
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DELETE FROM routes")
+        conn.exec_driver_sql(
+            "INSERT INTO routes (origin_province, dest_province, distance_km, est_hours, base_price, price_per_kg) "
+            "VALUES (?, ?, ?, ?, ?, ?)", rows
+        )
+    RouteService.invalidate_pricing_index()
+
+
+def scratch_database(n_orders, name, profile=None):
+    """
+    Return an engine for a fresh copy of the seeded n_orders database, for
+    benchmarks that write (the cached original stays untouched).
+    """
+    seeded_database(n_orders).dispose()
+    path = os.path.join(tempfile.gettempdir(), f"pbl3_bench_{name}.db")
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    shutil.copy(seeded_database_path(n_orders), path)
+    return create_db_engine(f"sqlite:///{path}", profile)
+
+
+def use_engine(engine):
+    """Point every service (they all use SessionLocal) at the benchmark engine."""
+    SessionLocal.configure(bind=engine)
+    RouteService.invalidate_pricing_index()
@@ -3,8 +3,8 @@
 Controller for context menu and status change operations.
 """
 from PyQt6.QtWidgets import QMessageBox, QMenu
-from PyQt6.QtCore import Qt
 from services.action_history import action_history, Action
+from database.unit_of_work import unit_of_work
 
 
 class ContextMenuController:
@@ -29,10 +29,11 @@ class ContextMenuController:
         # Get order IDs from selected rows
         selected_order_ids = []
         selected_tracking_codes = []
+        model = self.parent.table_model
         for index in selected_rows:
             row = index.row()
-            order_id = self.view.table.item(row, 0).data(Qt.ItemDataRole.UserRole)
-            tracking_code = self.view.table.item(row, 0).text()
+            order_id = model.order_id_at(row)
+            tracking_code = model.tracking_code_at(row)
             if order_id:
                 selected_order_ids.append(order_id)
                 selected_tracking_codes.append(tracking_code)
@@ -100,13 +101,30 @@ class ContextMenuController:
                 if dialog.exec():
                     warehouse_id = dialog.get_selected_warehouse_id()
                     if warehouse_id:
-                        ws = WarehouseService()
-                        for order_id in selected_order_ids:
-                            ws.assign_order_to_warehouse(order_id, warehouse_id)
+                        with unit_of_work("warehouse_transfer"):
+                            _, message, results = WarehouseService().assign_orders_to_warehouse(
+                                selected_order_ids, warehouse_id
+                            )
+                        moved = {
+                            order_id: result['old_warehouse_id']
+                            for order_id, result in results.items()
+                            if result['success'] and result['old_warehouse_id'] != warehouse_id
+                        }
+                        if moved:
+                            # One undo step for the whole transfer
+                            action_history.record_action(Action(
+                                action_type='warehouse_transfer',
+                                entity_type='order',
+                                entity_id=next(iter(moved)),
+                                old_data={'warehouses': moved},
+                                new_data={'warehouse_id': warehouse_id},
+                                entity_ids=list(moved)
+                            ))
                         self.parent.load_orders()
-                        self.view.statusBar().showMessage(
-                            f"Đã chuyển {len(selected_order_ids)} đơn vào kho", 3000
-                        )
+                        failures = [r['message'] for r in results.values() if not r['success']]
+                        if failures:
+                            message += f" - {failures[-1]}"
+                        self.view.statusBar().showMessage(message, 5000)
                 return
 
             # Handle status change for all selected
@@ -124,38 +142,32 @@ class ContextMenuController:
 
             # Apply status to all selected orders
             if new_status:
-                for order_id in selected_order_ids:
-                    self.change_status(order_id, new_status)
-
-    def change_status(self, order_id, new_status):
-        """Call service to update status and refresh UI."""
-        # Get current status before update for undo
-        order = self.service.get_order_by_id(order_id)
-        if order:
-            old_status = order.get('status') if isinstance(order, dict) else order.status
-        else:
-            old_status = None
-
-        success, message = self.service.update_order_status(order_id, new_status)
-
-        if success:
-            # Record action for undo
-            if old_status:
-                action = Action(
-                    action_type='status_change',
-                    entity_type='order',
-                    entity_id=order_id,
-                    old_data={'status': old_status},
-                    new_data={'status': new_status}
-                )
-                action_history.record_action(action)
+                self.change_status_bulk(selected_order_ids, new_status)
 
-            # Smart filter: check if status change affects current filter
-            self.parent.filter_ctrl.refresh_with_smart_filter(
-                {'status': old_status},
-                {'status': new_status}
+    def change_status_bulk(self, order_ids, new_status):
+        """Set the status of all selected orders in one transaction, undoable in one step."""
+        with unit_of_work("status_change"):
+            success, message, old_statuses = self.service.update_orders_status(
+                order_ids, new_status, changed_by=self.parent.user_data.get('username')
             )
-            # Update the status bar
-            self.view.statusBar().showMessage(message, 3000)
-        else:
+        if not success:
             QMessageBox.warning(self.view, "Error", message)
+            return
+
+        if old_statuses:
+            action_history.record_action(Action(
+                action_type='status_change',
+                entity_type='order',
+                entity_id=next(iter(old_statuses)),
+                old_data={'statuses': old_statuses},
+                new_data={'status': new_status},
+                entity_ids=list(old_statuses)
+            ))
+
+        # Smart filter: check if status change affects current filter
+        old_status = next(iter(old_statuses.values()), new_status)
+        self.parent.filter_ctrl.refresh_with_smart_filter(
+            {'status': old_status},
+            {'status': new_status}
+        )
+        self.view.statusBar().showMessage(message, 3000)
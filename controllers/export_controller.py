@@ -2,7 +2,11 @@
 """
 Controller for OCR and Export operations.
 """
-from PyQt6.QtWidgets import QMessageBox, QFileDialog
+from PyQt6.QtCore import Qt, QThreadPool
+from PyQt6.QtWidgets import QMessageBox, QFileDialog, QProgressDialog
+
+from controllers.workers import ProgressWorker
+from ui.export_columns_dialog import ExportColumnsDialog
 
 
 class ExportController:
@@ -13,6 +17,10 @@ class ExportController:
         self.ocr_service = ocr_service
         self.report_service = report_service
         self.parent = parent_controller
+        self.thread_pool = QThreadPool(self.view)
+        self.thread_pool.setMaxThreadCount(1)
+        self.worker = None
+        self.progress_dialog = None
 
     def scan_with_ocr(self):
         """
@@ -48,8 +56,25 @@ class ExportController:
     def export_data(self):
         """
         Handle the Export button click.
-        Opens a file dialog to save the Excel file.
+        Asks for the columns and the file name, then writes the Excel file
+        on a background thread behind a progress dialog.
         """
+        if self.worker is not None:
+            return
+
+        filters = self.parent.filter_ctrl.current_filters()
+        has_filters = bool(
+            filters['search_query'].strip() or filters['days']
+            or filters['status'] not in ("", "Tất cả trạng thái")
+            or filters['province'] not in ("", "Tất cả tỉnh thành")
+        )
+        dialog = ExportColumnsDialog(self.view, has_filters=has_filters)
+        if not dialog.exec():
+            return
+        columns = dialog.get_columns()
+        if not dialog.use_filters():
+            filters = {}
+
         # Open 'Save As' dialog
         file_path, _ = QFileDialog.getSaveFileName(
             self.view,
@@ -57,12 +82,46 @@ class ExportController:
             "Orders_Report.xlsx",  # Default filename
             "Excel Files (*.xlsx)"
         )
+        if not file_path:
+            return
+
+        self.progress_dialog = QProgressDialog("Đang xuất dữ liệu...", "Huỷ", 0, 0, self.view)
+        self.progress_dialog.setWindowTitle("Xuất Excel")
+        self.progress_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        self.progress_dialog.setMinimumDuration(0)
+        self.progress_dialog.setAutoClose(False)
+        self.progress_dialog.setAutoReset(False)
+
+        self.worker = ProgressWorker(
+            self.report_service.export_to_excel, file_path, columns=columns, filters=filters
+        )
+        self.worker.signals.progress.connect(self._on_progress)
+        self.worker.signals.finished.connect(self._on_finished)
+        self.worker.signals.error.connect(self._on_error)
+        self.progress_dialog.canceled.connect(self.worker.cancel)
+        self.thread_pool.start(self.worker)
+
+    def _on_progress(self, done, total):
+        if total:
+            self.progress_dialog.setMaximum(total)
+            self.progress_dialog.setValue(min(done, total))
+        self.progress_dialog.setLabelText(f"Đang xuất dữ liệu... {done:,} đơn")
+
+    def _on_finished(self, result):
+        cancelled = self.worker.cancelled
+        self._close_progress()
+        success, message = result
+        if success:
+            QMessageBox.information(self.view, "Success", message)
+        elif not cancelled:
+            QMessageBox.critical(self.view, "Error", message)
 
-        if file_path:
-            # Call service to export
-            success, message = self.report_service.export_to_excel(file_path)
+    def _on_error(self, message):
+        self._close_progress()
+        QMessageBox.critical(self.view, "Error", f"Export failed: {message}")
 
-            if success:
-                QMessageBox.information(self.view, "Success", message)
-            else:
-                QMessageBox.critical(self.view, "Error", message)
+    def _close_progress(self):
+        self.worker = None
+        if self.progress_dialog:
+            self.progress_dialog.close()
+            self.progress_dialog = None
@@ -2,17 +2,35 @@
 """
 Controller for Search and Filter operations.
 """
+from PyQt6.QtCore import QThreadPool, QTimer
+from controllers.workers import Worker
+from database.unit_of_work import unit_of_work
 from ui.constants import VIETNAM_PROVINCES
 
 
 class FilterController:
     """Handles search, filtering, and smart filter logic."""
 
+    # Wait this long after the last keystroke before querying
+    SEARCH_DEBOUNCE_MS = 300
+
     def __init__(self, view, service, parent_controller):
         self.view = view
         self.service = service
         self.parent = parent_controller
 
+        # Debounce timer for the search box
+        self.search_timer = QTimer(self.view)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(self.SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.apply_filters)
+
+        # One query at a time; superseded queued queries are dropped
+        self.thread_pool = QThreadPool(self.view)
+        self.thread_pool.setMaxThreadCount(1)
+        self.current_worker = None
+        self.generation = 0
+
     def load_province_filter(self):
         """Load unique provinces into the filter dropdown."""
         # Get provinces from existing orders
@@ -25,10 +43,62 @@ class FilterController:
         for prov in provinces:
             self.view.filter_province.addItem(prov)
 
+    def schedule_filters(self):
+        """Apply filters once typing pauses (restarts the debounce window)."""
+        self.search_timer.start()
+
     def apply_filters(self):
         """
         Apply all filters (search + status + time + province).
+        The query runs on a worker thread; only the latest result is shown.
+        """
+        self.search_timer.stop()
+        filters = self.current_filters()
+        model = self.parent.table_model
+
+        generation = self.cancel_pending()
+        worker = Worker(self._run_filter_query, filters, model.sort_key, model.descending, model.page_size)
+        worker.signals.finished.connect(
+            lambda result, g=generation: self._on_filter_result(g, result)
+        )
+        worker.signals.error.connect(
+            lambda message: self.view.statusBar().showMessage(f"Lỗi lọc đơn: {message}", 3000)
+        )
+        self.current_worker = worker
+        self.thread_pool.start(worker)
+
+    def cancel_pending(self):
         """
+        Drop any filter query that has not reported back yet.
+        :return: The new generation number
+        """
+        self.search_timer.stop()
+        self.generation += 1
+        if self.current_worker:
+            self.current_worker.cancel()
+            self.current_worker = None
+        self.thread_pool.clear()
+        return self.generation
+
+    def _run_filter_query(self, filters, sort_key, descending, page_size):
+        """Worker thread: fetch the status summary and the first table page (one session)."""
+        with unit_of_work("filter_query"):
+            summary = self.service.get_status_summary(**filters)
+            rows = self.service.get_order_rows(
+                limit=page_size, sort_key=sort_key, descending=descending, **filters
+            )
+        return filters, summary, rows
+
+    def _on_filter_result(self, generation, result):
+        """GUI thread: show a finished query unless a newer one was started."""
+        if generation != self.generation:
+            return
+        self.current_worker = None
+        filters, summary, rows = result
+        self.parent.show_orders(filters, summary, rows)
+
+    def current_filters(self):
+        """Read the filter widgets into filter_orders keyword arguments."""
         search_query = self.view.search_input.text()
         status = self.view.filter_status.currentText()
         time_filter = self.view.filter_time.currentText()
@@ -43,20 +113,26 @@ class FilterController:
         elif time_filter == "30 ngày qua":
             days = 30
 
-        orders = self.service.filter_orders(
-            search_query=search_query,
-            status=status,
-            days=days,
-            province=province
-        )
-        self.parent.load_orders(orders)
+        return {
+            'search_query': search_query,
+            'status': status,
+            'days': days,
+            'province': province
+        }
 
     def clear_filters(self):
         """Reset all filters to default values."""
+        # Reset widgets quietly, then refresh once
+        widgets = [self.view.search_input, self.view.filter_status,
+                   self.view.filter_time, self.view.filter_province]
+        for widget in widgets:
+            widget.blockSignals(True)
         self.view.search_input.clear()
         self.view.filter_status.setCurrentIndex(0)
         self.view.filter_time.setCurrentIndex(0)
         self.view.filter_province.setCurrentIndex(0)
+        for widget in widgets:
+            widget.blockSignals(False)
         self.parent.load_orders()
 
     def refresh_with_smart_filter(self, old_data, new_data):
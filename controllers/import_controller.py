@@ -0,0 +1,91 @@
+# controllers/import_controller.py
+"""
+Controller for bulk order import from CSV/Excel manifests.
+"""
+from PyQt6.QtCore import Qt, QThreadPool
+from PyQt6.QtWidgets import QMessageBox, QFileDialog, QProgressDialog
+
+from controllers.workers import ProgressWorker
+from services.import_service import ImportService
+
+
+class ImportController:
+    """Runs ImportService on a background thread with a progress dialog."""
+
+    def __init__(self, view, parent_controller):
+        self.view = view
+        self.parent = parent_controller
+        self.thread_pool = QThreadPool(self.view)
+        self.thread_pool.setMaxThreadCount(1)
+        self.worker = None
+        self.progress_dialog = None
+
+    def import_orders(self):
+        """Pick a manifest file and import it; an interrupted import of the same file resumes."""
+        if self.worker is not None:
+            return
+
+        file_path, _ = QFileDialog.getOpenFileName(
+            self.view,
+            "Chọn file đơn hàng",
+            "",
+            "Đơn hàng (*.csv *.xlsx)"
+        )
+        if not file_path:
+            return
+
+        self.progress_dialog = QProgressDialog("Đang nhập đơn hàng...", "Dừng", 0, 0, self.view)
+        self.progress_dialog.setWindowTitle("Nhập đơn hàng loạt")
+        self.progress_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        self.progress_dialog.setMinimumDuration(0)
+        self.progress_dialog.setAutoClose(False)
+        self.progress_dialog.setAutoReset(False)
+
+        self.worker = ProgressWorker(self._run_import, file_path)
+        self.worker.signals.progress.connect(self._on_progress)
+        self.worker.signals.finished.connect(self._on_finished)
+        self.worker.signals.error.connect(self._on_error)
+        self.progress_dialog.canceled.connect(self.worker.cancel)
+        self.thread_pool.start(self.worker)
+
+    @staticmethod
+    def _run_import(file_path, progress=None, is_cancelled=None):
+        """Worker thread: ImportService loads the ward/route lookups, so build it here too."""
+        return ImportService().import_file(file_path, progress=progress, is_cancelled=is_cancelled)
+
+    def _on_progress(self, done, total):
+        if total:
+            self.progress_dialog.setMaximum(total)
+            self.progress_dialog.setValue(min(done, total))
+        self.progress_dialog.setLabelText(f"Đang nhập đơn hàng... {done:,} dòng")
+
+    def _on_finished(self, result):
+        self._close_progress()
+        success, message, summary = result
+
+        details = (
+            f"Đã nhập: {summary['imported']:,} đơn\n"
+            f"Bị từ chối: {summary['failed']:,} dòng"
+        )
+        if summary['resumed_from']:
+            details += f"\nTiếp tục từ dòng {summary['resumed_from']:,}"
+        if summary['error_report']:
+            details += f"\n\nChi tiết lỗi: {summary['error_report']}"
+
+        if success:
+            QMessageBox.information(self.view, "Nhập đơn hàng", f"{message}\n\n{details}")
+        else:
+            QMessageBox.warning(self.view, "Nhập đơn hàng", f"{message}\n\n{details}")
+
+        if summary['imported']:
+            self.parent.load_orders()
+
+    def _on_error(self, message):
+        self._close_progress()
+        QMessageBox.critical(self.view, "Lỗi", f"Không thể nhập file: {message}")
+
+    def _close_progress(self):
+        self.worker = None
+        if self.progress_dialog:
+            self.progress_dialog.close()
+            self.progress_dialog = None
@@ -3,13 +3,14 @@
 Main Controller - Coordinator for sub-controllers.
 Refactored from 700+ lines to modular architecture.
 """
-from PyQt6.QtWidgets import QTableWidgetItem
 from PyQt6.QtCore import Qt
 
 from ui.main_window import MainWindow
+from ui.order_table_model import OrderTableModel
 from services.order_service import OrderService
 from services.ocrspace_service import OCRSpaceService
 from services.report_service import ReportService
+from database.unit_of_work import unit_of_work
 
 # Import sub-controllers
 from controllers.order_controller import OrderController
@@ -17,6 +18,7 @@ from controllers.filter_controller import FilterController
 from controllers.undo_controller import UndoController
 from controllers.context_menu_controller import ContextMenuController
 from controllers.export_controller import ExportController
+from controllers.import_controller import ImportController
 
 
 class MainController:
@@ -33,6 +35,10 @@ class MainController:
         self.ocr_service = OCRSpaceService()
         self.report_service = ReportService()
 
+        # Lazy table model: rows are paged in from the service as the view scrolls
+        self.table_model = OrderTableModel(self.service, parent=self.view)
+        self.view.set_order_model(self.table_model)
+
         # Initialize sub-controllers
         self.order_ctrl = OrderController(self.view, self.service, self)
         self.filter_ctrl = FilterController(self.view, self.service, self)
@@ -41,6 +47,7 @@ class MainController:
         self.export_ctrl = ExportController(
             self.view, self.ocr_service, self.report_service, self
         )
+        self.import_ctrl = ImportController(self.view, self)
 
         # Connect signals
         self._connect_signals()
@@ -64,14 +71,16 @@ class MainController:
         # OCR and Export
         self.view.btn_scan_ai.clicked.connect(self.export_ctrl.scan_with_ocr)
         self.view.btn_export.clicked.connect(self.export_ctrl.export_data)
+        self.view.btn_import.clicked.connect(self.import_ctrl.import_orders)
 
         # Hide buttons for Staff users
         if not self.is_admin:
             self.view.btn_export.setVisible(False)
+            self.view.btn_import.setVisible(False)
 
         # Search and Filter
         self.view.search_input.returnPressed.connect(self.filter_ctrl.apply_filters)
-        self.view.search_input.textChanged.connect(self.filter_ctrl.apply_filters)
+        self.view.search_input.textChanged.connect(self.filter_ctrl.schedule_filters)
         self.view.filter_status.currentTextChanged.connect(self.filter_ctrl.apply_filters)
         self.view.filter_time.currentTextChanged.connect(self.filter_ctrl.apply_filters)
         self.view.filter_province.currentTextChanged.connect(self.filter_ctrl.apply_filters)
@@ -82,103 +91,54 @@ class MainController:
         self.view.table.customContextMenuRequested.connect(
             self.context_menu_ctrl.show_context_menu
         )
-        self.view.table.itemDoubleClicked.connect(self.order_ctrl.on_item_double_clicked)
+        self.view.table.doubleClicked.connect(self.order_ctrl.on_item_double_clicked)
 
-    def load_orders(self, orders=None):
+    def load_orders(self, filters=None):
         """
-        Fetch data, update Table AND update Dashboard.
-        If orders is provided, use that list instead of fetching all.
+        Reload Table AND update Dashboard.
+        If filters is provided (filter_orders keyword arguments), show only matching orders.
         """
-        if orders is None or not isinstance(orders, list):
-            orders = self.service.get_all_orders()
-            # Clear search input when refreshing
+        # A direct reload supersedes any background filter query
+        self.filter_ctrl.cancel_pending()
+
+        if filters is None or not isinstance(filters, dict):
+            filters = {}
+            # Clear search input when refreshing (without re-triggering a search)
+            self.view.search_input.blockSignals(True)
             self.view.search_input.clear()
+            self.view.search_input.blockSignals(False)
+
+        # Summary and first table page from one session (and one snapshot)
+        with unit_of_work("load_orders"):
+            summary = self.service.get_status_summary(**filters)
+            self.show_orders(filters, summary)
+
+    def show_orders(self, filters, summary, first_page=None):
+        """
+        Point the table at a filter and refresh stats from its status summary.
+        :param first_page: Table rows already fetched by a background query, if any
+        """
+        total_count = sum(count for count, _ in summary.values())
 
         # Update Table
-        self._update_table(orders)
+        self.table_model.set_filters(filters, total=total_count, first_page=first_page)
 
         # Update Quick Stats
-        self._update_stats(orders)
+        self._update_stats(summary)
 
         # Update Dashboard Chart
-        self.view.tab_dashboard.update_chart(orders)
-
-    def _update_table(self, orders):
-        """Update the orders table with data."""
-        # Disable sorting while adding rows
-        self.view.table.setSortingEnabled(False)
-        self.view.table.setRowCount(0)
-
-        # Status display mapping
-        status_display_map = {
-            'New': 'Mới tạo',
-            'Processing': 'Đang xử lý',
-            'Shipping': 'Đang giao',
-            'Delivered': 'Đã giao',
-            'Cancelled': 'Đã huỷ'
-        }
-
-        for row_idx, order in enumerate(orders):
-            self.view.table.insertRow(row_idx)
-
-            # Col 0: Mã đơn
-            tracking_item = QTableWidgetItem(order.tracking_code)
-            tracking_item.setData(Qt.ItemDataRole.UserRole, order.id)
-            tracking_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.view.table.setItem(row_idx, 0, tracking_item)
-
-            # Col 1: Trạng thái
-            status_text = status_display_map.get(order.status, order.status)
-            status_item = QTableWidgetItem(status_text)
-            status_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.view.table.setItem(row_idx, 1, status_item)
-
-            # Col 2: Người gửi → Người nhận
-            sender = order.sender_name or "N/A"
-            receiver = order.receiver_name or "N/A"
-            self.view.table.setItem(row_idx, 2, QTableWidgetItem(f"{sender} → {receiver}"))
-
-            # Col 3: Tuyến đường
-            route = order.get_route_summary() if hasattr(order, 'get_route_summary') else "N/A → N/A"
-            route_item = QTableWidgetItem(route)
-            route_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.view.table.setItem(row_idx, 3, route_item)
-
-            # Col 4: Số kiện / Trọng lượng
-            package_info = (
-                order.get_package_summary()
-                if hasattr(order, 'get_package_summary')
-                else f"1 kiện / {order.weight:.1f} kg"
-            )
-            pkg_item = QTableWidgetItem(package_info)
-            pkg_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.view.table.setItem(row_idx, 4, pkg_item)
-
-            # Col 5: Tổng phí
-            total = order.get_total_cost() if hasattr(order, 'get_total_cost') else order.shipping_cost
-            cost_text = f"{total:,.0f} VND"
-            if hasattr(order, 'has_cod') and order.has_cod:
-                cost_text += " (COD)"
-            cost_item = QTableWidgetItem(cost_text)
-            cost_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.view.table.setItem(row_idx, 5, cost_item)
-
-            # Col 6: Thời gian tạo
-            created_at = order.created_at.strftime("%d/%m/%Y %H:%M") if order.created_at else "N/A"
-            time_item = QTableWidgetItem(created_at)
-            time_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.view.table.setItem(row_idx, 6, time_item)
-
-        # Re-enable sorting
-        self.view.table.setSortingEnabled(True)
-
-    def _update_stats(self, orders):
+        self.view.tab_dashboard.update_chart(summary)
+
+    def _update_stats(self, summary):
         """Update the quick stats footer."""
-        total_count = len(orders) if orders else 0
-        new_count = sum(1 for o in orders if o.status == "New") if orders else 0
-        processing_count = sum(1 for o in orders if o.status == "Processing") if orders else 0
-        shipping_count = sum(1 for o in orders if o.status == "Shipping") if orders else 0
-        delivered_count = sum(1 for o in orders if o.status == "Delivered") if orders else 0
+        def count_of(status):
+            return summary.get(status, (0, 0.0))[0]
+
+        total_count = sum(count for count, _ in summary.values())
+        new_count = count_of("New")
+        processing_count = count_of("Processing")
+        shipping_count = count_of("Shipping")
+        delivered_count = count_of("Delivered")
 
         self.view.lbl_quick_stats.setText(
             f"📦 Tổng: {total_count} | 🆕 Mới: {new_count} | "
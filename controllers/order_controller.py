@@ -3,12 +3,12 @@
 Controller for Order CRUD operations.
 """
 from PyQt6.QtWidgets import QMessageBox
-from PyQt6.QtCore import Qt
 from ui.add_order_dialog import AddOrderDialog
 from ui.edit_order_dialog import EditOrderDialog
 from ui.order_detail_dialog import OrderDetailDialog
 from services.order_service import OrderService
 from services.action_history import action_history, Action
+from database.unit_of_work import unit_of_work
 
 
 class OrderController:
@@ -23,11 +23,13 @@ class OrderController:
         """
         Open the dialog. If extracted_data is provided, fill the form.
         """
-        dialog = AddOrderDialog(self.view)
+        # Warehouse list and route lookups while the form is built share one session
+        with unit_of_work("add_order.open"):
+            dialog = AddOrderDialog(self.view)
 
-        # If we have data from OCR.space, auto-fill it
-        if extracted_data:
-            dialog.fill_data(extracted_data)
+            # If we have data from OCR.space, auto-fill it
+            if extracted_data:
+                dialog.fill_data(extracted_data)
 
         if dialog.exec():
             data = dialog.get_data()
@@ -59,23 +61,24 @@ class OrderController:
 
     def view_order_detail(self, order_id):
         """Open dialog to view full order details."""
-        order_data = self.service.get_order_by_id(order_id)
-        if order_data:
-            dialog = OrderDetailDialog(order_data, self.view)
+        with unit_of_work("order_detail.open"):
+            order_data = self.service.get_order_by_id(order_id)
+            dialog = OrderDetailDialog(order_data, self.view) if order_data else None
+        if dialog:
             dialog.exec()
 
-    def on_item_double_clicked(self, item):
+    def on_item_double_clicked(self, index):
         """Handle double click on a row to view details."""
-        row = item.row()
-        # Get order_id from column 0 user data
-        order_id = self.view.table.item(row, 0).data(Qt.ItemDataRole.UserRole)
+        order_id = self.parent.table_model.order_id_at(index.row())
         if order_id:
             self.view_order_detail(order_id)
 
     def edit_order(self, order_id):
         """Open dialog to edit order and save changes."""
-        # Get current order data (for undo)
-        order = self.service.get_order_by_id(order_id)
+        # Get current order data (for undo); the dialog's route lookups join the same session
+        with unit_of_work("edit_order.open"):
+            order = self.service.get_order_by_id(order_id)
+            dialog = EditOrderDialog(order, self.view) if order else None
 
         if not order:
             QMessageBox.warning(self.view, "Lỗi", "Không tìm thấy đơn hàng")
@@ -84,9 +87,6 @@ class OrderController:
         # Store old data for undo
         old_data = self.service.order_to_dict(order)
 
-        # Open edit dialog
-        dialog = EditOrderDialog(order, self.view)
-
         if dialog.exec():
             new_data = dialog.get_data()
 
@@ -94,7 +94,8 @@ class OrderController:
                 QMessageBox.warning(self.view, "Lỗi", "Mã vận đơn không được để trống!")
                 return
 
-            success, message = self.service.update_order(order_id, new_data)
+            with unit_of_work("edit_order.save"):
+                success, message = self.service.update_order(order_id, new_data)
 
             if success:
                 # Record action for undo
@@ -116,10 +117,6 @@ class OrderController:
 
     def delete_order(self, order_id, tracking_code):
         """Show confirmation and delete order if confirmed."""
-        # Get order data before deletion (for undo)
-        order = self.service.get_order_by_id(order_id)
-        old_data = self.service.order_to_dict(order) if order else None
-
         # Ask for confirmation
         reply = QMessageBox.question(
             self.view,
@@ -130,7 +127,11 @@ class OrderController:
         )
 
         if reply == QMessageBox.StandardButton.Yes:
-            success, message = self.service.delete_order(order_id)
+            # Snapshot for undo and delete in one session
+            with unit_of_work("delete_order"):
+                order = self.service.get_order_by_id(order_id)
+                old_data = self.service.order_to_dict(order) if order else None
+                success, message = self.service.delete_order(order_id)
 
             if success:
                 # Record action for undo
@@ -159,17 +160,28 @@ class OrderController:
         reply = QMessageBox.question(
             self.view,
             "Xác nhận xoá nhiều đơn",
-            f"Bạn có chắc chắn muốn xoá {count} đơn hàng?\n\n{codes_preview}\n\nHành động này không thể hoàn tác!",
+            f"Bạn có chắc chắn muốn xoá {count} đơn hàng?\n\n{codes_preview}\n\nBạn có thể hoàn tác bằng ⌘+Z.",
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
             QMessageBox.StandardButton.No
         )
 
         if reply == QMessageBox.StandardButton.Yes:
-            success_count = 0
-            for order_id in order_ids:
-                success, _ = self.service.delete_order(order_id)
-                if success:
-                    success_count += 1
+            success, message, snapshot = self.service.delete_orders(order_ids)
+            if not success:
+                QMessageBox.warning(self.view, "Error", message)
+                return
+
+            # One undo step restores the whole batch with its original IDs
+            deleted_ids = self.service.snapshot_order_ids(snapshot)
+            if deleted_ids:
+                action_history.record_action(Action(
+                    action_type='delete',
+                    entity_type='order',
+                    entity_id=deleted_ids[0],
+                    old_data={'snapshot': snapshot},
+                    new_data=None,
+                    entity_ids=deleted_ids
+                ))
 
             self.parent.load_orders()
-            self.view.statusBar().showMessage(f"Đã xoá {success_count}/{count} đơn hàng", 3000)
+            self.view.statusBar().showMessage(f"Đã xoá {len(deleted_ids)}/{count} đơn hàng", 3000)
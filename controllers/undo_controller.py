@@ -4,6 +4,7 @@ Controller for Undo/Redo operations.
 """
 from PyQt6.QtGui import QAction
 from services.action_history import action_history, Action
+from database.unit_of_work import unit_of_work
 
 
 class UndoController:
@@ -48,10 +49,11 @@ class UndoController:
 
         action = action_history.undo()
         if action:
-            success = self._execute_undo(action)
+            with unit_of_work("undo"):
+                success = self._execute_undo(action)
             if success:
                 self.view.statusBar().showMessage(
-                    f"Đã hoàn tác: {action.action_type} đơn #{action.entity_id}", 3000
+                    f"Đã hoàn tác: {action.action_type} {action.describe_target()}", 3000
                 )
                 self.parent.load_orders()
             else:
@@ -65,10 +67,11 @@ class UndoController:
 
         action = action_history.redo()
         if action:
-            success = self._execute_redo(action)
+            with unit_of_work("redo"):
+                success = self._execute_redo(action)
             if success:
                 self.view.statusBar().showMessage(
-                    f"Đã làm lại: {action.action_type} đơn #{action.entity_id}", 3000
+                    f"Đã làm lại: {action.action_type} {action.describe_target()}", 3000
                 )
                 self.parent.load_orders()
             else:
@@ -77,7 +80,11 @@ class UndoController:
     def _execute_undo(self, action: Action) -> bool:
         """Execute the undo operation based on action type."""
         try:
-            if action.action_type == 'status_change' and action.entity_type == 'order':
+            if action.action_type == 'status_change' and action.entity_type == 'order' and action.entity_ids:
+                # Revert every order of a bulk change to its own old status
+                success, _ = self.service.restore_orders_status(action.old_data['statuses'])
+                return success
+            elif action.action_type == 'status_change' and action.entity_type == 'order':
                 # Revert to old status
                 old_status = action.old_data.get('status') if action.old_data else None
                 if old_status:
@@ -88,10 +95,14 @@ class UndoController:
                 if action.old_data:
                     success, _ = self.service.update_order(action.entity_id, action.old_data)
                     return success
+            elif action.action_type == 'delete' and action.entity_type == 'order' and action.entity_ids:
+                # Restore a bulk delete with original IDs and history
+                success, _ = self.service.restore_orders(action.old_data['snapshot'])
+                return success
             elif action.action_type == 'delete' and action.entity_type == 'order':
                 # Restore deleted order - create_order returns 3 values
                 if action.old_data:
-                    result = self.service.create_order(action.old_data)
+                    result = self.service.create_order(action.old_data, check_capacity=False)
                     success = result[0]
                     new_id = result[2] if len(result) > 2 else None
                     if success and new_id:
@@ -102,6 +113,11 @@ class UndoController:
                 # Delete the created order
                 success, _ = self.service.delete_order(action.entity_id)
                 return success
+            elif action.action_type == 'warehouse_transfer' and action.entity_type == 'order':
+                # Put every moved order back where it was
+                from services.warehouse_service import WarehouseService
+                success, _ = WarehouseService().restore_order_warehouses(action.old_data['warehouses'])
+                return success
             return False
         except Exception as e:
             print(f"Undo error: {e}")
@@ -110,7 +126,11 @@ class UndoController:
     def _execute_redo(self, action: Action) -> bool:
         """Execute the redo operation based on action type."""
         try:
-            if action.action_type == 'status_change' and action.entity_type == 'order':
+            if action.action_type == 'status_change' and action.entity_type == 'order' and action.entity_ids:
+                # Apply the bulk change again
+                success, _, _ = self.service.update_orders_status(action.entity_ids, action.new_data['status'])
+                return success
+            elif action.action_type == 'status_change' and action.entity_type == 'order':
                 # Apply new status again
                 new_status = action.new_data.get('status') if action.new_data else None
                 if new_status:
@@ -124,17 +144,30 @@ class UndoController:
             elif action.action_type == 'create' and action.entity_type == 'order':
                 # Recreate order
                 if action.new_data:
-                    result = self.service.create_order(action.new_data)
+                    result = self.service.create_order(action.new_data, check_capacity=False)
                     success = result[0]
                     new_id = result[2] if len(result) > 2 else None
                     if success and new_id:
                         # Update action with new ID
                         action.entity_id = new_id
                     return success
+            elif action.action_type == 'delete' and action.entity_type == 'order' and action.entity_ids:
+                # Delete the batch again, keeping a fresh snapshot for the next undo
+                success, _, snapshot = self.service.delete_orders(action.entity_ids)
+                if success:
+                    action.old_data = {'snapshot': snapshot}
+                return success
             elif action.action_type == 'delete' and action.entity_type == 'order':
                 # Delete again
                 success, _ = self.service.delete_order(action.entity_id)
                 return success
+            elif action.action_type == 'warehouse_transfer' and action.entity_type == 'order':
+                # Move the same orders again
+                from services.warehouse_service import WarehouseService
+                success, _, _ = WarehouseService().assign_orders_to_warehouse(
+                    action.entity_ids, action.new_data['warehouse_id'], check_capacity=False
+                )
+                return success
             return False
         except Exception as e:
             print(f"Redo error: {e}")
@@ -0,0 +1,64 @@
+# controllers/workers.py
+"""
+Background worker for running service calls off the GUI thread.
+"""
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+
+
+class WorkerSignals(QObject):
+    """Signals a Worker emits back to the GUI thread."""
+    finished = pyqtSignal(object)
+    error = pyqtSignal(str)
+    progress = pyqtSignal(int, int)  # done, total (0 when unknown)
+
+
+class Worker(QRunnable):
+    """
+    Run fn(*args, **kwargs) on a QThreadPool thread.
+    A cancelled worker is skipped if it has not started yet,
+    and its result is dropped if it has.
+    """
+
+    def __init__(self, fn, *args, **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        if self.cancelled:
+            return
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            if not self.cancelled:
+                self.signals.error.emit(str(e))
+            return
+        if not self.cancelled:
+            self.signals.finished.emit(result)
+
+
+class ProgressWorker(Worker):
+    """
+    Worker for long, cooperatively cancellable jobs.
+    fn is called with progress= (emits signals.progress) and is_cancelled= keyword
+    arguments; cancelling asks fn to stop, and its partial result is still delivered.
+    """
+
+    def run(self):
+        try:
+            result = self.fn(
+                *self.args,
+                progress=self.signals.progress.emit,
+                is_cancelled=lambda: self.cancelled,
+                **self.kwargs
+            )
+        except Exception as e:
+            self.signals.error.emit(str(e))
+            return
+        self.signals.finished.emit(result)
@@ -1,7 +1,7 @@
 # database/db_connection.py
 import os
 import sys
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 
 def get_base_path():
@@ -33,9 +33,67 @@ else:
 
 DATABASE_URL = f"sqlite:///{DB_PATH}"
 
+# SQLite performance profiles: PRAGMAs applied to every new connection.
+DB_PROFILES = {
+    # Plain SQLite behaviour: rollback journal, fsync on every commit.
+    # Readers and the writer block each other.
+    "default": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+    },
+    # WAL: readers (dashboard, filters) keep running while a write commits.
+    # synchronous=NORMAL is durable against app crashes; only an OS crash or
+    # power loss can lose the last transactions, never corrupt the file.
+    "performance": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 256 * 1024 * 1024,   # 256 MB memory-mapped reads
+        "cache_size": -64 * 1024,          # 64 MB page cache (negative = KiB)
+        "temp_store": "MEMORY",            # sorts / temp indexes in RAM
+        "busy_timeout": 5000,              # ms to wait for a lock before failing
+    },
+}
+DEFAULT_DB_PROFILE = "performance"
+
+
+def load_db_profile():
+    """
+    Get the profile name: LOGISTICS_DB_PROFILE environment variable first,
+    then db_profile.txt in the project folder, else DEFAULT_DB_PROFILE.
+    """
+    profile = os.environ.get("LOGISTICS_DB_PROFILE")
+    if not profile:
+        config_path = os.path.join(os.path.dirname(DB_PATH), "db_profile.txt")
+        if os.path.exists(config_path):
+            with open(config_path, "r") as f:
+                profile = f.read().strip()
+    if profile not in DB_PROFILES:
+        if profile:
+            print(f"Unknown database profile '{profile}', using '{DEFAULT_DB_PROFILE}'")
+        profile = DEFAULT_DB_PROFILE
+    return profile
+
+
+def create_db_engine(url, profile=None):
+    """Create an engine that applies the given profile's PRAGMAs on every connection."""
+    db_engine = create_engine(url, echo=False)  # Turn off echo for production
+    pragmas = DB_PROFILES[profile or load_db_profile()]
+
+    @event.listens_for(db_engine, "connect")
+    def apply_pragmas(dbapi_connection, _connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+        cursor.close()
+
+    return db_engine
+
+
 # Create engine and session
-engine = create_engine(DATABASE_URL, echo=False) # Turn off echo for production
-SessionLocal = sessionmaker(bind=engine)
+DB_PROFILE = load_db_profile()
+engine = create_db_engine(DATABASE_URL, DB_PROFILE)
+# Objects stay readable after commit (services return them once their session is closed)
+SessionLocal = sessionmaker(bind=engine, expire_on_commit=False)
 
 def get_db_connection():
     return engine
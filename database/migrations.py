@@ -0,0 +1,135 @@
+# database/migrations.py
+"""
+Versioned schema migrations for existing databases.
+
+Base.metadata.create_all only creates missing tables - it never adds indexes,
+columns or triggers to a table that already exists in logistics.db. Every
+change of that kind is a migration below: migrations run once, in order, each
+in its own transaction, and the applied version is stored in SQLite's
+PRAGMA user_version. Statements must be safe on a fresh database too, where
+create_all has already built the current schema (IF NOT EXISTS etc.).
+"""
+from sqlalchemy import text
+
+from database import order_search, warehouse_load
+
+
+def _add_column(connection, table, column, ddl):
+    """ALTER TABLE ... ADD COLUMN unless create_all already built the table with it."""
+    existing = {row[1] for row in connection.execute(text(f"PRAGMA table_info({table})"))}
+    if column not in existing:
+        connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+
+
+def _order_search_index(connection):
+    """FTS5 index over the searchable order columns (see database/order_search.py)."""
+    try:
+        order_search.install(connection)
+    except Exception as e:
+        # SQLite built without FTS5 - search falls back to LIKE
+        print(f"Order search index not created: {e}")
+
+
+def _hot_column_indexes(connection):
+    """Indexes declared in the models for filters, sorting, stats and history lookups."""
+    statements = [
+        "CREATE INDEX IF NOT EXISTS ix_orders_status_created_at ON orders (status, created_at)",
+        "CREATE INDEX IF NOT EXISTS ix_orders_created_at_id ON orders (created_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_orders_current_warehouse_id ON orders (current_warehouse_id)",
+        "CREATE INDEX IF NOT EXISTS ix_orders_route ON orders (sender_province, receiver_province)",
+        "CREATE INDEX IF NOT EXISTS ix_order_status_history_order_id "
+        "ON order_status_history (order_id, changed_at)",
+        "CREATE INDEX IF NOT EXISTS ix_order_warehouse_history_order_id "
+        "ON order_warehouse_history (order_id, timestamp)",
+        "CREATE INDEX IF NOT EXISTS ix_routes_origin_dest ON routes (origin_province, dest_province)",
+    ]
+    for statement in statements:
+        connection.execute(text(statement))
+    # Give the query planner row statistics for the new indexes
+    connection.execute(text("ANALYZE"))
+
+
+def _route_totals_index(connection):
+    """Widen the route index so route stats can aggregate from the index alone."""
+    connection.execute(text("DROP INDEX IF EXISTS ix_orders_route"))
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_orders_route_totals "
+        "ON orders (sender_province, receiver_province, weight, shipping_cost)"
+    ))
+    connection.execute(text("ANALYZE orders"))
+
+
+def _warehouse_item_type_index(connection):
+    """Widen the warehouse index so occupancy per item type is an index-only count."""
+    connection.execute(text("DROP INDEX IF EXISTS ix_orders_current_warehouse_id"))
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_orders_warehouse_item_type ON orders (current_warehouse_id, item_type)"
+    ))
+    connection.execute(text("ANALYZE orders"))
+
+
+def _warehouse_load_counters(connection):
+    """Occupancy counters on warehouses, kept in sync by triggers (see database/warehouse_load.py)."""
+    _add_column(connection, "warehouses", "current_load", "INTEGER NOT NULL DEFAULT 0")
+    _add_column(connection, "warehouses", "current_weight", "FLOAT NOT NULL DEFAULT 0")
+    warehouse_load.install(connection)
+
+
+def _history_time_indexes(connection):
+    """Indexes on the history timestamps for incremental (watermark) analytics exports."""
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_order_status_history_changed_at ON order_status_history (changed_at)"
+    ))
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_order_warehouse_history_timestamp ON order_warehouse_history (timestamp)"
+    ))
+
+
+def _order_change_tracking(connection):
+    """orders.updated_at and the order_tombstones table for incremental exports."""
+    from models.order_tombstone import OrderTombstone
+
+    _add_column(connection, "orders", "updated_at", "DATETIME")
+    # Existing orders count as last changed when they were created
+    connection.execute(text("UPDATE orders SET updated_at = created_at WHERE updated_at IS NULL"))
+    connection.execute(text("CREATE INDEX IF NOT EXISTS ix_orders_updated_at_id ON orders (updated_at, id)"))
+    OrderTombstone.__table__.create(connection, checkfirst=True)
+
+
+# (version, description, function) - append only, never renumber
+MIGRATIONS = [
+    (1, "Order full-text search index", _order_search_index),
+    (2, "Indexes on hot query columns", _hot_column_indexes),
+    (3, "Covering index for route statistics", _route_totals_index),
+    (4, "Covering index for warehouse occupancy", _warehouse_item_type_index),
+    (5, "Warehouse occupancy counters", _warehouse_load_counters),
+    (6, "Indexes on history timestamps", _history_time_indexes),
+    (7, "Order change tracking", _order_change_tracking),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_version(connection):
+    """Schema version recorded in the database file (0 = never migrated)."""
+    return connection.execute(text("PRAGMA user_version")).scalar()
+
+
+def run_migrations(engine):
+    """
+    Apply every migration newer than the database's schema version.
+    Call after Base.metadata.create_all.
+    :return: schema version after migrating
+    """
+    with engine.connect() as connection:
+        current = get_version(connection)
+
+    for version, description, migrate in MIGRATIONS:
+        if version <= current:
+            continue
+        print(f"Migrating database to v{version}: {description}")
+        with engine.begin() as connection:
+            migrate(connection)
+            connection.execute(text(f"PRAGMA user_version = {version}"))
+        current = version
+    return current
@@ -0,0 +1,120 @@
+# database/order_search.py
+"""
+SQLite FTS5 full-text index for order search.
+
+The orders_fts virtual table mirrors the searchable text columns of `orders`
+(rowid = order id) and is kept in sync by triggers, so every write path - ORM,
+bulk UPDATE or raw SQL - updates it. The unicode61 tokenizer strips Vietnamese
+diacritics ("Nguyễn" is indexed as "nguyen"); 'đ' is not a diacritic to Unicode,
+so the triggers and the query builder fold it to 'd' themselves.
+"""
+import re
+
+from sqlalchemy import column, literal_column, select, table, text
+
+FTS_TABLE = "orders_fts"
+
+# Text columns of `orders` copied into the index
+SEARCH_COLUMNS = [
+    "tracking_code", "sender_name", "receiver_name", "sender_phone",
+    "receiver_phone", "sender_address", "receiver_address", "item_name"
+]
+
+fts_table = table(FTS_TABLE, column("rowid"), column("rank"))
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Engine URL -> whether orders_fts exists there
+_availability = {}
+
+
+def fold_text(value):
+    """Fold characters the FTS tokenizer keeps apart ('đ' -> 'd')."""
+    return value.replace("đ", "d").replace("Đ", "D")
+
+
+def _folded_sql(expr):
+    return f"replace(replace(coalesce({expr}, ''), 'đ', 'd'), 'Đ', 'D')"
+
+
+def _insert_sql(prefix):
+    columns = ", ".join(SEARCH_COLUMNS)
+    values = ", ".join(_folded_sql(f"{prefix}.{col}") for col in SEARCH_COLUMNS)
+    return f"INSERT INTO {FTS_TABLE}(rowid, {columns}) VALUES ({prefix}.id, {values});"
+
+
+def setup_statements():
+    """DDL creating the FTS table and the triggers that keep it in sync."""
+    columns = ", ".join(SEARCH_COLUMNS)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        f"{columns}, tokenize = 'unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON orders BEGIN "
+        f"{_insert_sql('new')} END",
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON orders BEGIN "
+        f"DELETE FROM {FTS_TABLE} WHERE rowid = old.id; END",
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF {columns} ON orders BEGIN "
+        f"DELETE FROM {FTS_TABLE} WHERE rowid = old.id; {_insert_sql('new')} END",
+    ]
+
+
+def rebuild(connection):
+    """Re-index every order (used when the index is first created on an existing database)."""
+    columns = ", ".join(SEARCH_COLUMNS)
+    values = ", ".join(_folded_sql(col) for col in SEARCH_COLUMNS)
+    connection.execute(text(f"DELETE FROM {FTS_TABLE}"))
+    connection.execute(text(f"INSERT INTO {FTS_TABLE}(rowid, {columns}) SELECT id, {values} FROM orders"))
+
+
+def install(connection):
+    """Create the FTS index and triggers if missing, indexing existing orders."""
+    exists = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": FTS_TABLE}
+    ).first()
+    for statement in setup_statements():
+        connection.execute(text(statement))
+    if not exists:
+        rebuild(connection)
+
+
+def is_available(session):
+    """Check (once per database) whether orders_fts exists."""
+    bind = session.get_bind()
+    key = str(bind.url)
+    if key not in _availability:
+        found = session.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": FTS_TABLE}
+        ).first()
+        _availability[key] = found is not None
+    return _availability[key]
+
+
+def build_match_query(search_text, columns=None):
+    """
+    Turn free text into an FTS5 MATCH expression: every word must match
+    as a prefix, optionally restricted to some columns.
+    :return: MATCH string, or None if the text has no searchable words
+    """
+    tokens = _TOKEN_RE.findall(fold_text(search_text or ""))
+    if not tokens:
+        return None
+    expression = " ".join(f'"{token}"*' for token in tokens)
+    if columns:
+        return f"{{{' '.join(columns)}}} : ({expression})"
+    return expression
+
+
+def match_subquery(match_query):
+    """SELECT rowid, rank FROM orders_fts WHERE orders_fts MATCH :q - as a subquery."""
+    return (
+        select(fts_table.c.rowid.label("order_id"), fts_table.c.rank.label("rank"))
+        .where(literal_column(FTS_TABLE).op("MATCH")(match_query))
+        .subquery()
+    )
+
+
+def matching_ids(match_query):
+    """SELECT rowid FROM orders_fts WHERE orders_fts MATCH :q - for IN (...) filters."""
+    return select(fts_table.c.rowid).where(literal_column(FTS_TABLE).op("MATCH")(match_query))
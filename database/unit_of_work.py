@@ -0,0 +1,164 @@
+# database/unit_of_work.py
+"""
+Shared session scope for service calls.
+
+Services get their session from get_session(). Outside a unit of work that is
+a fresh SessionLocal() - one short session per service call, as before. Inside
+
+    with unit_of_work("edit_order"):
+        order = service.get_order_by_id(order_id)
+        service.update_order(order_id, data)
+
+every service call in the same thread shares one session: a service's commit()
+only flushes, close() does nothing and the unit commits once when the block
+ends (if anything was written). A service that rolls back fails the whole
+unit: its changes and any made later in the block are rolled back on exit, and
+the unit's `failed` flag is set.
+
+Keep units short and on one thread: never hold one open across a modal dialog
+or hand its objects to a background worker. The open SQLite transaction would
+pin an old snapshot, and writes made by other connections meanwhile would make
+the unit's commit fail.
+
+db_stats counts sessions, commits, rollbacks and SQL statements. Set
+LOGISTICS_DB_STATS=1 to print the counts of every labelled unit of work.
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from database.db_connection import SessionLocal
+
+_current_unit = ContextVar("current_unit", default=None)
+
+
+class DbStats:
+    """Process-wide counters of database work."""
+
+    FIELDS = ("sessions", "commits", "rollbacks", "statements")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = dict.fromkeys(self.FIELDS, 0)
+        self.verbose = os.environ.get("LOGISTICS_DB_STATS", "") not in ("", "0")
+
+    def add(self, field, amount=1):
+        with self._lock:
+            self.counts[field] += amount
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.counts)
+
+    @contextmanager
+    def track(self, label):
+        """
+        Measure the database work done inside the block (from every thread).
+        Yields a dict that holds the deltas and elapsed 'ms' once the block ends.
+        """
+        before = self.snapshot()
+        start = time.perf_counter()
+        delta = {}
+        try:
+            yield delta
+        finally:
+            after = self.snapshot()
+            delta.update({field: after[field] - before[field] for field in self.FIELDS})
+            delta["ms"] = (time.perf_counter() - start) * 1000
+            if self.verbose:
+                print(f"[db] {label}: {delta['sessions']} session(s), {delta['commits']} commit(s), "
+                      f"{delta['rollbacks']} rollback(s), {delta['statements']} statement(s), {delta['ms']:.1f} ms")
+
+
+db_stats = DbStats()
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _count_commit(_session):
+    db_stats.add("commits")
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _count_rollback(_session):
+    # Fires for explicit rollbacks, not when a read-only session is closed
+    db_stats.add("rollbacks")
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_statement(*_args):
+    db_stats.add("statements")
+
+
+class _SharedSession:
+    """A service's view of the unit's session: commit flushes, rollback fails the unit, close is a no-op."""
+
+    def __init__(self, unit):
+        self._unit = unit
+
+    def __getattr__(self, name):
+        return getattr(self._unit.session, name)
+
+    def commit(self):
+        self._unit.session.flush()
+        self._unit.wrote = True
+
+    def rollback(self):
+        self._unit.failed = True
+        self._unit.session.rollback()
+
+    def close(self):
+        pass
+
+
+class UnitOfWork:
+    """One session and transaction shared by the service calls in a `with unit_of_work()` block."""
+
+    def __init__(self):
+        self.session: Session = SessionLocal()
+        self.failed = False
+        self.wrote = False  # A service committed (read-only units just close)
+
+
+def get_session():
+    """Session for one service call: the current unit of work's, or a new SessionLocal()."""
+    unit = _current_unit.get()
+    if unit is not None:
+        return _SharedSession(unit)
+    db_stats.add("sessions")
+    return SessionLocal()
+
+
+@contextmanager
+def unit_of_work(label=None):
+    """
+    Run the service calls in the block in one session and one transaction.
+    Nested blocks join the outer unit. Yields the UnitOfWork (check .failed).
+    :param label: Name reported by db_stats (LOGISTICS_DB_STATS=1)
+    """
+    outer = _current_unit.get()
+    if outer is not None:
+        yield outer
+        return
+
+    with db_stats.track(label or "unit_of_work"):
+        db_stats.add("sessions")
+        unit = UnitOfWork()
+        token = _current_unit.set(unit)
+        try:
+            yield unit
+            if unit.failed:
+                unit.session.rollback()
+            elif unit.wrote:
+                unit.session.commit()
+        except Exception:
+            unit.session.rollback()
+            raise
+        finally:
+            _current_unit.reset(token)
+            unit.session.close()
@@ -0,0 +1,70 @@
+# database/warehouse_load.py
+"""
+Denormalized occupancy counters on `warehouses`.
+
+warehouses.current_load (number of orders) and warehouses.current_weight (kg)
+mirror the orders whose current_warehouse_id points at the warehouse. Triggers
+on `orders` keep them in step inside the same transaction as the write, so
+assigning, moving, re-weighing or deleting an order - through the ORM, a bulk
+UPDATE or raw SQL - never needs a COUNT to know how full a warehouse is.
+"""
+from sqlalchemy import text
+
+TRIGGER_PREFIX = "orders_wh_load"
+
+
+def _add_sql(prefix):
+    return (
+        f"UPDATE warehouses SET current_load = current_load + 1, "
+        f"current_weight = current_weight + coalesce({prefix}.weight, 0) "
+        f"WHERE id = {prefix}.current_warehouse_id;"
+    )
+
+
+def _remove_sql(prefix):
+    return (
+        f"UPDATE warehouses SET current_load = current_load - 1, "
+        f"current_weight = current_weight - coalesce({prefix}.weight, 0) "
+        f"WHERE id = {prefix}.current_warehouse_id;"
+    )
+
+
+def setup_statements():
+    """DDL for the triggers that keep the counters in sync."""
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {TRIGGER_PREFIX}_ai AFTER INSERT ON orders "
+        f"WHEN new.current_warehouse_id IS NOT NULL BEGIN {_add_sql('new')} END",
+        f"CREATE TRIGGER IF NOT EXISTS {TRIGGER_PREFIX}_ad AFTER DELETE ON orders "
+        f"WHEN old.current_warehouse_id IS NOT NULL BEGIN {_remove_sql('old')} END",
+        f"CREATE TRIGGER IF NOT EXISTS {TRIGGER_PREFIX}_au AFTER UPDATE OF current_warehouse_id, weight ON orders "
+        f"WHEN old.current_warehouse_id IS NOT new.current_warehouse_id OR old.weight IS NOT new.weight "
+        f"BEGIN {_remove_sql('old')} {_add_sql('new')} END",
+    ]
+
+
+# Actual occupancy per warehouse, recomputed from orders
+ACTUAL_LOAD_SQL = (
+    "SELECT w.id, w.name, w.current_load, w.current_weight, "
+    "coalesce(o.order_count, 0), coalesce(o.total_weight, 0.0) "
+    "FROM warehouses w LEFT JOIN ("
+    "SELECT current_warehouse_id, count(*) AS order_count, sum(coalesce(weight, 0)) AS total_weight "
+    "FROM orders WHERE current_warehouse_id IS NOT NULL GROUP BY current_warehouse_id"
+    ") o ON o.current_warehouse_id = w.id ORDER BY w.id"
+)
+
+
+def recount(connection):
+    """Recompute every warehouse's counters from orders (backfill / repair)."""
+    connection.execute(text(
+        "UPDATE warehouses SET "
+        "current_load = (SELECT count(*) FROM orders WHERE current_warehouse_id = warehouses.id), "
+        "current_weight = (SELECT coalesce(sum(weight), 0.0) FROM orders "
+        "WHERE current_warehouse_id = warehouses.id)"
+    ))
+
+
+def install(connection):
+    """Create the triggers and backfill the counters from existing orders."""
+    for statement in setup_statements():
+        connection.execute(text(statement))
+    recount(connection)
@@ -0,0 +1,61 @@
+# export_analytics.py
+"""
+Export orders, status history and warehouse history for the BI pipeline.
+
+Usage:
+    python export_analytics.py OUTPUT_DIR [--format csv|parquet|arrow] [--full] [DATASET ...]
+
+Each run writes one file per dataset, named <dataset>_<run time><extension>.
+The latest timestamp exported per dataset is kept in OUTPUT_DIR/watermarks.json,
+so the next run only writes what changed since then: orders created or updated
+(orders), deleted orders (order_tombstones) and new history rows. --full
+ignores the watermarks and exports everything again.
+"""
+import argparse
+import json
+import os
+from datetime import datetime
+
+from database.db_connection import engine
+from database.migrations import run_migrations
+from services.report_service import ReportService
+
+parser = argparse.ArgumentParser(description="Export analytics datasets")
+parser.add_argument("output_dir")
+parser.add_argument("--format", choices=sorted(ReportService.ANALYTICS_FORMATS), default="parquet")
+parser.add_argument("--full", action="store_true", help="ignore watermarks and export every row")
+parser.add_argument("datasets", nargs="*",
+                    help=f"datasets to export (default: all of {', '.join(ReportService.ANALYTICS_DATASETS)})")
+args = parser.parse_args()
+unknown = [name for name in args.datasets if name not in ReportService.ANALYTICS_DATASETS]
+if unknown:
+    parser.error(f"unknown dataset(s): {', '.join(unknown)}")
+
+# The history timestamp indexes are added by a migration
+run_migrations(engine)
+
+os.makedirs(args.output_dir, exist_ok=True)
+state_path = os.path.join(args.output_dir, "watermarks.json")
+watermarks = {}
+if os.path.exists(state_path) and not args.full:
+    with open(state_path, encoding="utf-8") as f:
+        watermarks = {name: datetime.fromisoformat(value) for name, value in json.load(f).items()}
+
+service = ReportService()
+run_time = datetime.now().strftime("%Y%m%dT%H%M%S")
+failed = False
+for dataset in args.datasets or list(ReportService.ANALYTICS_DATASETS):
+    file_path = os.path.join(
+        args.output_dir, f"{dataset}_{run_time}{ReportService.ANALYTICS_FORMATS[args.format]}"
+    )
+    since = watermarks.get(dataset)
+    success, message, watermark = service.export_analytics(dataset, args.format, file_path, since=since)
+    print(message + (f" (since {since})" if since else ""))
+    if success and watermark is not None:
+        watermarks[dataset] = watermark
+    failed = failed or not success
+
+with open(state_path, "w", encoding="utf-8") as f:
+    json.dump({name: value.isoformat() for name, value in watermarks.items()}, f, indent=2)
+
+raise SystemExit(1 if failed else 0)
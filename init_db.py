@@ -7,6 +7,7 @@ from models.user import User
 from models.warehouse import Warehouse, OrderWarehouseHistory
 from models.route import Route
 from models.order_status_history import OrderStatusHistory
+from models.order_tombstone import OrderTombstone
 
 print("Initializing the database...")
 try:
@@ -14,6 +15,10 @@ try:
     Base.metadata.create_all(bind=engine)
     print("Success! Database tables have been created.")
 
+    # Indexes, triggers and columns create_all can't add to existing tables
+    from database.migrations import run_migrations
+    print(f"Database schema is at version {run_migrations(engine)}.")
+
     # Create default admin account
     from services.auth_service import AuthService
     auth_service = AuthService()
@@ -12,6 +12,7 @@ def init_database():
     from models.warehouse import Warehouse, OrderWarehouseHistory
     from models.route import Route
     from models.order_status_history import OrderStatusHistory
+    from models.order_tombstone import OrderTombstone
 
     # Create database tables if they don't exist
     if not os.path.exists(DB_PATH):
@@ -19,6 +20,10 @@ def init_database():
 
     Base.metadata.create_all(bind=engine)
 
+    # Indexes, triggers and columns create_all can't add to existing tables
+    from database.migrations import run_migrations
+    run_migrations(engine)
+
 def main():
     app = QApplication(sys.argv)
 
@@ -1,11 +1,19 @@
 # models/order.py
 from datetime import datetime
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Boolean, ForeignKey, Index
 from models.base import Base
 
 class Order(Base):
     __tablename__ = 'orders'
+    __table_args__ = (
+        Index('ix_orders_status_created_at', 'status', 'created_at'),  # status filter + date range
+        Index('ix_orders_created_at_id', 'created_at', 'id'),  # keyset pagination / default sort
+        Index('ix_orders_warehouse_item_type', 'current_warehouse_id', 'item_type'),  # warehouse stats
+        # Covers the per-route aggregate in RouteService.get_route_stats
+        Index('ix_orders_route_totals', 'sender_province', 'receiver_province', 'weight', 'shipping_cost'),
+        Index('ix_orders_updated_at_id', 'updated_at', 'id'),  # incremental exports
+    )
 
     # 1. Identification
     id = Column(Integer, primary_key=True, autoincrement=True)
@@ -54,6 +62,8 @@ class Order(Base):
 
     # 8. Time
     created_at = Column(DateTime, default=datetime.now)
+    # Set on insert and by every ORM flush or bulk UPDATE of the row
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
 
     def __repr__(self):
         return f"<Order(id={self.id}, code={self.tracking_code}, status={self.status})>"
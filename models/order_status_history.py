@@ -1,13 +1,17 @@
 # models/order_status_history.py
 from datetime import datetime
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from models.base import Base
 
 
 class OrderStatusHistory(Base):
     """Model to track order status changes over time."""
     __tablename__ = 'order_status_history'
+    __table_args__ = (
+        Index('ix_order_status_history_order_id', 'order_id', 'changed_at'),
+        Index('ix_order_status_history_changed_at', 'changed_at'),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     order_id = Column(Integer, ForeignKey('orders.id'), nullable=False)
@@ -0,0 +1,18 @@
+# models/order_tombstone.py
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, DateTime, Index
+from models.base import Base
+
+
+class OrderTombstone(Base):
+    """Record of a deleted order, so incremental exports can emit the deletion."""
+    __tablename__ = 'order_tombstones'
+    __table_args__ = (
+        Index('ix_order_tombstones_deleted_at', 'deleted_at'),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    order_id = Column(Integer, nullable=False)  # No FK: the order row is gone
+    tracking_code = Column(String(50))
+    deleted_at = Column(DateTime, default=datetime.now)
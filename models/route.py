@@ -1,13 +1,16 @@
 # models/route.py
 from datetime import datetime
 
-from sqlalchemy import Column, Integer, String, Float, DateTime
+from sqlalchemy import Column, Integer, String, Float, DateTime, Index
 from models.base import Base
 
 
 class Route(Base):
     """Route model for shipping routes between provinces."""
     __tablename__ = 'routes'
+    __table_args__ = (
+        Index('ix_routes_origin_dest', 'origin_province', 'dest_province'),  # find_route
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     origin_province = Column(String(50), nullable=False)  # Tỉnh xuất phát
@@ -1,7 +1,7 @@
 # models/warehouse.py
 from datetime import datetime
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Index
 from models.base import Base
 
 
@@ -17,6 +17,11 @@ class Warehouse(Base):
     status = Column(String(20), default='active')  # active, maintenance, closed
     created_at = Column(DateTime, default=datetime.now)
 
+    # Orders currently stored and their total weight (kg); maintained by
+    # triggers on orders (database/warehouse_load.py), never set by hand
+    current_load = Column(Integer, nullable=False, default=0, server_default='0')
+    current_weight = Column(Float, nullable=False, default=0.0, server_default='0')
+
     def __repr__(self):
         return f"<Warehouse(id={self.id}, name={self.name}, status={self.status})>"
 
@@ -29,10 +34,24 @@ class Warehouse(Base):
         }
         return status_map.get(self.status, self.status)
 
+    def get_capacity_pct(self):
+        """Occupancy as a percentage of capacity."""
+        if not self.capacity or self.capacity <= 0:
+            return 0
+        return round((self.current_load or 0) / self.capacity * 100, 1)
+
+    def is_full(self):
+        """True when no more orders can be admitted."""
+        return (self.capacity or 0) > 0 and (self.current_load or 0) >= self.capacity
+
 
 class OrderWarehouseHistory(Base):
     """Track order movements between warehouses."""
     __tablename__ = 'order_warehouse_history'
+    __table_args__ = (
+        Index('ix_order_warehouse_history_order_id', 'order_id', 'timestamp'),
+        Index('ix_order_warehouse_history_timestamp', 'timestamp'),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     order_id = Column(Integer, ForeignKey('orders.id'), nullable=False)
@@ -0,0 +1,64 @@
+# plan_deliveries.py
+"""
+Plan the drivers' delivery routes for the orders a warehouse delivers in its own province.
+
+Usage:
+    python plan_deliveries.py 3                   # routes out of warehouse #3
+    python plan_deliveries.py 3 --drivers 10      # at most 10 drivers
+    python plan_deliveries.py 3 --capacity 150    # vehicle capacity in kg (default 500)
+    python plan_deliveries.py 3 --csv routes.csv  # one row per stop, in visiting order
+"""
+import csv
+import sys
+
+from database.db_connection import engine
+from database.migrations import run_migrations
+from services.dispatch_service import DispatchService
+
+
+def option(name):
+    """Value following a command line flag, or None."""
+    args = sys.argv[1:]
+    if name in args and args.index(name) + 1 < len(args):
+        return args[args.index(name) + 1]
+    return None
+
+
+if len(sys.argv) < 2 or not sys.argv[1].isdigit():
+    print(__doc__)
+    sys.exit(1)
+
+run_migrations(engine)
+
+limits = {}
+if option("--drivers"):
+    limits["max_drivers"] = int(option("--drivers"))
+if option("--capacity"):
+    limits["capacity_kg"] = float(option("--capacity"))
+
+plan = DispatchService().plan_deliveries(int(sys.argv[1]), **limits)
+if plan is None:
+    print(f"Không tìm thấy kho #{sys.argv[1]}.")
+    sys.exit(1)
+
+for number, route in enumerate(plan.routes, start=1):
+    print(f"Tài xế {number}: {len(route.stops)} điểm, {route.load_kg:.1f} kg, "
+          f"{route.distance_km:.1f} km, {route.hours:.1f} giờ")
+print(f"Tổng: {len(plan.routes)} tài xế, {plan.distance_km:.1f} km")
+if plan.unassigned:
+    print(f"{len(plan.unassigned)} điểm chưa xếp được "
+          f"({sum(len(stop.order_ids) for stop in plan.unassigned)} đơn)")
+
+csv_path = option("--csv")
+if csv_path:
+    with open(csv_path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f)
+        writer.writerow(["driver", "stop", "ward", "address", "order_ids", "weight_kg"])
+        for number, route in enumerate(plan.routes, start=1):
+            for position, stop in enumerate(route.stops, start=1):
+                writer.writerow([number, position, stop.ward, stop.address,
+                                 " ".join(map(str, stop.order_ids)), round(stop.weight_kg, 2)])
+        for stop in plan.unassigned:
+            writer.writerow(["", "", stop.ward, stop.address, " ".join(map(str, stop.order_ids)),
+                             round(stop.weight_kg, 2)])
+    print(f"Đã ghi lộ trình vào {csv_path}")
@@ -0,0 +1,63 @@
+# plan_dispatch.py
+"""
+Plan vehicle loads for the orders waiting to ship.
+
+Usage:
+    python plan_dispatch.py                   # print a summary of the loads
+    python plan_dispatch.py --warehouse 3     # only orders stored in warehouse #3
+    python plan_dispatch.py --csv loads.csv   # write one row per order with its load
+    python plan_dispatch.py --dispatch        # move every planned order to 'Shipping'
+"""
+import csv
+import sys
+
+from database.db_connection import engine
+from database.migrations import run_migrations
+from services.dispatch_service import DispatchService
+
+
+def option(name):
+    """Value following a command line flag, or None."""
+    args = sys.argv[1:]
+    if name in args and args.index(name) + 1 < len(args):
+        return args[args.index(name) + 1]
+    return None
+
+
+run_migrations(engine)
+
+warehouse = option("--warehouse")
+service = DispatchService()
+manifests = service.plan_dispatch(warehouse_id=int(warehouse) if warehouse else None)
+if not manifests:
+    print("Không có đơn nào chờ xuất.")
+    sys.exit(0)
+
+by_vehicle = {}
+for manifest in manifests:
+    count, orders, weight = by_vehicle.get(manifest.vehicle.name, (0, 0, 0.0))
+    by_vehicle[manifest.vehicle.name] = (count + 1, orders + len(manifest.order_ids), weight + manifest.weight_kg)
+for name, (count, orders, weight) in sorted(by_vehicle.items()):
+    print(f"{name}: {count} xe, {orders} đơn, {weight:,.1f} kg")
+oversized = [m for m in manifests if m.oversized]
+for manifest in oversized:
+    print(f"Quá tải: đơn #{manifest.order_ids[0]} ({manifest.weight_kg:.1f} kg, {manifest.volume_m3:.2f} m³) "
+          f"vượt {manifest.vehicle.name}")
+
+csv_path = option("--csv")
+if csv_path:
+    with open(csv_path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f)
+        writer.writerow(["load", "vehicle", "warehouse_id", "origin", "dest", "item_type", "order_id",
+                         "load_weight_kg", "load_volume_m3", "distance_km", "est_hours"])
+        for number, manifest in enumerate(manifests, start=1):
+            for order_id in manifest.order_ids:
+                writer.writerow([number, manifest.vehicle.name, manifest.warehouse_id, manifest.origin,
+                                 manifest.dest, manifest.item_type, order_id, round(manifest.weight_kg, 2),
+                                 round(manifest.volume_m3, 3), manifest.distance_km, manifest.est_hours])
+    print(f"Đã ghi {len(manifests)} chuyến xe vào {csv_path}")
+
+if "--dispatch" in sys.argv[1:]:
+    success, message = service.dispatch(manifests)
+    print(message)
+    sys.exit(0 if success else 1)
@@ -0,0 +1,31 @@
+# reconcile_warehouses.py
+"""
+Check the warehouse occupancy counters against the orders table.
+
+Usage:
+    python reconcile_warehouses.py            # report drift only
+    python reconcile_warehouses.py --repair   # recompute drifted counters
+"""
+import sys
+
+from database.db_connection import engine
+from database.migrations import run_migrations
+from services.warehouse_service import WarehouseService
+
+repair = "--repair" in sys.argv[1:]
+
+# The counters are added by a migration
+run_migrations(engine)
+
+drift = WarehouseService().reconcile_warehouse_load(repair=repair)
+if not drift:
+    print("All warehouse counters match the orders table.")
+else:
+    for entry in drift:
+        print(f"Kho #{entry['warehouse_id']} {entry['name']}: "
+              f"{entry['current_load']} đơn / {entry['current_weight']:.2f} kg recorded, "
+              f"{entry['actual_load']} đơn / {entry['actual_weight']:.2f} kg actual")
+    if repair:
+        print(f"Repaired {len(drift)} warehouse(s).")
+    else:
+        print(f"{len(drift)} warehouse(s) drifted. Run with --repair to fix.")
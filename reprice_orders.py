@@ -0,0 +1,34 @@
+# reprice_orders.py
+"""
+Recalculate order shipping costs from the current route tariffs.
+
+Usage:
+    python reprice_orders.py              # open orders (New, Processing)
+    python reprice_orders.py --all        # every order, delivered ones included
+    python reprice_orders.py --dry-run    # only count what would change
+
+Run it after changing route prices. Orders without a route are priced at the
+flat RouteService rate, as in the order dialogs.
+"""
+import sys
+
+from database.db_connection import engine
+from database.migrations import run_migrations
+from services.order_service import OrderService
+
+OPEN_STATUSES = ("New", "Processing")
+
+args = sys.argv[1:]
+statuses = None if "--all" in args else OPEN_STATUSES
+
+# reprice_orders sets orders.updated_at, which is added by a migration
+run_migrations(engine)
+
+success, message, _ = OrderService().reprice_orders(
+    statuses=statuses,
+    dry_run="--dry-run" in args,
+    progress=lambda done, total: print(f"\r{done:,}/{total:,} orders checked", end="", flush=True)
+)
+print()
+print(message)
+sys.exit(0 if success else 1)
@@ -5,24 +5,31 @@ Tracks changes to orders and allows reversing them.
 """
 from collections import deque
 from dataclasses import dataclass
-from typing import Any, Optional
+from typing import Any, List, Optional
 from datetime import datetime
 
 
 @dataclass
 class Action:
     """Represents an undoable action."""
-    action_type: str  # 'create', 'update', 'delete', 'status_change'
+    action_type: str  # 'create', 'update', 'delete', 'status_change', 'warehouse_transfer'
     entity_type: str  # 'order', 'warehouse', 'route'
     entity_id: int
     old_data: Optional[dict]  # Data before action (for undo)
     new_data: Optional[dict]  # Data after action (for redo)
     timestamp: datetime = None
+    entity_ids: Optional[List[int]] = None  # All affected entities for bulk actions
 
     def __post_init__(self):
         if self.timestamp is None:
             self.timestamp = datetime.now()
 
+    def describe_target(self) -> str:
+        """'đơn #12' for a single entity, '250 đơn' for a bulk action."""
+        if self.entity_ids and len(self.entity_ids) > 1:
+            return f"{len(self.entity_ids)} đơn"
+        return f"đơn #{self.entity_id}"
+
 
 class ActionHistoryManager:
     """Manages undo/redo history."""
@@ -95,7 +102,8 @@ class ActionHistoryManager:
             'create': 'tạo',
             'update': 'cập nhật',
             'delete': 'xóa',
-            'status_change': 'đổi trạng thái'
+            'status_change': 'đổi trạng thái',
+            'warehouse_transfer': 'chuyển kho'
         }
         entity_names = {
             'order': 'đơn hàng',
@@ -104,6 +112,8 @@ class ActionHistoryManager:
         }
         action_name = action_names.get(action.action_type, action.action_type)
         entity_name = entity_names.get(action.entity_type, action.entity_type)
+        if action.entity_ids and len(action.entity_ids) > 1:
+            return f"{prefix} {action_name} {len(action.entity_ids)} {entity_name}"
         return f"{prefix} {action_name} {entity_name} #{action.entity_id}"
 
 
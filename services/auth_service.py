@@ -1,7 +1,7 @@
 # services/auth_service.py
 import hashlib
 from sqlalchemy.orm import Session
-from database.db_connection import SessionLocal
+from database.unit_of_work import get_session
 from models.user import User
 
 class AuthService:
@@ -24,7 +24,7 @@ class AuthService:
         Authenticate user by username and password.
         Returns (success, user_or_message)
         """
-        session: Session = SessionLocal()
+        session: Session = get_session()
         try:
             user = session.query(User).filter(User.username == username).first()
 
@@ -54,7 +54,7 @@ class AuthService:
         Create a new user.
         :param data: Dictionary containing user details
         """
-        session: Session = SessionLocal()
+        session: Session = get_session()
         try:
             # Check if username already exists
             existing = session.query(User).filter(User.username == data.get('username')).first()
@@ -78,7 +78,7 @@ class AuthService:
 
     def get_all_users(self):
         """Retrieve all users from the database."""
-        session: Session = SessionLocal()
+        session: Session = get_session()
         try:
             users = session.query(User).all()
             return users
@@ -90,7 +90,7 @@ class AuthService:
 
     def delete_user(self, user_id: int):
         """Delete a user by ID."""
-        session: Session = SessionLocal()
+        session: Session = get_session()
         try:
             user = session.query(User).filter(User.id == user_id).first()
             if user:
@@ -114,7 +114,7 @@ class AuthService:
 
     def create_default_admin(self):
         """Create default admin account if no admin exists."""
-        session: Session = SessionLocal()
+        session: Session = get_session()
         try:
             admin_exists = session.query(User).filter(User.role == 'admin').first()
             if not admin_exists:
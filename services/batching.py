@@ -0,0 +1,14 @@
+# services/batching.py
+"""
+Helpers for bulk operations over many order IDs.
+"""
+
+# IDs per IN (...) list - well under SQLite's bound-parameter limit
+BULK_CHUNK_SIZE = 500
+
+
+def chunked(items, size=BULK_CHUNK_SIZE):
+    """Yield successive lists of at most `size` items."""
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
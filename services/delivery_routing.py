@@ -0,0 +1,371 @@
+# services/delivery_routing.py
+"""
+Last-mile delivery routes inside one province (a capacitated VRP).
+
+Every stop is one receiver address; a driver leaves the warehouse, visits
+their stops in order and comes back, within the vehicle's capacity and the
+shift length (driving time plus a fixed service time per stop).
+
+data/province_wards.json only lists ward names, so WardMap lays a province's
+wards out on a square grid in file order, WARD_SPACING_KM apart, with the
+warehouse in the middle, and measures Manhattan distance between them. Two
+addresses in the same ward are SAME_WARD_KM apart. These distances are a
+proxy, good enough to keep a driver's stops together and in a sensible
+order; pass real positions to WardMap when they are known.
+
+DeliveryRouter.solve() builds routes with a sweep around the warehouse,
+then improves them by local search until nothing improves (or max_rounds):
+2-opt inside each route, and relocating a stop into another route next
+to one of its nearest stops, or swapping it with one of them. There is no
+randomness and no wall clock limit, so the same stops always give the same plan.
+"""
+import math
+from typing import NamedTuple
+
+WARD_SPACING_KM = 2.0
+SAME_WARD_KM = 0.5
+DEFAULT_CAPACITY_KG = 500.0
+DEFAULT_SHIFT_HOURS = 8.0
+DEFAULT_SPEED_KMH = 20.0
+DEFAULT_SERVICE_MINUTES = 5.0
+NEIGHBOUR_WARDS = 5  # move candidates per stop: STOPS_PER_WARD stops in each of the nearest wards
+STOPS_PER_WARD = 4
+EPSILON = 1e-9
+
+
+class DeliveryStop(NamedTuple):
+    """All orders for one receiver address."""
+    ward: str
+    address: str
+    order_ids: tuple
+    weight_kg: float
+
+
+class DeliveryRoute(NamedTuple):
+    """One driver's stops in visiting order, from and back to the warehouse."""
+    stops: tuple
+    distance_km: float
+    hours: float
+    load_kg: float
+
+
+class DeliveryPlan(NamedTuple):
+    routes: list
+    unassigned: list  # stops no driver can take (too heavy, too far, or out of drivers)
+
+    @property
+    def distance_km(self):
+        return sum(route.distance_km for route in self.routes)
+
+
+class WardMap:
+    """Approximate ward positions (km) in one province; the warehouse is at `depot`."""
+
+    def __init__(self, wards, spacing_km=WARD_SPACING_KM, positions=None):
+        """
+        :param wards: Ward names, in the order to lay them out
+        :param positions: Optional {ward: (x_km, y_km)} overriding the grid
+        """
+        wards = list(dict.fromkeys(wards))
+        side = max(math.ceil(math.sqrt(len(wards))), 1)
+        self.positions = {
+            ward: ((index % side) * spacing_km, (index // side) * spacing_km)
+            for index, ward in enumerate(wards)
+        }
+        if positions:
+            self.positions.update(positions)
+        centre = (side - 1) * spacing_km / 2
+        self.depot = (centre, centre)
+
+    def position(self, ward):
+        """Position of a ward; unknown wards are placed at the warehouse."""
+        return self.positions.get(ward, self.depot)
+
+
+class DeliveryRouter:
+    """Local-search solver for one warehouse's deliveries."""
+
+    def __init__(self, ward_map, capacity_kg=DEFAULT_CAPACITY_KG, shift_hours=DEFAULT_SHIFT_HOURS,
+                 speed_kmh=DEFAULT_SPEED_KMH, service_minutes=DEFAULT_SERVICE_MINUTES,
+                 max_drivers=None, max_rounds=50):
+        self.ward_map = ward_map
+        self.capacity_kg = capacity_kg
+        self.shift_hours = shift_hours
+        self.speed_kmh = speed_kmh
+        self.service_hours = service_minutes / 60
+        self.max_drivers = max_drivers
+        self.max_rounds = max_rounds
+
+    def solve(self, stops, improve=True):
+        """
+        Plan the routes.
+        :param stops: DeliveryStop list
+        :param improve: Run the local search (False: sweep construction only)
+        :return: DeliveryPlan
+        """
+        # A fixed order makes the whole search deterministic
+        stops = sorted(stops, key=lambda stop: (stop.ward, stop.address, stop.order_ids))
+        self._prepare(stops)
+        feasible = [s for s in range(len(stops)) if self._fits_alone(s)]
+        unassigned = sorted(set(range(len(stops))) - set(feasible))
+
+        self.routes = self._sweep(feasible)
+        if improve:
+            self._improve()
+        if self.max_drivers is not None and len(self.routes) > self.max_drivers:
+            unassigned += self._drop_extra_routes()
+            if improve:
+                self._improve()
+
+        plan_routes = []
+        for route in sorted(self.routes, key=lambda r: self._angle(r[0])):
+            length = self._length(route)
+            plan_routes.append(DeliveryRoute(
+                tuple(stops[s] for s in route), length, self._hours(length, len(route)),
+                sum(self.weights[s] for s in route)
+            ))
+        return DeliveryPlan(plan_routes, [stops[s] for s in sorted(unassigned)])
+
+    # --- distances ---
+
+    def _prepare(self, stops):
+        """Index wards and precompute the ward x ward distance table; the warehouse is ward index 0."""
+        ward_index = {}
+        for stop in stops:
+            ward_index.setdefault(stop.ward, len(ward_index) + 1)
+        points = [self.ward_map.depot] + [self.ward_map.position(ward) for ward in ward_index]
+        self.table = [[abs(ax - bx) + abs(ay - by) for bx, by in points] for ax, ay in points]
+        self.points = points
+        self.ward_of = [ward_index[stop.ward] for stop in stops]
+        self.weights = [stop.weight_kg for stop in stops]
+        self.depot = len(stops)
+        self.ward_of.append(0)
+
+        # Candidate neighbours of each stop: a few stops from each of the closest wards
+        # (its own first). Stops in one ward are interchangeable, so spreading the
+        # candidates over wards and over each ward's stops reaches more routes.
+        by_ward = {}
+        for s, ward in enumerate(self.ward_of[:-1]):
+            by_ward.setdefault(ward, []).append(s)
+        self.neighbours = []
+        nearest_wards = {}
+        for s, ward in enumerate(self.ward_of[:-1]):
+            if ward not in nearest_wards:
+                nearest_wards[ward] = sorted(
+                    by_ward, key=lambda other: (self.table[ward][other], other)
+                )[:NEIGHBOUR_WARDS]
+            near = []
+            for other in nearest_wards[ward]:
+                members = by_ward[other]
+                step = max(len(members) // STOPS_PER_WARD, 1)
+                start = s % step
+                near.extend(t for t in members[start::step][:STOPS_PER_WARD] if t != s)
+            self.neighbours.append(near)
+
+    def _dist(self, a, b):
+        if a == b:
+            return 0.0
+        wa, wb = self.ward_of[a], self.ward_of[b]
+        if wa == wb:
+            return SAME_WARD_KM
+        return self.table[wa][wb]
+
+    def _length(self, route):
+        dist = self._dist
+        length = dist(self.depot, route[0]) + dist(route[-1], self.depot)
+        for a, b in zip(route, route[1:]):
+            length += dist(a, b)
+        return length
+
+    def _hours(self, length, n_stops):
+        return length / self.speed_kmh + n_stops * self.service_hours
+
+    def _fits_alone(self, s):
+        there_and_back = 2 * self._dist(self.depot, s)
+        return self.weights[s] <= self.capacity_kg and self._hours(there_and_back, 1) <= self.shift_hours
+
+    def _angle(self, s):
+        x, y = self.points[self.ward_of[s]]
+        return math.atan2(y - self.points[0][1], x - self.points[0][0])
+
+    # --- construction ---
+
+    def _sweep(self, stop_ids):
+        """Visit stops by angle around the warehouse, starting a new route when the next one does not fit."""
+        order = sorted(stop_ids, key=lambda s: (self._angle(s), self._dist(self.depot, s), s))
+        routes, route, length, load = [], [], 0.0, 0.0
+        for s in order:
+            last = route[-1] if route else self.depot
+            new_length = (length - self._dist(last, self.depot) + self._dist(last, s)
+                          + self._dist(s, self.depot))
+            if route and (load + self.weights[s] > self.capacity_kg
+                          or self._hours(new_length, len(route) + 1) > self.shift_hours):
+                routes.append(route)
+                route, length, load = [], 0.0, 0.0
+                new_length = 2 * self._dist(self.depot, s)
+            route.append(s)
+            length, load = new_length, load + self.weights[s]
+        if route:
+            routes.append(route)
+        return routes
+
+    # --- local search ---
+
+    def _improve(self):
+        self.route_of = {}
+        for number, route in enumerate(self.routes):
+            for s in route:
+                self.route_of[s] = number
+        self.lengths = [self._length(route) for route in self.routes]
+        self.loads = [sum(self.weights[s] for s in route) for route in self.routes]
+
+        dirty = set(range(len(self.routes)))
+        for _ in range(self.max_rounds):
+            for number in sorted(dirty):
+                if self.routes[number]:
+                    self._two_opt(number)
+            dirty = self._relocate_pass()
+            if not dirty:
+                break
+        self.routes = [route for route in self.routes if route]
+
+    def _two_opt(self, number):
+        """Reverse segments of one route while that shortens it."""
+        dist = self._dist
+        seq = [self.depot] + self.routes[number] + [self.depot]
+        improved = True
+        while improved:
+            improved = False
+            for i in range(1, len(seq) - 2):
+                a, b = seq[i - 1], seq[i]
+                d_ab = dist(a, b)
+                for j in range(i + 1, len(seq) - 1):
+                    c, d = seq[j], seq[j + 1]
+                    if dist(a, c) + dist(b, d) < d_ab + dist(c, d) - EPSILON:
+                        seq[i:j + 1] = seq[i:j + 1][::-1]
+                        b = seq[i]
+                        d_ab = dist(a, b)
+                        improved = True
+        self.routes[number] = seq[1:-1]
+        self.lengths[number] = self._length(self.routes[number])
+
+    def _relocate_pass(self):
+        """
+        Move each stop to another route, next to one of its nearest stops, when
+        that shortens the total distance and the target route stays within limits.
+        :return: Numbers of the routes that changed
+        """
+        dist, depot = self._dist, self.depot
+        changed = set()
+        for s in range(len(self.neighbours)):
+            source = self.route_of.get(s)
+            if source is None:
+                continue
+            route = self.routes[source]
+            pos = route.index(s)
+            prev = route[pos - 1] if pos > 0 else depot
+            nxt = route[pos + 1] if pos + 1 < len(route) else depot
+            gain = dist(prev, s) + dist(s, nxt) - dist(prev, nxt)
+
+            best = None
+            for t in self.neighbours[s]:
+                target = self.route_of.get(t)
+                if target is None or target == source:
+                    continue
+                if self.loads[target] + self.weights[s] > self.capacity_kg:
+                    continue
+                other = self.routes[target]
+                t_pos = other.index(t)
+                before = other[t_pos - 1] if t_pos > 0 else depot
+                after = other[t_pos + 1] if t_pos + 1 < len(other) else depot
+                for insert_at, u, v in ((t_pos, before, t), (t_pos + 1, t, after)):
+                    cost = dist(u, s) + dist(s, v) - dist(u, v)
+                    delta = cost - gain
+                    if delta < -EPSILON and (best is None or delta < best[0]):
+                        if self._hours(self.lengths[target] + cost, len(other) + 1) <= self.shift_hours:
+                            best = (delta, target, insert_at, cost)
+            if best is None:
+                if self._swap(s, source, pos, prev, nxt):
+                    changed.add(source)
+                    changed.add(self.route_of[s])
+                continue
+
+            _, target, insert_at, cost = best
+            route.pop(pos)
+            self.routes[target].insert(insert_at, s)
+            self.route_of[s] = target
+            self.lengths[source] -= gain
+            self.lengths[target] += cost
+            self.loads[source] -= self.weights[s]
+            self.loads[target] += self.weights[s]
+            changed.update((source, target))
+        return changed
+
+    def _swap(self, s, source, pos, prev, nxt):
+        """
+        Exchange s with one of its nearest stops in another route, when that
+        shortens the total distance and both routes stay within limits.
+        :return: True if the routes changed
+        """
+        dist, depot = self._dist, self.depot
+        route = self.routes[source]
+        best = None
+        for t in self.neighbours[s]:
+            target = self.route_of.get(t)
+            if target is None or target == source:
+                continue
+            weight_change = self.weights[t] - self.weights[s]
+            if (self.loads[source] + weight_change > self.capacity_kg
+                    or self.loads[target] - weight_change > self.capacity_kg):
+                continue
+            other = self.routes[target]
+            t_pos = other.index(t)
+            before = other[t_pos - 1] if t_pos > 0 else depot
+            after = other[t_pos + 1] if t_pos + 1 < len(other) else depot
+            source_change = dist(prev, t) + dist(t, nxt) - dist(prev, s) - dist(s, nxt)
+            target_change = dist(before, s) + dist(s, after) - dist(before, t) - dist(t, after)
+            delta = source_change + target_change
+            if delta < -EPSILON and (best is None or delta < best[0]):
+                if (self._hours(self.lengths[source] + source_change, len(route)) <= self.shift_hours
+                        and self._hours(self.lengths[target] + target_change, len(other)) <= self.shift_hours):
+                    best = (delta, t, target, t_pos, source_change, target_change)
+        if best is None:
+            return False
+
+        _, t, target, t_pos, source_change, target_change = best
+        route[pos], self.routes[target][t_pos] = t, s
+        self.route_of[s], self.route_of[t] = target, source
+        self.lengths[source] += source_change
+        self.lengths[target] += target_change
+        weight_change = self.weights[t] - self.weights[s]
+        self.loads[source] += weight_change
+        self.loads[target] -= weight_change
+        return True
+
+    def _drop_extra_routes(self):
+        """
+        Keep max_drivers routes: empty the smallest ones and insert their stops
+        where they fit best in the others.
+        :return: Stops that fit nowhere
+        """
+        keep = sorted(self.routes, key=lambda r: (-len(r), min(r)))[:self.max_drivers]
+        dropped = sorted(s for route in self.routes if route not in keep for s in route)
+        self.routes = keep
+        left = []
+        for s in sorted(dropped, key=lambda s: (-self.weights[s], s)):
+            best = None
+            for number, route in enumerate(self.routes):
+                if sum(self.weights[t] for t in route) + self.weights[s] > self.capacity_kg:
+                    continue
+                length = self._length(route)
+                seq = [self.depot] + route + [self.depot]
+                for i in range(1, len(seq)):
+                    cost = self._dist(seq[i - 1], s) + self._dist(s, seq[i]) - self._dist(seq[i - 1], seq[i])
+                    if (best is None or cost < best[0]) and \
+                            self._hours(length + cost, len(route) + 1) <= self.shift_hours:
+                        best = (cost, number, i - 1)
+            if best is None:
+                left.append(s)
+            else:
+                self.routes[best[1]].insert(best[2], s)
+        return left
@@ -0,0 +1,246 @@
+# services/dispatch_service.py
+"""
+Vehicle load planning for orders waiting to ship.
+
+plan_dispatch() groups the pending orders by warehouse, route (the warehouse's
+province, or the sender province for orders outside a warehouse, to the
+receiver province) and item type, so fragile, frozen and dangerous goods never
+share a vehicle with anything else. Each group is bin-packed first-fit
+decreasing on weight and volume into the vehicle type for its item type.
+dispatch() then moves the orders of the chosen manifests to 'Shipping'.
+
+plan_deliveries() plans the last mile: the drivers' stop sequences for the
+orders a warehouse delivers inside its own province (services/delivery_routing.py).
+"""
+import re
+from functools import lru_cache
+from dataclasses import dataclass, field
+from typing import NamedTuple, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from database.unit_of_work import get_session
+from models.order import Order
+from models.warehouse import Warehouse
+from services.delivery_routing import DeliveryRouter, DeliveryStop, WardMap
+from services.order_service import OrderService
+from services.route_service import RouteService
+from services.ward_service import WardService
+
+
+class Vehicle(NamedTuple):
+    name: str
+    max_weight_kg: float
+    max_volume_m3: float
+
+
+VEHICLES = {
+    "truck": Vehicle("Xe tải 1.5 tấn", 1500.0, 8.0),
+    "reefer": Vehicle("Xe đông lạnh 1 tấn", 1000.0, 5.0),
+    "hazmat": Vehicle("Xe chở hàng nguy hiểm 1 tấn", 1000.0, 6.0),
+}
+# item_type -> VEHICLES key; item types not listed go by truck
+VEHICLE_FOR_ITEM_TYPE = {"normal": "truck", "fragile": "truck", "frozen": "reefer", "dangerous": "hazmat"}
+
+DISPATCH_STATUSES = ("New", "Processing")
+DISPATCHED_STATUS = "Shipping"
+# Orders a warehouse still has to deliver to their receivers
+DELIVERY_STATUSES = ("Processing", "Shipping")
+
+_DIMENSIONS = re.compile(r"(\d+(?:[.,]\d+)?)\s*[x×*]\s*(\d+(?:[.,]\d+)?)\s*[x×*]\s*(\d+(?:[.,]\d+)?)", re.IGNORECASE)
+
+
+@lru_cache(maxsize=65536)
+def _package_volume_m3(dimensions):
+    match = _DIMENSIONS.search(dimensions or "")
+    if not match:
+        return 0.0
+    d, r, c = (float(value.replace(",", ".")) for value in match.groups())
+    return d * r * c / 1_000_000
+
+
+def parse_volume_m3(dimensions, package_count=1):
+    """
+    Volume of an order from its "DxRxC cm" dimensions (per package) in m³.
+    Unreadable or missing dimensions count as 0, so only the weight limits the load.
+    """
+    return _package_volume_m3(dimensions) * max(package_count or 1, 1)
+
+
+@dataclass
+class Manifest:
+    """One vehicle load."""
+    warehouse_id: Optional[int]
+    origin: str
+    dest: str
+    item_type: str
+    vehicle: Vehicle
+    order_ids: list = field(default_factory=list)
+    weight_kg: float = 0.0
+    volume_m3: float = 0.0
+    distance_km: Optional[float] = None
+    est_hours: Optional[float] = None
+
+    @property
+    def weight_utilization(self):
+        return self.weight_kg / self.vehicle.max_weight_kg
+
+    @property
+    def volume_utilization(self):
+        return self.volume_m3 / self.vehicle.max_volume_m3
+
+    @property
+    def oversized(self):
+        """A single order that exceeds the vehicle on its own."""
+        return self.weight_kg > self.vehicle.max_weight_kg or self.volume_m3 > self.vehicle.max_volume_m3
+
+
+class DispatchService:
+    """Plan vehicle loads for pending orders and dispatch them."""
+
+    def load_pending_orders(self, statuses=DISPATCH_STATUSES, warehouse_id=None):
+        """
+        Orders waiting to ship, as plain tuples
+        (id, warehouse_id, origin, dest, item_type, weight, volume_m3).
+        """
+        session: Session = get_session()
+        try:
+            query = select(
+                Order.id, Order.current_warehouse_id, Warehouse.province, Order.sender_province,
+                Order.receiver_province, Order.item_type, Order.weight, Order.dimensions, Order.package_count
+            ).outerjoin(Warehouse, Warehouse.id == Order.current_warehouse_id).where(Order.status.in_(statuses))
+            if warehouse_id is not None:
+                query = query.where(Order.current_warehouse_id == warehouse_id)
+            return [
+                (order_id, wh_id, wh_province or sender, receiver, item_type or "normal",
+                 weight or 0.0, parse_volume_m3(dimensions, package_count))
+                for order_id, wh_id, wh_province, sender, receiver, item_type, weight, dimensions, package_count
+                in session.execute(query.order_by(Order.id))
+            ]
+        except Exception as e:
+            print(f"Error loading pending orders: {e}")
+            return []
+        finally:
+            session.close()
+
+    def plan_dispatch(self, statuses=DISPATCH_STATUSES, warehouse_id=None, orders=None):
+        """
+        Pack the pending orders into vehicle loads.
+        :param statuses: Order statuses that count as waiting to ship
+        :param warehouse_id: Only plan orders stored in this warehouse
+        :param orders: Tuples as returned by load_pending_orders (default: load them)
+        :return: List of Manifest, grouped by warehouse, route and item type
+        """
+        if orders is None:
+            orders = self.load_pending_orders(statuses, warehouse_id)
+        groups = {}
+        for order_id, wh_id, origin, dest, item_type, weight, volume in orders:
+            groups.setdefault((wh_id, origin, dest, item_type), []).append((order_id, weight, volume))
+
+        routes = RouteService()
+        manifests = []
+        for (wh_id, origin, dest, item_type), items in sorted(groups.items(), key=lambda g: str(g[0])):
+            vehicle = VEHICLES[VEHICLE_FOR_ITEM_TYPE.get(item_type, "truck")]
+            estimate = routes.route_estimate(origin, dest)
+            for order_ids, weight, volume in self._pack(items, vehicle):
+                manifests.append(Manifest(
+                    wh_id, origin, dest, item_type, vehicle, order_ids, weight, volume,
+                    estimate.distance_km if estimate else None, estimate.est_hours if estimate else None
+                ))
+        return manifests
+
+    @staticmethod
+    def _pack(items, vehicle):
+        """
+        First-fit decreasing on two dimensions: orders sorted by their larger share
+        of the vehicle's weight or volume limit, each put in the first load with room.
+        :return: List of (order_ids, weight, volume) loads
+        """
+        max_weight, max_volume = vehicle.max_weight_kg, vehicle.max_volume_m3
+        items.sort(key=lambda item: max(item[1] / max_weight, item[2] / max_volume), reverse=True)
+        loads = []  # [free_weight, free_volume, order_ids, weight, volume]
+        # Loads that still have room; a load leaves once nearly full so later, smaller orders skip it
+        open_loads = []
+        min_weight = min(item[1] for item in items)
+        for order_id, weight, volume in items:
+            for load in open_loads:
+                if weight <= load[0] and volume <= load[1]:
+                    break
+            else:
+                load = [max_weight, max_volume, [], 0.0, 0.0]
+                loads.append(load)
+                open_loads.append(load)
+            load[0] -= weight
+            load[1] -= volume
+            load[2].append(order_id)
+            load[3] += weight
+            load[4] += volume
+            if load[0] < min_weight or load[1] <= 0:
+                open_loads.remove(load)
+        return [(order_ids, weight, volume) for _, _, order_ids, weight, volume in loads]
+
+    def dispatch(self, manifests, changed_by=None):
+        """
+        Move the orders of the given manifests to 'Shipping' in one bulk status
+        change; each order's history note names its vehicle.
+        :return: (success, message)
+        """
+        notes = {}
+        for number, manifest in enumerate(manifests, start=1):
+            note = (f"Xe {number}/{len(manifests)} ({manifest.vehicle.name}): "
+                    f"{manifest.origin} → {manifest.dest}, {manifest.weight_kg:.1f} kg")
+            notes.update(dict.fromkeys(manifest.order_ids, note))
+        success, message, changed = OrderService().update_orders_status(
+            list(notes), DISPATCHED_STATUS, changed_by=changed_by, note=notes
+        )
+        if not success:
+            return False, f"Lỗi: {message}"
+        return True, f"Đã xuất {len(changed)} đơn trên {len(manifests)} xe"
+
+    def load_deliveries(self, warehouse_id, statuses=DELIVERY_STATUSES):
+        """
+        Orders stored in a warehouse and addressed to its own province, merged
+        into one stop per receiver ward and address.
+        :return: (warehouse, [DeliveryStop]), or (None, []) if the warehouse does not exist
+        """
+        session: Session = get_session()
+        try:
+            warehouse = session.get(Warehouse, warehouse_id)
+            if warehouse is None:
+                return None, []
+            rows = session.execute(
+                select(Order.id, Order.receiver_ward, Order.receiver_address, Order.weight).where(
+                    Order.current_warehouse_id == warehouse_id,
+                    Order.receiver_province == warehouse.province,
+                    Order.status.in_(statuses)
+                ).order_by(Order.id)
+            )
+            stops = {}
+            for order_id, ward, address, weight in rows:
+                key = (ward or "", (address or "").strip())
+                order_ids, total = stops.get(key, ((), 0.0))
+                stops[key] = (order_ids + (order_id,), total + (weight or 0.0))
+            return warehouse, [
+                DeliveryStop(ward, address, order_ids, weight)
+                for (ward, address), (order_ids, weight) in stops.items()
+            ]
+        except Exception as e:
+            print(f"Error loading deliveries: {e}")
+            return None, []
+        finally:
+            session.close()
+
+    def plan_deliveries(self, warehouse_id, statuses=DELIVERY_STATUSES, **limits):
+        """
+        Plan the drivers' delivery routes out of one warehouse.
+        :param statuses: Order statuses still to deliver
+        :param limits: DeliveryRouter options (capacity_kg, shift_hours, speed_kmh,
+                       service_minutes, max_drivers, max_rounds)
+        :return: DeliveryPlan, or None if the warehouse does not exist
+        """
+        warehouse, stops = self.load_deliveries(warehouse_id, statuses)
+        if warehouse is None:
+            return None
+        ward_map = WardMap(WardService().get_wards(warehouse.province))
+        return DeliveryRouter(ward_map, **limits).solve(stops)
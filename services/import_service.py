@@ -0,0 +1,423 @@
+# services/import_service.py
+"""
+Bulk order import from partner manifests (CSV or Excel).
+
+The file is streamed row by row (csv module / read-only openpyxl) and handled
+in chunks: each chunk is validated, de-duplicated against the file and the
+database, priced and inserted with one executemany, then committed. After each
+commit a checkpoint file records how many rows are done, so a crashed or
+cancelled import resumes where it stopped. Rejected rows go to an error report
+CSV next to the source file.
+
+Just before a chunk commits, the checkpoint lists the tracking codes it
+inserts. If the process dies between that commit and the next checkpoint, the
+resumed run finds those codes in the database and counts them as imported
+rather than as duplicates, and the error report is cut back to its size at the
+last checkpoint before the chunk is checked again.
+"""
+import csv
+import json
+import math
+import os
+from datetime import datetime
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from database.unit_of_work import get_session
+from models.order import Order
+from services.batching import chunked
+from services.route_service import RouteService
+from services.transport_service import TransportService
+from services.ward_service import WardService
+
+
+class ImportService:
+    """Validate and insert orders from CSV/xlsx files in chunks."""
+
+    CHUNK_SIZE = 5000
+
+    # Accepted header names -> Order field (Order field names themselves are accepted too)
+    COLUMN_ALIASES = {
+        "mã vận đơn": "tracking_code", "mã đơn": "tracking_code",
+        "người gửi": "sender_name", "sđt người gửi": "sender_phone", "email người gửi": "sender_email",
+        "địa chỉ gửi": "sender_address", "tỉnh gửi": "sender_province", "phường/xã gửi": "sender_ward",
+        "người nhận": "receiver_name", "sđt người nhận": "receiver_phone", "email người nhận": "receiver_email",
+        "địa chỉ nhận": "receiver_address", "tỉnh nhận": "receiver_province", "phường/xã nhận": "receiver_ward",
+        "tên hàng": "item_name", "loại hàng": "item_type", "số kiện": "package_count",
+        "khối lượng": "weight", "khối lượng (kg)": "weight", "kích thước": "dimensions",
+        "dịch vụ": "service_type", "ghi chú": "delivery_note", "người trả phí": "payment_type",
+        "phí vận chuyển": "shipping_cost", "tiền thu hộ": "cod_amount", "cod": "cod_amount",
+    }
+
+    # Field -> accepted values (codes, plus the Vietnamese labels used in the dialogs)
+    CHOICES = {
+        "item_type": {"normal": "normal", "fragile": "fragile", "frozen": "frozen", "dangerous": "dangerous",
+                      "thường": "normal", "dễ vỡ": "fragile", "đông lạnh": "frozen", "nguy hiểm": "dangerous"},
+        "service_type": {"standard": "standard", "express": "express", "urgent": "urgent",
+                         "tiêu chuẩn": "standard", "nhanh": "express", "hoả tốc": "urgent", "hỏa tốc": "urgent"},
+        "payment_type": {"sender": "sender", "receiver": "receiver",
+                         "người gửi trả": "sender", "người nhận trả": "receiver"},
+    }
+
+    TEXT_FIELDS = [
+        "tracking_code", "sender_name", "sender_phone", "sender_email", "sender_address",
+        "sender_province", "sender_ward", "receiver_name", "receiver_phone", "receiver_email",
+        "receiver_address", "receiver_province", "receiver_ward", "item_name", "dimensions", "delivery_note"
+    ]
+
+    ERROR_COLUMNS = ["row", "tracking_code", "error"]
+
+    def __init__(self):
+        wards = WardService()
+        self.provinces = set(wards.get_provinces())
+        self.wards = {province: set(wards.get_wards(province)) for province in self.provinces}
+        self.transport = TransportService()
+
+    # ---- Public API ----
+
+    def import_file(self, file_path, progress=None, is_cancelled=None, restart=False):
+        """
+        Import orders from a .csv or .xlsx file.
+        :param progress: Optional callback progress(rows_done, total_rows or 0)
+        :param is_cancelled: Optional callable; checked between chunks, a cancelled
+                             import keeps its checkpoint and can be resumed
+        :param restart: Ignore an existing checkpoint and start from the first row
+        :return: (success, message, summary) - summary has rows, imported, failed,
+                 resumed_from, cancelled and error_report (path or None)
+        """
+        checkpoint_path = file_path + ".import.json"
+        error_path = file_path + ".errors.csv"
+        signature = self._file_signature(file_path)
+
+        checkpoint = None if restart else self._load_checkpoint(checkpoint_path, signature)
+        if checkpoint is None:
+            checkpoint = {"signature": signature, "rows_done": 0, "imported": 0, "failed": 0, "errors_size": 0}
+        self._truncate_errors(error_path, checkpoint.get("errors_size"))
+        resumed_from = checkpoint["rows_done"]
+        # Codes of a chunk committed after the last checkpoint was written
+        imported_codes = set(checkpoint.pop("pending", None) or [])
+
+        def before_commit(codes):
+            self._save_checkpoint(checkpoint_path, dict(checkpoint, pending=codes))
+
+        summary = {
+            "rows": resumed_from, "imported": checkpoint["imported"], "failed": checkpoint["failed"],
+            "resumed_from": resumed_from, "cancelled": False, "error_report": None
+        }
+        try:
+            total = self._count_rows(file_path)
+            tariffs = self._load_tariffs()
+            seen_codes = set()
+            rows = self._read_rows(file_path)
+
+            for chunk in self._chunks(rows, self.CHUNK_SIZE):
+                if is_cancelled and is_cancelled():
+                    summary["cancelled"] = True
+                    break
+
+                last_row = chunk[-1][0]
+                if last_row <= resumed_from:
+                    # Done before the crash; only remember the codes for duplicate checks
+                    seen_codes.update(self._clean(raw.get("tracking_code")) for _, raw in chunk)
+                    continue
+                chunk = [(row_number, raw) for row_number, raw in chunk if row_number > resumed_from]
+
+                imported, errors = self._import_chunk(chunk, tariffs, seen_codes, imported_codes, before_commit)
+                if errors:
+                    self._append_errors(error_path, errors)
+
+                checkpoint["rows_done"] = last_row
+                checkpoint["imported"] += imported
+                checkpoint["failed"] += len(errors)
+                checkpoint["errors_size"] = os.path.getsize(error_path) if os.path.exists(error_path) else 0
+                self._save_checkpoint(checkpoint_path, checkpoint)
+                imported_codes.clear()
+
+                summary.update(rows=last_row, imported=checkpoint["imported"], failed=checkpoint["failed"])
+                if progress:
+                    progress(last_row, total or 0)
+        except Exception as e:
+            # Committed chunks stay imported; the checkpoint lets the next run resume
+            return False, f"Import failed after {summary['rows']} rows: {e}", summary
+
+        if os.path.exists(error_path):
+            summary["error_report"] = error_path
+        if summary["cancelled"]:
+            return False, f"Import cancelled after {summary['rows']} rows (run again to resume)", summary
+
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        return (
+            True,
+            f"Imported {summary['imported']} orders, {summary['failed']} rows rejected",
+            summary
+        )
+
+    # ---- Reading ----
+
+    def _read_rows(self, file_path):
+        """Yield (row_number, {field: raw value}) with row_number counting data rows from 1."""
+        if file_path.lower().endswith((".xlsx", ".xlsm")):
+            yield from self._read_xlsx(file_path)
+        else:
+            yield from self._read_csv(file_path)
+
+    def _read_csv(self, file_path):
+        with open(file_path, newline="", encoding="utf-8-sig") as f:
+            reader = csv.reader(f)
+            fields = self._map_header(next(reader, []))
+            for row_number, values in enumerate(reader, start=1):
+                if any(values):
+                    yield row_number, self._row_dict(fields, values)
+
+    def _read_xlsx(self, file_path):
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            fields = self._map_header(next(rows, ()))
+            for row_number, values in enumerate(rows, start=1):
+                if any(v is not None and v != "" for v in values):
+                    yield row_number, self._row_dict(fields, values)
+        finally:
+            workbook.close()
+
+    def _map_header(self, header):
+        """Header cells -> Order field names (None for unknown columns)."""
+        order_fields = set(Order.__table__.columns.keys())
+        fields = []
+        for cell in header:
+            name = str(cell or "").strip().lower()
+            field = self.COLUMN_ALIASES.get(name, name if name in order_fields else None)
+            fields.append(field)
+        if "tracking_code" not in fields:
+            raise ValueError("File has no tracking code column (tracking_code / Mã vận đơn)")
+        return fields
+
+    @staticmethod
+    def _row_dict(fields, values):
+        return {field: value for field, value in zip(fields, values) if field}
+
+    def _count_rows(self, file_path):
+        """Data row count for progress (approximate for CSV with multi-line cells)."""
+        if file_path.lower().endswith((".xlsx", ".xlsm")):
+            from openpyxl import load_workbook
+            workbook = load_workbook(file_path, read_only=True)
+            try:
+                max_row = workbook.active.max_row
+            finally:
+                workbook.close()
+            return max(max_row - 1, 0) if max_row else 0
+
+        lines = 0
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                lines += block.count(b"\n")
+        return max(lines - 1, 0)
+
+    @staticmethod
+    def _chunks(rows, size):
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    # ---- Validation, pricing and insert ----
+
+    def _import_chunk(self, chunk, tariffs, seen_codes, imported_codes, before_commit):
+        """
+        Validate, price and insert one chunk in its own transaction.
+        :param imported_codes: Codes this file inserted before a crash; found in the
+                               database they count as imported, not as duplicates
+        :param before_commit: Callback before_commit(codes inserted), run before the commit
+        :return: (number imported, list of error rows)
+        """
+        valid = []
+        errors = []
+        for row_number, raw in chunk:
+            values, problems = self._validate(raw)
+            code = values.get("tracking_code")
+            if code and code in seen_codes:
+                problems.append("Mã vận đơn bị trùng trong file")
+            if problems:
+                errors.append([row_number, code or "", "; ".join(problems)])
+                continue
+            seen_codes.add(code)
+            if values.get("shipping_cost") is None:
+                values["shipping_cost"] = self._price(tariffs, values)
+            valid.append((row_number, values))
+
+        session: Session = get_session()
+        try:
+            existing = set()
+            for codes in chunked([values["tracking_code"] for _, values in valid]):
+                existing.update(
+                    code for (code,) in session.query(Order.tracking_code).filter(Order.tracking_code.in_(codes))
+                )
+            rows = []
+            already_imported = 0
+            for row_number, values in valid:
+                if values["tracking_code"] in imported_codes and values["tracking_code"] in existing:
+                    already_imported += 1
+                elif values["tracking_code"] in existing:
+                    errors.append([row_number, values["tracking_code"], "Mã vận đơn đã tồn tại"])
+                else:
+                    rows.append(values)
+            if rows:
+                session.execute(insert(Order.__table__), rows)
+                before_commit([values["tracking_code"] for values in rows])
+            session.commit()
+            return len(rows) + already_imported, errors
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def _validate(self, raw):
+        """
+        Turn one raw row into Order values.
+        :return: (values, list of problems)
+        """
+        problems = []
+        values = {field: self._clean(raw.get(field)) for field in self.TEXT_FIELDS}
+        values["created_at"] = datetime.now()
+        values["status"] = "New"
+        values["order_type"] = "domestic"
+
+        if not values["tracking_code"]:
+            problems.append("Thiếu mã vận đơn")
+
+        for side in ("sender", "receiver"):
+            province = values[f"{side}_province"]
+            ward = values[f"{side}_ward"]
+            label = "gửi" if side == "sender" else "nhận"
+            if not province:
+                problems.append(f"Thiếu tỉnh {label}")
+            elif province not in self.provinces:
+                problems.append(f"Tỉnh {label} không hợp lệ: {province}")
+            elif ward and ward not in self.wards[province]:
+                problems.append(f"Phường/xã {label} không thuộc {province}: {ward}")
+
+        for field, default in (("item_type", "normal"), ("service_type", "standard"), ("payment_type", "sender")):
+            text = self._clean(raw.get(field))
+            if not text:
+                values[field] = default
+            elif text.lower() in self.CHOICES[field]:
+                values[field] = self.CHOICES[field][text.lower()]
+            else:
+                problems.append(f"Giá trị {field} không hợp lệ: {text}")
+
+        values["weight"] = self._number(raw.get("weight"), "Khối lượng", problems, default=0.0)
+        package_count = self._number(raw.get("package_count"), "Số kiện", problems, default=1)
+        if package_count != int(package_count):
+            problems.append(f"Số kiện phải là số nguyên: {raw.get('package_count')}")
+        values["package_count"] = int(package_count)
+        values["cod_amount"] = self._number(raw.get("cod_amount"), "Tiền thu hộ", problems, default=0.0)
+        values["has_cod"] = values["cod_amount"] > 0
+        values["shipping_cost"] = self._number(raw.get("shipping_cost"), "Phí vận chuyển", problems, default=None)
+        return values, problems
+
+    @staticmethod
+    def _clean(value):
+        if value is None:
+            return ""
+        return str(value).strip()
+
+    def _number(self, value, label, problems, default):
+        """
+        Parse a number cell. A single comma is the decimal separator ("2,5" kg), several
+        commas separate thousands ("1,250,000"); a comma followed by exactly three digits,
+        or mixed with a dot, could be either and is reported instead of guessed.
+        """
+        text = self._clean(value)
+        if not text:
+            return default
+        if "," in text:
+            whole, *groups = text.split(",")
+            if "." in text or (len(groups) == 1 and len(groups[0]) == 3 and groups[0].isdigit()):
+                problems.append(f"{label} có dấu phân cách không rõ ràng: {value}")
+                return default or 0.0
+            if len(groups) == 1:
+                text = f"{whole}.{groups[0]}"
+            elif all(len(group) == 3 for group in groups):
+                text = whole + "".join(groups)
+            else:
+                problems.append(f"{label} không phải số: {value}")
+                return default or 0.0
+        try:
+            number = float(text)
+        except ValueError:
+            problems.append(f"{label} không phải số: {value}")
+            return default or 0.0
+        # float() also accepts "nan", "inf" and overflowing values such as "1e400"
+        if not math.isfinite(number):
+            problems.append(f"{label} không phải số hữu hạn: {value}")
+            return default or 0.0
+        if number < 0:
+            problems.append(f"{label} không được âm")
+        return number
+
+    @staticmethod
+    def _load_tariffs():
+        """(origin, dest) -> RouteTariff for every route (the shared pricing index)."""
+        return RouteService.pricing_index()
+
+    def _price(self, tariffs, values):
+        """Direct or multi-hop route tariff when one exists, the standard weight table otherwise."""
+        origin, dest = values["sender_province"], values["receiver_province"]
+        # A multi-hop route (PlannedRoute) prices the same way as a direct one
+        tariff = tariffs.get((origin, dest)) or RouteService.route_planner().path(origin, dest)
+        if tariff:
+            return tariff.calculate_shipping_cost(values["weight"])
+        return self.transport.calculate_shipping_fee(values["weight"])
+
+    # ---- Checkpoint and error report ----
+
+    @staticmethod
+    def _file_signature(file_path):
+        stat = os.stat(file_path)
+        return {"path": os.path.abspath(file_path), "size": stat.st_size, "mtime": stat.st_mtime}
+
+    @staticmethod
+    def _load_checkpoint(checkpoint_path, signature):
+        """Return the saved checkpoint if it belongs to this exact file, else None."""
+        try:
+            with open(checkpoint_path, encoding="utf-8") as f:
+                checkpoint = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return checkpoint if checkpoint.get("signature") == signature else None
+
+    @staticmethod
+    def _save_checkpoint(checkpoint_path, checkpoint):
+        # Write then rename, so a crash never leaves a half-written checkpoint
+        tmp_path = checkpoint_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp_path, checkpoint_path)
+
+    @staticmethod
+    def _truncate_errors(error_path, size):
+        """Cut the error report back to its size at the checkpoint (0: no report yet)."""
+        if size is None or not os.path.exists(error_path):
+            return
+        if not size:
+            os.remove(error_path)
+            return
+        with open(error_path, "r+b") as f:
+            f.truncate(size)
+
+    def _append_errors(self, error_path, errors):
+        new_file = not os.path.exists(error_path)
+        with open(error_path, "a", newline="", encoding="utf-8-sig" if new_file else "utf-8") as f:
+            writer = csv.writer(f)
+            if new_file:
+                writer.writerow(self.ERROR_COLUMNS)
+            writer.writerows(errors)
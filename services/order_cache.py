@@ -0,0 +1,77 @@
+# services/order_cache.py
+"""
+Read-through cache for OrderService.get_order_by_id.
+
+Entries are the order dicts get_order_by_id returns, keyed by order ID, in an
+LRU cache of ORDER_CACHE_SIZE entries that expire after ORDER_CACHE_TTL
+seconds. Every service method that changes orders invalidates the affected
+IDs right after its commit; a rollback clears the whole cache, because a unit
+of work may have cached rows it later threw away. The TTL bounds how long a
+change made outside the app (another process, manual SQL) stays invisible.
+"""
+import threading
+
+from cachetools import TTLCache
+from sqlalchemy import event
+
+from database.db_connection import SessionLocal
+
+ORDER_CACHE_SIZE = 1024
+ORDER_CACHE_TTL = 60  # seconds
+
+
+class OrderCache:
+    """Thread-safe LRU + TTL cache of order dicts with hit/miss counters."""
+
+    def __init__(self, maxsize=ORDER_CACHE_SIZE, ttl=ORDER_CACHE_TTL):
+        self._lock = threading.Lock()
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, order_id):
+        """Copy of the cached order dict, or None on a miss."""
+        with self._lock:
+            order = self._cache.get(order_id)
+            if order is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return dict(order)
+
+    def put(self, order_id, order):
+        with self._lock:
+            self._cache[order_id] = dict(order)
+
+    def invalidate(self, order_ids):
+        """Drop the given order IDs (any iterable)."""
+        with self._lock:
+            for order_id in order_ids:
+                if self._cache.pop(order_id, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self.invalidations += len(self._cache)
+            self._cache.clear()
+
+    def stats(self):
+        """Counters since start-up: hits, misses, invalidations, hit_rate, size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'size': len(self._cache),
+            }
+
+
+order_cache = OrderCache()
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _clear_on_rollback(_session):
+    order_cache.clear()
@@ -1,20 +1,58 @@
 # services/order_service.py
+from sqlalchemy import bindparam, case, func, insert, or_, select, tuple_, update
 from sqlalchemy.orm import Session
-from database.db_connection import SessionLocal
+from database.unit_of_work import get_session
+from database import order_search
 from models.order import Order
+from services.batching import chunked
+from services.order_cache import order_cache
 
 class OrderService:
+    # Columns needed to render one row of the main order table
+    TABLE_COLUMNS = (
+        Order.id, Order.tracking_code, Order.status,
+        Order.sender_name, Order.receiver_name,
+        Order.sender_province, Order.receiver_province,
+        Order.package_count, Order.weight,
+        Order.shipping_cost, Order.has_cod, Order.cod_amount,
+        Order.created_at
+    )
+
+    # Table sort keys -> Order attribute ('total' is computed in _sort_expression)
+    SORT_KEYS = {
+        "tracking_code": "tracking_code",
+        "status": "status",
+        "parties": "sender_name",
+        "route": "sender_province",
+        "package": "weight",
+        "created_at": "created_at"
+    }
+
+    # Fields the filter bar searches (search_orders searches every indexed field)
+    FILTER_SEARCH_COLUMNS = [
+        "tracking_code", "sender_name", "receiver_name", "sender_phone", "receiver_phone"
+    ]
+
     def __init__(self):
         pass
 
-    def create_order(self, data: dict):
+    def create_order(self, data: dict, check_capacity=True):
         """
         Create a new order and save it to the database.
         :param data: Dictionary containing order details
+        :param check_capacity: Refuse the order if its warehouse is full (off when undo restores an order)
         :return: (success, message, order_id)
         """
-        session: Session = SessionLocal()
+        session: Session = get_session()
         try:
+            warehouse_id = data.get("current_warehouse_id")
+            if warehouse_id and check_capacity:
+                from models.warehouse import Warehouse
+                warehouse = session.query(Warehouse).filter(Warehouse.id == warehouse_id).first()
+                if warehouse and warehouse.is_full():
+                    return False, (f"Warehouse {warehouse.name} is full "
+                                   f"({warehouse.current_load}/{warehouse.capacity})"), None
+
             new_order = Order(
                 tracking_code=data.get("tracking_code"),
                 order_type=data.get("order_type", "domestic"),
@@ -47,6 +85,7 @@ class OrderService:
             session.add(new_order)
             session.commit()
             order_id = new_order.id
+            order_cache.invalidate([order_id])
             return True, "Order added successfully", order_id
         except Exception as e:
             session.rollback()
@@ -58,7 +97,7 @@ class OrderService:
         """
         Retrieve all orders from the database.
         """
-        session: Session = SessionLocal()
+        session: Session = get_session()
         try:
             orders = session.query(Order).all()
             return orders
@@ -108,26 +147,30 @@ class OrderService:
     def search_orders(self, query: str):
         """
         Search orders by multiple fields.
+        Results are ranked by relevance when the full-text index is available.
         :param query: Search keyword
         :return: List of matching orders
         """
-        session: Session = SessionLocal()
+        session: Session = get_session()
         try:
             if not query or not query.strip():
                 return self.get_all_orders()
 
-            search_pattern = f"%{query.strip()}%"
+            match_query = order_search.build_match_query(query)
+            if match_query and order_search.is_available(session):
+                # Join the FTS hits so results come back best match first
+                hits = order_search.match_subquery(match_query)
+                orders = session.query(Order).join(
+                    hits, hits.c.order_id == Order.id
+                ).order_by(hits.c.rank).all()
+                if query.strip().isdigit():
+                    # Order ID is not part of the text index
+                    by_id = session.query(Order).filter(Order.id == int(query.strip())).first()
+                    if by_id and by_id not in orders:
+                        orders.insert(0, by_id)
+                return orders
 
-            orders = session.query(Order).filter(
-                (Order.id.like(search_pattern)) |
-                (Order.sender_name.ilike(search_pattern)) |
-                (Order.receiver_name.ilike(search_pattern)) |
-                (Order.sender_phone.ilike(search_pattern)) |
-                (Order.receiver_phone.ilike(search_pattern)) |
-                (Order.sender_address.ilike(search_pattern)) |
-                (Order.receiver_address.ilike(search_pattern)) |
-                (Order.item_name.ilike(search_pattern))
-            ).all()
+            orders = session.query(Order).filter(self._search_condition(query, session)).all()
 
             return orders
         except Exception as e:
@@ -136,6 +179,130 @@ class OrderService:
         finally:
             session.close()
 
+    def _search_condition(self, query: str, session, columns=None):
+        """
+        Build the search condition: an FTS5 prefix match when the index exists,
+        the old LIKE scan otherwise.
+        :param columns: Restrict the search to these order_search.SEARCH_COLUMNS (None = all)
+        """
+        match_query = order_search.build_match_query(query, columns)
+        if match_query and order_search.is_available(session):
+            condition = Order.id.in_(order_search.matching_ids(match_query))
+            if columns is None and query.strip().isdigit():
+                # Order ID is not part of the text index
+                condition = condition | (Order.id == int(query.strip()))
+            return condition
+        return self._like_search_condition(query, columns)
+
+    def _like_search_condition(self, query: str, columns=None):
+        """Substring search with ILIKE - full table scan, used when FTS5 is unavailable."""
+        search_pattern = f"%{query.strip()}%"
+        if columns is not None:
+            return or_(*(getattr(Order, col).ilike(search_pattern) for col in columns))
+        return (
+            (Order.id.like(search_pattern)) |
+            (Order.sender_name.ilike(search_pattern)) |
+            (Order.receiver_name.ilike(search_pattern)) |
+            (Order.sender_phone.ilike(search_pattern)) |
+            (Order.receiver_phone.ilike(search_pattern)) |
+            (Order.sender_address.ilike(search_pattern)) |
+            (Order.receiver_address.ilike(search_pattern)) |
+            (Order.item_name.ilike(search_pattern))
+        )
+
+    # --- Keyset pagination and streaming ---
+
+    def get_orders_page(self, cursor=None, page_size=200, descending=False, **filters):
+        """
+        Get one page of orders matching the filter_orders criteria.
+        Uses keyset pagination on (created_at, id), so every page costs the same
+        no matter how deep it is.
+        :param cursor: (created_at, id) of the last order on the previous page, None for the first page
+        :return: (orders, next_cursor) - next_cursor is None on the last page
+        """
+        session: Session = get_session()
+        try:
+            query = self._apply_filters(session.query(Order), **filters)
+            orders = self._keyset_page(query, cursor, page_size, descending).all()
+            return orders, self._next_cursor(orders, page_size)
+        except Exception as e:
+            print(f"Error fetching orders page: {e}")
+            return [], None
+        finally:
+            session.close()
+
+    def search_orders_page(self, query: str, cursor=None, page_size=200, descending=False):
+        """
+        Get one page of search_orders results (keyset pagination on (created_at, id)).
+        :return: (orders, next_cursor) - next_cursor is None on the last page
+        """
+        session: Session = get_session()
+        try:
+            db_query = session.query(Order)
+            if query and query.strip():
+                db_query = db_query.filter(self._search_condition(query, session))
+            orders = self._keyset_page(db_query, cursor, page_size, descending).all()
+            return orders, self._next_cursor(orders, page_size)
+        except Exception as e:
+            print(f"Error searching orders page: {e}")
+            return [], None
+        finally:
+            session.close()
+
+    def iter_orders(self, batch_size=1000, **filters):
+        """
+        Stream orders matching the filter_orders criteria in constant memory.
+        Orders are loaded batch_size at a time with yield_per; the session stays
+        open until the generator is exhausted or closed.
+        """
+        session: Session = get_session()
+        try:
+            query = self._apply_filters(session.query(Order), **filters)
+            yield from query.order_by(Order.id).yield_per(batch_size)
+        finally:
+            session.close()
+
+    def iter_order_rows(self, columns, batch_size=1000, **filters):
+        """
+        Stream plain row tuples of the given Order columns for the orders matching
+        the filter_orders criteria, in id order. No ORM objects are built.
+        """
+        session: Session = get_session()
+        try:
+            query = self._apply_filters(session.query(*columns), **filters)
+            yield from query.order_by(Order.id).yield_per(batch_size)
+        finally:
+            session.close()
+
+    def iter_search_orders(self, query: str, batch_size=1000):
+        """Stream search_orders results in constant memory (see iter_orders)."""
+        session: Session = get_session()
+        try:
+            db_query = session.query(Order)
+            if query and query.strip():
+                db_query = db_query.filter(self._search_condition(query, session))
+            yield from db_query.order_by(Order.id).yield_per(batch_size)
+        finally:
+            session.close()
+
+    def _keyset_page(self, query, cursor, page_size, descending=False):
+        """Apply a (created_at, id) cursor, matching ORDER BY and LIMIT to a query."""
+        if cursor is not None:
+            key = tuple_(Order.created_at, Order.id)
+            query = query.filter(key < tuple_(*cursor) if descending else key > tuple_(*cursor))
+        if descending:
+            query = query.order_by(Order.created_at.desc(), Order.id.desc())
+        else:
+            query = query.order_by(Order.created_at.asc(), Order.id.asc())
+        return query.limit(page_size)
+
+    def _next_cursor(self, orders, page_size):
+        """Cursor for the page after `orders`, or None if this was the last page."""
+        if len(orders) < page_size:
+            return None
+        last = orders[-1]
+        return (last.created_at, last.id)
+
     def filter_orders(self, search_query: str = "", status: str = "", days: int = 0, province: str = ""):
         """
         Filter orders by multiple criteria.
@@ -145,8 +312,21 @@ class OrderService:
         :param province: Province filter (empty = all)
         :return: List of filtered orders
         """
+        session: Session = get_session()
+        try:
+            query = self._apply_filters(session.query(Order), search_query, status, days, province)
+            orders = query.all()
+            return orders
+        except Exception as e:
+            print(f"Error filtering orders: {e}")
+            return []
+        finally:
+            session.close()
+
+    def _apply_filters(self, query, search_query: str = "", status: str = "", days: int = 0, province: str = ""):
+        """Add the WHERE conditions used by filter_orders to an existing query."""
         from datetime import datetime, timedelta
-        from sqlalchemy import and_, or_
+        from sqlalchemy import and_
 
         # Map Vietnamese status to English (database values)
         status_map = {
@@ -157,57 +337,102 @@ class OrderService:
             "Đã hủy": "Cancelled"
         }
 
-        session: Session = SessionLocal()
-        try:
-            query = session.query(Order)
-            conditions = []
-
-            # Status filter - convert Vietnamese to English
-            if status and status != "Tất cả trạng thái":
-                english_status = status_map.get(status, status)
-                conditions.append(Order.status == english_status)
-
-            # Date filter
-            if days > 0:
-                cutoff_date = datetime.now() - timedelta(days=days)
-                conditions.append(Order.created_at >= cutoff_date)
-
-            # Province filter (check both sender and receiver)
-            if province and province != "Tất cả tỉnh thành":
-                conditions.append(
-                    or_(
-                        Order.sender_province.ilike(f"%{province}%"),
-                        Order.receiver_province.ilike(f"%{province}%")
-                    )
-                )
+        conditions = []
+
+        # Status filter - convert Vietnamese to English
+        if status and status != "Tất cả trạng thái":
+            english_status = status_map.get(status, status)
+            conditions.append(Order.status == english_status)
 
-            # Search filter
-            if search_query and search_query.strip():
-                search_pattern = f"%{search_query.strip()}%"
-                conditions.append(
-                    or_(
-                        Order.tracking_code.ilike(search_pattern),
-                        Order.sender_name.ilike(search_pattern),
-                        Order.receiver_name.ilike(search_pattern),
-                        Order.sender_phone.ilike(search_pattern),
-                        Order.receiver_phone.ilike(search_pattern)
-                    )
+        # Date filter
+        if days > 0:
+            cutoff_date = datetime.now() - timedelta(days=days)
+            conditions.append(Order.created_at >= cutoff_date)
+
+        # Province filter (check both sender and receiver)
+        if province and province != "Tất cả tỉnh thành":
+            conditions.append(
+                or_(
+                    Order.sender_province.ilike(f"%{province}%"),
+                    Order.receiver_province.ilike(f"%{province}%")
                 )
+            )
 
-            if conditions:
-                query = query.filter(and_(*conditions))
+        # Search filter
+        if search_query and search_query.strip():
+            conditions.append(
+                self._search_condition(search_query, query.session, columns=self.FILTER_SEARCH_COLUMNS)
+            )
 
-            orders = query.all()
-            return orders
+        if conditions:
+            query = query.filter(and_(*conditions))
+        return query
+
+    def count_orders(self, **filters):
+        """Count orders matching the filter_orders criteria."""
+        session: Session = get_session()
+        try:
+            return self._apply_filters(session.query(func.count(Order.id)), **filters).scalar() or 0
         except Exception as e:
-            print(f"Error filtering orders: {e}")
+            print(f"Error counting orders: {e}")
+            return 0
+        finally:
+            session.close()
+
+    def get_order_rows(self, offset=0, limit=200, sort_key="created_at", descending=False, cursor=None, **filters):
+        """
+        Get one page of lightweight order rows for the order table.
+        Only the columns in TABLE_COLUMNS are loaded, no ORM objects are built.
+        :param sort_key: One of SORT_KEYS
+        :param cursor: (created_at, id) of the last row loaded; when sorting by
+                       created_at this replaces offset with keyset pagination
+        :return: List of rows (named tuples)
+        """
+        session: Session = get_session()
+        try:
+            query = self._apply_filters(session.query(*self.TABLE_COLUMNS), **filters)
+            if sort_key == "created_at" and cursor is not None:
+                return self._keyset_page(query, cursor, limit, descending).all()
+
+            sort_column = self._sort_expression(sort_key)
+            if descending:
+                query = query.order_by(sort_column.desc(), Order.id.desc())
+            else:
+                query = query.order_by(sort_column.asc(), Order.id.asc())
+            return query.offset(offset).limit(limit).all()
+        except Exception as e:
+            print(f"Error fetching order rows: {e}")
             return []
         finally:
             session.close()
 
+    def _sort_expression(self, sort_key):
+        """Map a table sort key to the SQL expression to order by."""
+        if sort_key == "total":
+            return Order.shipping_cost + case((Order.has_cod, func.coalesce(Order.cod_amount, 0.0)), else_=0.0)
+        return getattr(Order, self.SORT_KEYS.get(sort_key, "created_at"))
+
+    def get_status_summary(self, **filters):
+        """
+        Get order count and revenue per status for the filter_orders criteria.
+        :return: Dict {status: (count, revenue)}
+        """
+        session: Session = get_session()
+        try:
+            query = session.query(
+                Order.status, func.count(Order.id), func.coalesce(func.sum(Order.shipping_cost), 0.0)
+            )
+            query = self._apply_filters(query, **filters).group_by(Order.status)
+            return {status: (count, revenue) for status, count, revenue in query.all()}
+        except Exception as e:
+            print(f"Error summarizing orders: {e}")
+            return {}
+        finally:
+            session.close()
+
     def get_unique_provinces(self):
         """Get list of unique provinces from all orders."""
-        session: Session = SessionLocal()
+        session: Session = get_session()
         try:
             sender_provinces = session.query(Order.sender_province).distinct().all()
             receiver_provinces = session.query(Order.receiver_province).distinct().all()
@@ -228,7 +453,7 @@ class OrderService:
         """
         Update the status of a specific order and record history.
         """
-        session: Session = SessionLocal()
+        session: Session = get_session()
         try:
             order = session.query(Order).filter(Order.id == order_id).first()
             if order:
@@ -246,6 +471,7 @@ class OrderService:
                 )
                 session.add(history)
                 session.commit()
+                order_cache.invalidate([order_id])
                 return True, f"Updated Order #{order.tracking_code} to '{new_status}'"
             else:
                 return False, "Order not found"
@@ -255,11 +481,105 @@ class OrderService:
         finally:
             session.close()
 
+    def update_orders_status(self, order_ids, new_status, changed_by=None, note=None):
+        """
+        Set the status of many orders in one transaction: one UPDATE per chunk
+        of IDs and a bulk insert of their history rows. Orders already in
+        new_status are left untouched.
+        :param note: History note, or a dict {order_id: note} for per-order notes
+        :return: (success, message, old_statuses) - old_statuses maps each changed order_id to its previous status
+        """
+        session: Session = get_session()
+        try:
+            current = self._current_statuses(session, order_ids)
+            changes = {
+                order_id: (old_status, new_status)
+                for order_id, old_status in current.items()
+                if old_status != new_status
+            }
+            self._set_statuses(session, changes, changed_by, note)
+            session.commit()
+            order_cache.invalidate(changes)
+
+            message = f"Updated {len(changes)} order(s) to '{new_status}'"
+            missing = len(set(order_ids)) - len(current)
+            if missing:
+                message += f", {missing} not found"
+            return True, message, {order_id: old for order_id, (old, _) in changes.items()}
+        except Exception as e:
+            session.rollback()
+            return False, str(e), {}
+        finally:
+            session.close()
+
+    def restore_orders_status(self, statuses, changed_by=None, note=None):
+        """
+        Put orders back to individual statuses in one transaction (bulk undo).
+        :param statuses: Dict {order_id: status}
+        :return: (success, message)
+        """
+        session: Session = get_session()
+        try:
+            current = self._current_statuses(session, list(statuses))
+            changes = {
+                order_id: (old_status, statuses[order_id])
+                for order_id, old_status in current.items()
+                if old_status != statuses[order_id]
+            }
+            self._set_statuses(session, changes, changed_by, note)
+            session.commit()
+            order_cache.invalidate(changes)
+            return True, f"Restored status of {len(changes)} order(s)"
+        except Exception as e:
+            session.rollback()
+            return False, str(e)
+        finally:
+            session.close()
+
+    def _current_statuses(self, session, order_ids):
+        """Map order_id -> status for the orders that exist."""
+        current = {}
+        for chunk in chunked(set(order_ids)):
+            current.update(session.query(Order.id, Order.status).filter(Order.id.in_(chunk)).all())
+        return current
+
+    def _set_statuses(self, session, changes, changed_by=None, note=None):
+        """
+        Apply {order_id: (old_status, new_status)} inside the caller's transaction:
+        one UPDATE per target status and chunk, plus one bulk history insert.
+        :param note: History note, or a dict {order_id: note}
+        """
+        if not changes:
+            return
+        from datetime import datetime
+        from models.order_status_history import OrderStatusHistory
+
+        now = datetime.now()
+        by_status = {}
+        history = []
+        for order_id, (old_status, new_status) in changes.items():
+            by_status.setdefault(new_status, []).append(order_id)
+            history.append({
+                'order_id': order_id,
+                'old_status': old_status,
+                'new_status': new_status,
+                'changed_at': now,
+                'changed_by': changed_by,
+                'note': note.get(order_id) if isinstance(note, dict) else note
+            })
+
+        for new_status, ids in by_status.items():
+            for chunk in chunked(ids):
+                session.query(Order).filter(Order.id.in_(chunk)).update(
+                    {Order.status: new_status}, synchronize_session=False
+                )
+        session.execute(insert(OrderStatusHistory), history)
+
     def get_status_history(self, order_id):
         """
         Get status change history for an order.
         """
-        session: Session = SessionLocal()
+        session: Session = get_session()
         try:
             from models.order_status_history import OrderStatusHistory
             history = session.query(OrderStatusHistory).filter(
@@ -276,13 +596,16 @@ class OrderService:
         """
         Delete a specific order by ID.
         """
-        session: Session = SessionLocal()
+        session: Session = get_session()
         try:
             order = session.query(Order).filter(Order.id == order_id).first()
             if order:
+                from models.order_tombstone import OrderTombstone
                 tracking_code = order.tracking_code
                 session.delete(order)
+                session.add(OrderTombstone(order_id=order_id, tracking_code=tracking_code))
                 session.commit()
+                order_cache.invalidate([order_id])
                 return True, f"Deleted Order #{tracking_code} successfully"
             else:
                 return False, "Order not found"
@@ -292,16 +615,113 @@ class OrderService:
         finally:
             session.close()
 
+    def delete_orders(self, order_ids):
+        """
+        Delete many orders in one transaction with chunked DELETE ... WHERE id IN (...),
+        removing their status and warehouse history too and leaving a tombstone per order.
+        :return: (success, message, snapshot) - snapshot holds every deleted row
+                 (see restore_orders); None on failure
+        """
+        from datetime import datetime
+        from models.order_tombstone import OrderTombstone
+
+        session: Session = get_session()
+        try:
+            ids = list(set(order_ids))
+            snapshot = {}
+            # History first, then the orders themselves
+            for table in self._order_tables():
+                key = table.c.id if table.name == Order.__tablename__ else table.c.order_id
+                snapshot[table.name] = self._snapshot_rows(session, table, key, ids)
+            for table in self._order_tables():
+                key = table.c.id if table.name == Order.__tablename__ else table.c.order_id
+                for chunk in chunked(ids):
+                    session.execute(table.delete().where(key.in_(chunk)))
+
+            columns, rows = snapshot[Order.__tablename__]
+            id_index, code_index = columns.index('id'), columns.index('tracking_code')
+            now = datetime.now()
+            tombstones = [
+                {'order_id': row[id_index], 'tracking_code': row[code_index], 'deleted_at': now} for row in rows
+            ]
+            if tombstones:
+                session.execute(insert(OrderTombstone), tombstones)
+            session.commit()
+            order_cache.invalidate(ids)
+
+            deleted = len(rows)
+            return True, f"Deleted {deleted}/{len(ids)} order(s)", snapshot
+        except Exception as e:
+            session.rollback()
+            return False, str(e), None
+        finally:
+            session.close()
+
+    def restore_orders(self, snapshot):
+        """
+        Re-insert orders removed by delete_orders, with their original IDs and history.
+        The restored orders count as changed now and their tombstones are dropped.
+        :return: (success, message)
+        """
+        from datetime import datetime
+        from models.order_tombstone import OrderTombstone
+
+        session: Session = get_session()
+        try:
+            now = datetime.now()
+            # Orders before the history rows that reference them
+            for table in reversed(self._order_tables()):
+                columns, rows = snapshot.get(table.name, ((), []))
+                overrides = {'updated_at': now} if table.name == Order.__tablename__ else {}
+                for chunk in chunked(rows):
+                    session.execute(insert(table), [{**dict(zip(columns, row)), **overrides} for row in chunk])
+            for chunk in chunked(self.snapshot_order_ids(snapshot)):
+                session.execute(OrderTombstone.__table__.delete().where(OrderTombstone.order_id.in_(chunk)))
+            session.commit()
+            order_cache.invalidate(self.snapshot_order_ids(snapshot))
+            return True, f"Restored {len(snapshot[Order.__tablename__][1])} order(s)"
+        except Exception as e:
+            session.rollback()
+            return False, str(e)
+        finally:
+            session.close()
+
+    @staticmethod
+    def snapshot_order_ids(snapshot):
+        """IDs of the orders held in a delete_orders snapshot."""
+        columns, rows = snapshot[Order.__tablename__]
+        id_index = columns.index('id')
+        return [row[id_index] for row in rows]
+
+    @staticmethod
+    def _order_tables():
+        """Tables holding an order's data, history tables first."""
+        from models.order_status_history import OrderStatusHistory
+        from models.warehouse import OrderWarehouseHistory
+        return [OrderStatusHistory.__table__, OrderWarehouseHistory.__table__, Order.__table__]
+
+    @staticmethod
+    def _snapshot_rows(session, table, key, ids):
+        """Compact copy of the matching rows: (column names, list of value tuples)."""
+        rows = []
+        for chunk in chunked(ids):
+            rows.extend(tuple(row) for row in session.execute(select(table).where(key.in_(chunk))))
+        return tuple(c.name for c in table.columns), rows
+
     def get_order_by_id(self, order_id):
         """
-        Get a specific order by ID.
+        Get a specific order by ID, served from order_cache when possible.
         """
-        session: Session = SessionLocal()
+        cached = order_cache.get(order_id)
+        if cached is not None:
+            return cached
+
+        session: Session = get_session()
         try:
             order = session.query(Order).filter(Order.id == order_id).first()
             if order:
                 # Return order data as dict to avoid session issues
-                return {
+                data = {
                     'id': order.id,
                     'tracking_code': order.tracking_code,
                     'order_type': order.order_type or 'domestic',
@@ -329,6 +749,8 @@ class OrderService:
                     'status': order.status,
                     'created_at': order.created_at
                 }
+                order_cache.put(order_id, data)
+                return data
             return None
         except Exception as e:
             print(f"Error fetching order: {e}")
@@ -340,7 +762,7 @@ class OrderService:
         """
         Update an existing order with new data.
         """
-        session: Session = SessionLocal()
+        session: Session = get_session()
         try:
             order = session.query(Order).filter(Order.id == order_id).first()
             if order:
@@ -372,6 +794,7 @@ class OrderService:
                 order.cod_amount = float(data.get('cod_amount', order.cod_amount or 0))
 
                 session.commit()
+                order_cache.invalidate([order_id])
                 return True, f"Updated Order #{order.tracking_code} successfully"
             else:
                 return False, "Order not found"
@@ -380,3 +803,85 @@ class OrderService:
             return False, f"Error updating order: {str(e)}"
         finally:
             session.close()
+
+    def reprice_orders(self, statuses=None, fallback="flat", dry_run=False,
+                       batch_size=50000, progress=None, is_cancelled=None):
+        """
+        Recalculate shipping_cost from the current route tariffs (after a tariff
+        change) in one transaction. Orders are read in id-keyset batches, priced
+        with PricingEngine and only the ones whose cost changed are written, one
+        executemany UPDATE per batch.
+        :param statuses: Only reprice orders in these statuses (default: all orders)
+        :param fallback: PricingEngine fallback for orders without a route
+        :param dry_run: Count the changes without writing them
+        :param progress: Optional callback progress(orders_checked, total_orders)
+        :param is_cancelled: Optional callable; cancelling rolls every change back
+        :return: (success, message, changed_count)
+        """
+        import numpy as np
+        from datetime import datetime
+        from services.pricing_engine import PricingEngine
+
+        engine = PricingEngine()
+        table = Order.__table__
+        condition = table.c.status.in_(statuses) if statuses else None
+        statement = update(table).where(table.c.id == bindparam("b_id")).values(shipping_cost=bindparam("b_cost"))
+        stamp = update(table).where(table.c.id == bindparam("b_id")).values(updated_at=bindparam("b_updated_at"))
+
+        session: Session = get_session()
+        try:
+            count = select(func.count()).select_from(table)
+            total = session.execute(count if condition is None else count.where(condition)).scalar()
+            changed_ids = []
+            checked = 0
+            last_id = 0
+            while True:
+                query = select(
+                    table.c.id, table.c.sender_province, table.c.receiver_province,
+                    table.c.weight, table.c.shipping_cost
+                ).where(table.c.id > last_id)
+                if condition is not None:
+                    query = query.where(condition)
+                rows = session.execute(query.order_by(table.c.id).limit(batch_size)).all()
+                if not rows:
+                    break
+                if is_cancelled and is_cancelled():
+                    session.rollback()
+                    return False, "Repricing cancelled.", 0
+
+                ids, origins, dests, weights, old_costs = zip(*rows)
+                costs = engine.price(
+                    origins, dests, np.array(weights, dtype=np.float64), fallback=fallback
+                )
+                # NULL weights price as NaN: leave those orders alone
+                old = np.array(old_costs, dtype=np.float64)
+                changed = ~np.isnan(costs) & ~(np.abs(costs - old) < 0.005)
+                batch_ids = np.array(ids)[changed].tolist()
+                if batch_ids and not dry_run:
+                    session.execute(statement, [
+                        {"b_id": order_id, "b_cost": cost}
+                        for order_id, cost in zip(batch_ids, costs[changed].tolist())
+                    ])
+                changed_ids.extend(batch_ids)
+                checked += len(rows)
+                last_id = ids[-1]
+                if progress:
+                    progress(checked, total)
+
+            if dry_run:
+                return True, f"{len(changed_ids)}/{checked} order(s) would be repriced", len(changed_ids)
+            # Stamp at commit time, not when the scan started: an incremental export
+            # that ran meanwhile may already have moved its watermark past the start
+            now = datetime.now()
+            for start in range(0, len(changed_ids), batch_size):
+                session.execute(stamp, [
+                    {"b_id": order_id, "b_updated_at": now} for order_id in changed_ids[start:start + batch_size]
+                ])
+            session.commit()
+            order_cache.invalidate(changed_ids)
+            return True, f"Repriced {len(changed_ids)}/{checked} order(s)", len(changed_ids)
+        except Exception as e:
+            session.rollback()
+            return False, f"Error repricing orders: {str(e)}", 0
+        finally:
+            session.close()
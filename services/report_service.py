@@ -1,53 +1,251 @@
 # services/report_service.py
-import pandas as pd
+import csv
+import gzip
+import os
+from datetime import datetime
+
+from sqlalchemy import func, select, true
 from sqlalchemy.orm import Session
-from database.db_connection import SessionLocal
+
+from database.unit_of_work import get_session
 from models.order import Order
+from models.order_status_history import OrderStatusHistory
+from models.order_tombstone import OrderTombstone
+from models.warehouse import OrderWarehouseHistory
+from services.order_service import OrderService
+
 
 class ReportService:
+    # Exportable columns: key -> (Excel header, Order column), in sheet order
+    EXPORT_COLUMNS = {
+        "id": ("ID", Order.id),
+        "tracking_code": ("Tracking Code", Order.tracking_code),
+        "sender_name": ("Sender", Order.sender_name),
+        "sender_phone": ("Sender Phone", Order.sender_phone),
+        "sender_province": ("Sender Province", Order.sender_province),
+        "receiver_name": ("Receiver", Order.receiver_name),
+        "receiver_phone": ("Phone", Order.receiver_phone),
+        "receiver_address": ("Address", Order.receiver_address),
+        "receiver_province": ("Receiver Province", Order.receiver_province),
+        "item_name": ("Item", Order.item_name),
+        "item_type": ("Item Type", Order.item_type),
+        "package_count": ("Packages", Order.package_count),
+        "weight": ("Weight (kg)", Order.weight),
+        "service_type": ("Service", Order.service_type),
+        "shipping_cost": ("Cost (VND)", Order.shipping_cost),
+        "cod_amount": ("COD (VND)", Order.cod_amount),
+        "status": ("Status", Order.status),
+        "created_at": ("Created At", Order.created_at),
+    }
+    DEFAULT_COLUMNS = [
+        "id", "tracking_code", "sender_name", "receiver_name", "receiver_phone",
+        "receiver_address", "weight", "shipping_cost", "status", "created_at"
+    ]
+    BATCH_SIZE = 2000
+
+    # Analytics datasets: name -> (table, watermark column, columns written as categoricals).
+    # Incremental runs get orders created or updated since the watermark, and
+    # order_tombstones for the ones deleted since then.
+    ANALYTICS_DATASETS = {
+        "orders": (
+            Order.__table__, "updated_at",
+            ("order_type", "sender_province", "receiver_province", "item_type",
+             "service_type", "payment_type", "status")
+        ),
+        "status_history": (OrderStatusHistory.__table__, "changed_at", ("old_status", "new_status", "changed_by")),
+        "warehouse_history": (OrderWarehouseHistory.__table__, "timestamp", ("action",)),
+        "order_tombstones": (OrderTombstone.__table__, "deleted_at", ()),
+    }
+    # Format -> file extension
+    ANALYTICS_FORMATS = {"csv": ".csv.gz", "parquet": ".parquet", "arrow": ".arrow"}
+    ANALYTICS_BATCH_SIZE = 50000
+
     def __init__(self):
         pass
 
-    def export_to_excel(self, file_path):
+    def export_to_excel(self, file_path, columns=None, filters=None, progress=None, is_cancelled=None):
         """
-        Export all orders from the database to an Excel file.
+        Export orders to an Excel file.
+        Rows are streamed from the database and written through a write-only
+        workbook, so memory use does not grow with the number of orders.
         :param file_path: The destination path to save the .xlsx file.
+        :param columns: EXPORT_COLUMNS keys to include (default DEFAULT_COLUMNS).
+        :param filters: filter_orders keyword arguments (default: all orders).
+        :param progress: Optional callback progress(rows_written, total_rows).
+        :param is_cancelled: Optional callable; when it returns True the export stops
+                             and no file is saved.
         :return: (True, message) if successful, (False, error) otherwise.
         """
-        session: Session = SessionLocal()
+        from openpyxl import Workbook
+
+        columns = columns or self.DEFAULT_COLUMNS
+        filters = filters or {}
         try:
-            # 1. Query all data from the database
-            orders = session.query(Order).all()
+            unknown = [key for key in columns if key not in self.EXPORT_COLUMNS]
+            if unknown:
+                return False, f"Unknown export columns: {', '.join(unknown)}"
 
-            if not orders:
+            service = OrderService()
+            total = service.count_orders(**filters)
+            if not total:
                 return False, "No data to export."
 
-            # 2. Convert object list to a list of dictionaries
-            data = []
-            for order in orders:
-                data.append({
-                    "ID": order.id,
-                    "Tracking Code": order.tracking_code,
-                    "Sender": order.sender_name,
-                    "Receiver": order.receiver_name,
-                    "Phone": order.receiver_phone,
-                    "Address": order.receiver_address,
-                    "Weight (kg)": order.weight,
-                    "Cost (VND)": order.shipping_cost,
-                    "Status": order.status,
-                    "Created At": order.created_at
-                })
-
-            # 3. Create a Pandas DataFrame
-            df = pd.DataFrame(data)
-
-            # 4. Save to Excel
-            # index=False means we don't save the row numbers (0, 1, 2...)
-            df.to_excel(file_path, index=False)
-
-            return True, f"Data exported successfully to {file_path}"
+            workbook = Workbook(write_only=True)
+            sheet = workbook.create_sheet("Orders")
+            sheet.append([self.EXPORT_COLUMNS[key][0] for key in columns])
+
+            written = 0
+            rows = service.iter_order_rows(
+                [self.EXPORT_COLUMNS[key][1] for key in columns], batch_size=self.BATCH_SIZE, **filters
+            )
+            try:
+                for row in rows:
+                    sheet.append(tuple(row))
+                    written += 1
+                    if written % self.BATCH_SIZE == 0:
+                        if is_cancelled and is_cancelled():
+                            return False, "Export cancelled."
+                        if progress:
+                            progress(written, total)
+            finally:
+                rows.close()
+
+            workbook.save(file_path)
+            if progress:
+                progress(written, written)
+            return True, f"Exported {written} orders to {file_path}"
 
         except Exception as e:
             return False, f"Export failed: {str(e)}"
+
+    def export_analytics(self, dataset, fmt, file_path, since=None, progress=None, is_cancelled=None):
+        """
+        Export a whole table for analytics as gzip CSV, Parquet or Arrow (IPC file).
+        Rows are streamed in ANALYTICS_BATCH_SIZE batches ordered by the dataset's
+        watermark column. Parquet/Arrow get typed columns (timestamps, floats) and
+        dictionary-encoded categoricals.
+        :param dataset: ANALYTICS_DATASETS key
+        :param fmt: ANALYTICS_FORMATS key
+        :param since: Only export rows whose watermark column is later than this datetime
+        :param progress: Optional callback progress(rows_written, total_rows)
+        :param is_cancelled: Optional callable; a cancelled export leaves no file behind
+        :return: (success, message, watermark) - watermark is the latest timestamp
+                 written (pass it as since next time), or since if nothing was new
+        """
+        if dataset not in self.ANALYTICS_DATASETS:
+            return False, f"Unknown dataset: {dataset}", since
+        if fmt not in self.ANALYTICS_FORMATS:
+            return False, f"Unknown format: {fmt}", since
+
+        table, watermark_name, categoricals = self.ANALYTICS_DATASETS[dataset]
+        watermark_column = table.c[watermark_name]
+        condition = watermark_column > since if since is not None else true()
+        tmp_path = file_path + ".tmp"
+        writer = None
+
+        session: Session = get_session()
+        try:
+            total = session.execute(select(func.count()).select_from(table).where(condition)).scalar()
+            if fmt == "csv":
+                writer = _CsvGzipWriter(tmp_path, table)
+            else:
+                # Same dictionary for every batch, so the Arrow file needs no dictionary replacement
+                dictionaries = {
+                    name: [value for (value,) in session.execute(
+                        select(table.c[name]).where(condition).distinct().order_by(table.c[name])
+                    ) if value is not None]
+                    for name in categoricals
+                }
+                writer = _ArrowWriter(tmp_path, table, dictionaries, parquet=(fmt == "parquet"))
+
+            watermark = since
+            written = 0
+            watermark_index = list(table.columns.keys()).index(watermark_name)
+            result = session.execute(
+                select(*table.columns).where(condition).order_by(watermark_column, table.c.id)
+                .execution_options(yield_per=self.ANALYTICS_BATCH_SIZE)
+            )
+            try:
+                for rows in result.partitions():
+                    if is_cancelled and is_cancelled():
+                        writer.close()
+                        writer = None
+                        os.remove(tmp_path)
+                        return False, "Export cancelled.", since
+                    writer.write(rows)
+                    written += len(rows)
+                    watermark = rows[-1][watermark_index] or watermark
+                    if progress:
+                        progress(written, total)
+            finally:
+                result.close()
+
+            writer.close()
+            os.replace(tmp_path, file_path)
+            return True, f"Exported {written} {dataset} rows to {file_path}", watermark
+
+        except Exception as e:
+            if writer:
+                writer.close()
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False, f"Export failed: {str(e)}", since
         finally:
             session.close()
+
+
+class _CsvGzipWriter:
+    """Write row batches to a gzip-compressed CSV with a header row."""
+
+    def __init__(self, path, table):
+        self.file = gzip.open(path, "wt", newline="", encoding="utf-8", compresslevel=6)
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(table.columns.keys())
+
+    def write(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.file.close()
+
+
+class _ArrowWriter:
+    """Write row batches as Arrow record batches to a Parquet or Arrow IPC file."""
+
+    def __init__(self, path, table, dictionaries, parquet):
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        self.pa = pa
+        self.pc = pc
+        arrow_types = {int: pa.int64(), float: pa.float64(), bool: pa.bool_(),
+                       datetime: pa.timestamp("us"), str: pa.string()}
+        fields = []
+        for column in table.columns:
+            if column.name in dictionaries:
+                fields.append(pa.field(column.name, pa.dictionary(pa.int32(), pa.string())))
+            else:
+                fields.append(pa.field(column.name, arrow_types[column.type.python_type]))
+        self.schema = pa.schema(fields)
+        self.dictionaries = {name: pa.array(values, pa.string()) for name, values in dictionaries.items()}
+
+        if parquet:
+            import pyarrow.parquet as pq
+            self.writer = pq.ParquetWriter(path, self.schema)
+        else:
+            self.writer = pa.ipc.new_file(path, self.schema)
+
+    def write(self, rows):
+        pa = self.pa
+        arrays = []
+        for field, values in zip(self.schema, zip(*rows)):
+            dictionary = self.dictionaries.get(field.name)
+            if dictionary is None:
+                arrays.append(pa.array(values, field.type))
+            else:
+                indices = self.pc.index_in(pa.array(values, pa.string()), value_set=dictionary)
+                arrays.append(pa.DictionaryArray.from_arrays(indices.cast(pa.int32()), dictionary))
+        self.writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
@@ -0,0 +1,145 @@
+# services/route_matrix.py
+"""
+Province x province route matrix, persisted next to the database.
+
+One float64 array of shape (len(LAYERS), n, n), indexed by province code:
+- distance_km:  shortest distance over any path (province proximity)
+- est_hours:    fastest path (ETA)
+- base_price,
+  price_per_kg: the pricing tariff - the direct route if there is one,
+                else the cheapest multi-hop route (see RoutePlanner)
+Unreachable pairs are NaN. The diagonal has distance and hours 0 and no price.
+
+The array is saved as <database>.routes.npy with a <database>.routes.json
+sidecar holding the province names, a signature of the routes it was built
+from and a SHA-1 of the array. save() writes the sidecar last, and load()
+memory-maps the .npy file and ignores it unless both the routes signature and
+the array hash match - a crash between the two writes leaves a pair that is
+rebuilt, never a matrix labelled with the wrong routes.
+"""
+import hashlib
+import json
+import os
+from typing import NamedTuple
+
+import numpy as np
+
+from services.route_planner import REFERENCE_WEIGHT_KG
+
+LAYERS = ("distance_km", "est_hours", "base_price", "price_per_kg")
+FORMAT_VERSION = 1
+
+
+class RouteEstimate(NamedTuple):
+    """Matrix entry for one province pair."""
+    distance_km: float
+    est_hours: float
+    base_price: float
+    price_per_kg: float
+
+    def calculate_shipping_cost(self, weight_kg):
+        return self.base_price + weight_kg * self.price_per_kg
+
+
+def routes_signature(tariffs):
+    """Fingerprint of the route data a matrix depends on (route IDs excluded)."""
+    digest = hashlib.sha1(f"{FORMAT_VERSION}|{REFERENCE_WEIGHT_KG}".encode("utf-8"))
+    for (origin, dest), tariff in sorted(tariffs.items()):
+        digest.update(repr((origin, dest, tariff.distance_km, tariff.est_hours,
+                            tariff.base_price, tariff.price_per_kg)).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class RouteMatrix:
+    """Dense route matrix with a province name -> code mapping."""
+
+    def __init__(self, provinces, data, signature):
+        self.provinces = list(provinces)
+        self.codes = {province: code for code, province in enumerate(self.provinces)}
+        # A plain ndarray view: still backed by the file mapping, but indexes faster than np.memmap
+        self.data = np.asarray(data)
+        self.signature = signature
+        for index, name in enumerate(LAYERS):
+            setattr(self, name, self.data[index])
+
+    @classmethod
+    def build(cls, tariffs, planner):
+        """
+        Fill the matrix from the direct routes and the planner's shortest paths.
+        :param tariffs: (origin, dest) -> RouteTariff mapping
+        :param planner: RoutePlanner over the same tariffs
+        """
+        provinces = planner.provinces
+        size = len(provinces)
+        data = np.full((len(LAYERS), size, size), np.nan)
+        for i, origin in enumerate(provinces):
+            data[0, i, i] = data[1, i, i] = 0.0
+            distances = planner.trees["distance"][origin][0]
+            hours = planner.trees["hours"][origin][0]
+            for j, dest in enumerate(provinces):
+                if i == j or dest not in distances:
+                    continue
+                data[0, i, j] = distances[dest]
+                data[1, i, j] = hours[dest]
+                tariff = tariffs.get((origin, dest)) or planner.path(origin, dest, "cost")
+                data[2, i, j] = tariff.base_price
+                data[3, i, j] = tariff.price_per_kg
+        return cls(provinces, data, routes_signature(tariffs))
+
+    @staticmethod
+    def paths(stem):
+        return stem + ".routes.npy", stem + ".routes.json"
+
+    @staticmethod
+    def array_hash(data):
+        return hashlib.sha1(np.ascontiguousarray(data)).hexdigest()
+
+    def save(self, stem):
+        """
+        Write <stem>.routes.npy, then the .json that names its hash; each file is
+        replaced atomically, so a crash in between leaves a pair load() rejects.
+        """
+        array_path, meta_path = self.paths(stem)
+        tmp_array = array_path + ".tmp.npy"
+        np.save(tmp_array, np.ascontiguousarray(self.data))
+        os.replace(tmp_array, array_path)
+        meta = {"format": FORMAT_VERSION, "signature": self.signature, "array_sha1": self.array_hash(self.data),
+                "layers": list(LAYERS), "provinces": self.provinces}
+        tmp_meta = meta_path + ".tmp"
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp_meta, meta_path)
+
+    @classmethod
+    def load(cls, stem, signature):
+        """
+        Memory-map a saved matrix.
+        :return: RouteMatrix, or None if the files are missing, unreadable or stale
+        """
+        array_path, meta_path = cls.paths(stem)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            if (meta.get("format") != FORMAT_VERSION or meta.get("signature") != signature
+                    or meta.get("layers") != list(LAYERS)):
+                return None
+            data = np.load(array_path, mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+        size = len(meta["provinces"])
+        # A few hundred KB: hashing it costs far less than rebuilding from a mismatched pair
+        if data.shape != (len(LAYERS), size, size) or meta.get("array_sha1") != cls.array_hash(data):
+            return None
+        return cls(meta["provinces"], data, signature)
+
+    def lookup(self, origin, dest):
+        """RouteEstimate for origin -> dest, or None if unknown, unreachable or origin == dest."""
+        i = self.codes.get(origin)
+        j = self.codes.get(dest)
+        if i is None or j is None or i == j:
+            return None
+        distance = self.distance_km[i, j]
+        if np.isnan(distance):  # unreachable
+            return None
+        return RouteEstimate(float(distance), float(self.est_hours[i, j]),
+                             float(self.base_price[i, j]), float(self.price_per_kg[i, j]))
@@ -0,0 +1,177 @@
+# services/route_planner.py
+"""
+Multi-hop routing over the route graph.
+
+Every route is a directed edge between two provinces, weighted three ways:
+distance_km, est_hours and cost. Cost is the route's price for a
+REFERENCE_WEIGHT_KG parcel, so the cheapest path does not depend on the order.
+A planned route is still priced at the order's real weight (its base prices
+and per-kg prices add up along the path).
+
+RoutePlanner runs Dijkstra from every province for every metric up front; with
+a few dozen provinces that is a few milliseconds, and path() is then a table
+lookup plus walking the predecessor chain. set_routes() refreshes only the
+sources whose shortest paths the changed edges can affect.
+"""
+import heapq
+from typing import NamedTuple
+
+METRICS = ("distance", "hours", "cost")
+REFERENCE_WEIGHT_KG = 1.0
+
+
+class PlannedRoute(NamedTuple):
+    """A path through the route graph, with its totals."""
+    provinces: tuple
+    distance_km: float
+    est_hours: float
+    base_price: float
+    price_per_kg: float
+
+    @property
+    def hops(self):
+        return len(self.provinces) - 1
+
+    @property
+    def via(self):
+        """Intermediate provinces (hubs), empty for a direct route."""
+        return self.provinces[1:-1]
+
+    def calculate_shipping_cost(self, weight_kg):
+        """Sum of the legs' prices for this weight."""
+        return self.base_price + weight_kg * self.price_per_kg
+
+
+def _edge_weights(tariff):
+    """metric -> edge weight of one RouteTariff."""
+    return {
+        "distance": tariff.distance_km,
+        "hours": tariff.est_hours,
+        "cost": tariff.base_price + REFERENCE_WEIGHT_KG * tariff.price_per_kg,
+    }
+
+
+class RoutePlanner:
+    """All-pairs shortest paths over the routes, by distance, hours or cost."""
+
+    def __init__(self, tariffs):
+        """
+        :param tariffs: (origin, dest) -> RouteTariff mapping (RouteService.pricing_index())
+        """
+        self.tariffs = dict(tariffs)
+        self.adjacency = {}
+        self.weights = {metric: {} for metric in METRICS}  # metric -> (origin, dest) -> edge weight
+        for (origin, dest), tariff in self.tariffs.items():
+            self.adjacency.setdefault(origin, set()).add(dest)
+            self.adjacency.setdefault(dest, set())
+            for metric, weight in _edge_weights(tariff).items():
+                self.weights[metric][(origin, dest)] = weight
+        # metric -> source -> (dist {province: total}, prev {province: predecessor})
+        self.trees = {metric: {} for metric in METRICS}
+        self._paths = {}  # (metric, origin, dest) -> PlannedRoute or None
+        for metric in METRICS:
+            for source in self.adjacency:
+                self.trees[metric][source] = self._dijkstra(source, metric)
+
+    @property
+    def provinces(self):
+        return sorted(self.adjacency)
+
+    def _dijkstra(self, source, metric):
+        weights = self.weights[metric]
+        dist = {source: 0.0}
+        prev = {}
+        heap = [(0.0, source)]
+        done = set()
+        while heap:
+            d, node = heapq.heappop(heap)
+            if node in done:
+                continue
+            done.add(node)
+            for neighbour in self.adjacency[node]:
+                candidate = d + weights[(node, neighbour)]
+                if candidate < dist.get(neighbour, float("inf")):
+                    dist[neighbour] = candidate
+                    prev[neighbour] = node
+                    heapq.heappush(heap, (candidate, neighbour))
+        return dist, prev
+
+    def path(self, origin, dest, metric="cost"):
+        """
+        Best path from origin to dest by the given metric.
+        :return: PlannedRoute, or None if dest is unreachable (or origin == dest)
+        """
+        key = (metric, origin, dest)
+        if key in self._paths:
+            return self._paths[key]
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric: {metric}")
+        self._paths[key] = planned = self._build_path(origin, dest, metric)
+        return planned
+
+    def _build_path(self, origin, dest, metric):
+        tree = self.trees[metric].get(origin)
+        if origin == dest or tree is None or dest not in tree[1]:
+            return None
+        prev = tree[1]
+        provinces = [dest]
+        while provinces[-1] != origin:
+            provinces.append(prev[provinces[-1]])
+        provinces.reverse()
+
+        distance = hours = base = per_kg = 0.0
+        for leg in zip(provinces, provinces[1:]):
+            tariff = self.tariffs[leg]
+            distance += tariff.distance_km
+            hours += tariff.est_hours
+            base += tariff.base_price
+            per_kg += tariff.price_per_kg
+        return PlannedRoute(tuple(provinces), distance, hours, base, per_kg)
+
+    def set_routes(self, changes):
+        """
+        Apply route changes and refresh the affected shortest-path trees.
+        :param changes: {(origin, dest): RouteTariff, or None for a removed route}
+        :return: Number of (metric, source) trees recomputed
+        """
+        # Sources whose tree may change, per metric
+        stale = {metric: set() for metric in METRICS}
+        for (origin, dest), tariff in changes.items():
+            old = self.tariffs.get((origin, dest))
+            old_weights = _edge_weights(old) if old else None
+            new_weights = _edge_weights(tariff) if tariff else None
+            for province in (origin, dest):
+                if province not in self.adjacency:
+                    self.adjacency[province] = set()
+                    for metric in METRICS:
+                        stale[metric].add(province)
+
+            for metric in METRICS:
+                old_weight = old_weights[metric] if old_weights else float("inf")
+                new_weight = new_weights[metric] if new_weights else float("inf")
+                for source, (dist, prev) in self.trees[metric].items():
+                    if new_weight < old_weight:
+                        # Cheaper or new edge: matters to sources it now gives a shorter way to dest
+                        if dist.get(origin, float("inf")) + new_weight < dist.get(dest, float("inf")):
+                            stale[metric].add(source)
+                    elif new_weight > old_weight:
+                        # Dearer or removed edge: matters to sources whose tree used it
+                        if prev.get(dest) == origin:
+                            stale[metric].add(source)
+
+            if tariff:
+                self.tariffs[(origin, dest)] = tariff
+                self.adjacency[origin].add(dest)
+                for metric, weight in new_weights.items():
+                    self.weights[metric][(origin, dest)] = weight
+            else:
+                self.tariffs.pop((origin, dest), None)
+                self.adjacency[origin].discard(dest)
+                for metric in METRICS:
+                    self.weights[metric].pop((origin, dest), None)
+
+        for metric, sources in stale.items():
+            for source in sources:
+                self.trees[metric][source] = self._dijkstra(source, metric)
+        self._paths = {}
+        return sum(len(sources) for sources in stale.values())
@@ -1,17 +1,167 @@
 # services/route_service.py
+import os
+import threading
+from typing import NamedTuple
+
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from sqlalchemy import event, func, and_
 from database.db_connection import SessionLocal
+from database.unit_of_work import get_session
 from models.route import Route
 from models.order import Order
 
 
+class RouteTariff(NamedTuple):
+    """Pricing data of one route, as held in the pricing index."""
+    id: int
+    distance_km: float
+    est_hours: float
+    base_price: float
+    price_per_kg: float
+
+    def calculate_shipping_cost(self, weight_kg):
+        """Same formula as Route.calculate_shipping_cost."""
+        return self.base_price + weight_kg * self.price_per_kg
+
+
 class RouteService:
     """Service for route CRUD and shipping cost calculation."""
 
+    DEFAULT_PRICE_PER_KG = 10000  # VND/kg when no route matches
+
+    # (origin, dest) -> RouteTariff for every route, shared by all instances.
+    # Loaded on first use and dropped by create/update/delete_route.
+    _pricing_index = None
+    _pricing_lock = threading.Lock()
+    # Multi-hop RoutePlanner over the same routes, built on first use and
+    # refreshed incrementally by create/update/delete_route
+    _planner = None
+    # Province x province RouteMatrix, memory-mapped from next to the database
+    # (or rebuilt and saved there when the routes changed)
+    _matrix = None
+
+    @classmethod
+    def pricing_index(cls):
+        """
+        The (origin, dest) -> RouteTariff index, loaded with one query on first use.
+        Treat it as read-only: invalidation replaces the dict instead of changing it.
+        """
+        index = cls._pricing_index
+        if index is not None:
+            return index
+        with cls._pricing_lock:
+            if cls._pricing_index is None:
+                cls._pricing_index = cls._load_pricing_index()
+            return cls._pricing_index
+
+    @classmethod
+    def invalidate_pricing_index(cls):
+        """Drop the pricing index and the route planner; the next lookup reloads them."""
+        with cls._pricing_lock:
+            cls._pricing_index = None
+            cls._planner = None
+            cls._matrix = None
+
+    @classmethod
+    def route_planner(cls):
+        """The shared RoutePlanner over all routes, built on first use."""
+        planner = cls._planner
+        if planner is not None:
+            return planner
+        from services.route_planner import RoutePlanner
+        index = cls.pricing_index()
+        with cls._pricing_lock:
+            if cls._planner is None:
+                cls._planner = RoutePlanner(index)
+            return cls._planner
+
+    @classmethod
+    def route_matrix(cls):
+        """
+        The shared RouteMatrix: loaded from <database>.routes.npy if it matches the
+        current routes, otherwise rebuilt from the planner and saved for next time.
+        """
+        matrix = cls._matrix
+        if matrix is not None:
+            return matrix
+        from services.route_matrix import RouteMatrix, routes_signature
+        index = cls.pricing_index()
+        stem = cls._matrix_stem()
+        matrix = RouteMatrix.load(stem, routes_signature(index)) if stem else None
+        if matrix is None:
+            matrix = RouteMatrix.build(index, cls.route_planner())
+            if stem:
+                try:
+                    matrix.save(stem)
+                except OSError as e:
+                    print(f"Error saving route matrix: {e}")
+        with cls._pricing_lock:
+            if cls._matrix is None:
+                cls._matrix = matrix
+            return cls._matrix
+
+    @staticmethod
+    def _matrix_stem():
+        """Database file path without extension, or None for an in-memory database."""
+        bind = SessionLocal.kw.get("bind")
+        database = bind.url.database if bind is not None else None
+        if not database or database == ":memory:":
+            return None
+        return os.path.splitext(os.path.abspath(database))[0]
+
+    @classmethod
+    def _routes_changed(cls, pairs):
+        """Reload the pricing index after a route commit and patch the planner for the changed pairs."""
+        with cls._pricing_lock:
+            cls._pricing_index = None
+            cls._matrix = None
+        planner = cls._planner
+        if planner is None:
+            return
+        index = cls.pricing_index()
+        with cls._pricing_lock:
+            planner.set_routes({pair: index.get(pair) for pair in pairs})
+
+    @staticmethod
+    def _load_pricing_index():
+        session: Session = get_session()
+        try:
+            rows = session.query(
+                Route.origin_province, Route.dest_province, Route.id, Route.distance_km,
+                Route.est_hours, Route.base_price, Route.price_per_kg
+            ).order_by(Route.id.desc()).all()
+            # Lowest ID wins if a province pair was stored twice, like find_route's first()
+            return {
+                (origin, dest): RouteTariff(
+                    route_id, distance_km or 0.0, est_hours or 0.0, base_price or 0.0, price_per_kg or 0.0
+                )
+                for origin, dest, route_id, distance_km, est_hours, base_price, price_per_kg in rows
+            }
+        finally:
+            session.close()
+
+    def get_tariff(self, origin, dest):
+        """RouteTariff of the origin -> dest route from the pricing index, or None."""
+        return self.pricing_index().get((origin, dest))
+
+    def route_estimate(self, origin, dest):
+        """
+        RouteEstimate (shortest distance, fastest hours, tariff) for origin -> dest
+        from the route matrix, or None if there is no way there.
+        """
+        return self.route_matrix().lookup(origin, dest)
+
+    def plan_route(self, origin, dest, metric="cost"):
+        """
+        Best path from origin to dest through other provinces if needed.
+        :param metric: "cost" (cheapest), "hours" (fastest) or "distance" (shortest)
+        :return: PlannedRoute (provinces, distance_km, est_hours, prices), or None if unreachable
+        """
+        return self.route_planner().path(origin, dest, metric)
+
     def get_all_routes(self):
         """Get all routes."""
-        session: Session = SessionLocal()
+        session: Session = get_session()
         try:
             return session.query(Route).order_by(Route.origin_province, Route.dest_province).all()
         finally:
@@ -19,7 +169,7 @@ class RouteService:
 
     def get_route_by_id(self, route_id):
         """Get route by ID."""
-        session: Session = SessionLocal()
+        session: Session = get_session()
         try:
             return session.query(Route).filter(Route.id == route_id).first()
         finally:
@@ -27,7 +177,7 @@ class RouteService:
 
     def find_route(self, origin, dest):
         """Find route by origin and destination."""
-        session: Session = SessionLocal()
+        session: Session = get_session()
         try:
             return session.query(Route).filter(
                 and_(Route.origin_province == origin, Route.dest_province == dest)
@@ -37,7 +187,7 @@ class RouteService:
 
     def create_route(self, data):
         """Create new route."""
-        session: Session = SessionLocal()
+        session: Session = get_session()
         try:
             # Check if route already exists
             existing = session.query(Route).filter(
@@ -60,6 +210,7 @@ class RouteService:
             )
             session.add(route)
             session.commit()
+            self._routes_changed([(route.origin_province, route.dest_province)])
             return True, "Thêm tuyến đường thành công"
         except Exception as e:
             session.rollback()
@@ -69,10 +220,11 @@ class RouteService:
 
     def update_route(self, route_id, data):
         """Update route."""
-        session: Session = SessionLocal()
+        session: Session = get_session()
         try:
             route = session.query(Route).filter(Route.id == route_id).first()
             if route:
+                old_pair = (route.origin_province, route.dest_province)
                 route.origin_province = data.get('origin_province', route.origin_province)
                 route.dest_province = data.get('dest_province', route.dest_province)
                 route.distance_km = data.get('distance_km', route.distance_km)
@@ -80,6 +232,7 @@ class RouteService:
                 route.base_price = data.get('base_price', route.base_price)
                 route.price_per_kg = data.get('price_per_kg', route.price_per_kg)
                 session.commit()
+                self._routes_changed({old_pair, (route.origin_province, route.dest_province)})
                 return True, "Cập nhật tuyến đường thành công"
             return False, "Không tìm thấy tuyến đường"
         except Exception as e:
@@ -90,12 +243,14 @@ class RouteService:
 
     def delete_route(self, route_id):
         """Delete route."""
-        session: Session = SessionLocal()
+        session: Session = get_session()
         try:
             route = session.query(Route).filter(Route.id == route_id).first()
             if route:
+                pair = (route.origin_province, route.dest_province)
                 session.delete(route)
                 session.commit()
+                self._routes_changed([pair])
                 return True, "Xóa tuyến đường thành công"
             return False, "Không tìm thấy tuyến đường"
         except Exception as e:
@@ -105,36 +260,72 @@ class RouteService:
             session.close()
 
     def calculate_shipping_cost(self, origin, dest, weight_kg):
-        """Calculate shipping cost for a route."""
-        route = self.find_route(origin, dest)
-        if route:
-            return route.calculate_shipping_cost(weight_kg)
+        """
+        Calculate shipping cost for a route (a pricing index lookup, no query).
+        Without a direct route the cheapest multi-hop route (from the route matrix) is priced instead.
+        """
+        index = self._pricing_index
+        if index is None:
+            index = self.pricing_index()
+        tariff = index.get((origin, dest))
+        if tariff:
+            return tariff.calculate_shipping_cost(weight_kg)
+        estimate = self.route_estimate(origin, dest)
+        if estimate:
+            return estimate.calculate_shipping_cost(weight_kg)
         # Default cost if no route found
-        return weight_kg * 10000  # 10,000 VND/kg default
+        return weight_kg * self.DEFAULT_PRICE_PER_KG
 
     def get_route_stats(self):
-        """Get statistics for routes."""
-        session: Session = SessionLocal()
+        """
+        Get order statistics for every route in one query
+        (orders match a route by sender/receiver province).
+        :return: List of dicts {route, order_count, total_weight, revenue, avg_cost},
+                 busiest route first
+        """
+        session: Session = get_session()
         try:
-            routes = session.query(Route).all()
-            stats = []
-
-            for route in routes:
-                # Count orders on this route
-                order_count = session.query(Order).filter(
-                    and_(
-                        Order.sender_province == route.origin_province,
-                        Order.receiver_province == route.dest_province
-                    )
-                ).count()
-
-                stats.append({
-                    'route': route,
-                    'order_count': order_count
-                })
+            # Aggregate orders per province pair first (index-only scan of
+            # ix_orders_route_totals), then attach the totals to each route
+            totals = session.query(
+                Order.sender_province.label('origin'),
+                Order.receiver_province.label('dest'),
+                func.count(Order.id).label('order_count'),
+                func.sum(Order.weight).label('total_weight'),
+                func.sum(Order.shipping_cost).label('revenue'),
+                func.avg(Order.shipping_cost).label('avg_cost')
+            ).group_by(Order.sender_province, Order.receiver_province).subquery()
+
+            order_count = func.coalesce(totals.c.order_count, 0)
+            rows = session.query(
+                Route,
+                order_count,
+                func.coalesce(totals.c.total_weight, 0.0),
+                func.coalesce(totals.c.revenue, 0.0),
+                func.coalesce(totals.c.avg_cost, 0.0)
+            ).outerjoin(
+                totals,
+                and_(totals.c.origin == Route.origin_province, totals.c.dest == Route.dest_province)
+            ).order_by(order_count.desc(), Route.id).all()
 
-            # Sort by order_count descending
-            stats.sort(key=lambda x: x['order_count'], reverse=True)
-            return stats
+            return [
+                {
+                    'route': route,
+                    'order_count': count,
+                    'total_weight': total_weight,
+                    'revenue': revenue,
+                    'avg_cost': avg_cost
+                }
+                for route, count, total_weight, revenue, avg_cost in rows
+            ]
+        except Exception as e:
+            print(f"Error getting route stats: {e}")
+            return []
         finally:
             session.close()
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _drop_pricing_index_on_rollback(_session):
+    # A rolled-back unit of work may have reloaded the index from route changes it then discarded
+    RouteService.invalidate_pricing_index()
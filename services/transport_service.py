@@ -35,3 +35,19 @@ class TransportService:
             # For simplicity, we just multiply exactly.
             total_fee = self.base_price_1_to_5kg + (extra_weight * self.surcharge_per_kg)
             return total_fee
+
+    def calculate_shipping_fees(self, weights_kg):
+        """
+        Vectorized calculate_shipping_fee: the same pricing rules applied to a whole array.
+
+        :param weights_kg: Sequence or NumPy array of weights in Kilograms
+        :return: NumPy float64 array of costs in VND
+        """
+        import numpy as np
+
+        weights = np.asarray(weights_kg, dtype=np.float64)
+        return np.select(
+            [weights <= 0, weights <= 1.0, weights <= 5.0],
+            [0.0, self.base_price_under_1kg, self.base_price_1_to_5kg],
+            self.base_price_1_to_5kg + (weights - 5.0) * self.surcharge_per_kg
+        )
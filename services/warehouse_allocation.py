@@ -0,0 +1,164 @@
+# services/warehouse_allocation.py
+"""
+Capacity-aware choice of warehouses for orders.
+
+A warehouse's score for an order picked up in province P is
+
+    distance_km(P -> warehouse province)                 (route matrix)
+    + OCCUPANCY_WEIGHT_KM * occupancy after admitting it
+    + OVERFULL_PENALTY_KM if that occupancy exceeds FULL_THRESHOLD
+
+and the lowest score wins. Only active warehouses with free capacity are
+candidates; a capacity of 0 means unlimited. Provinces the route matrix does
+not know are UNKNOWN_DISTANCE_KM from everywhere but their own province, so
+for them occupancy decides; warehouses no route reaches are never chosen.
+
+rebalance() suggests transfers out of warehouses above FULL_THRESHOLD, down
+to REBALANCE_TARGET. It moves the orders with the smallest detour: going
+source -> target -> receiver province instead of source -> receiver.
+"""
+from typing import NamedTuple
+
+import numpy as np
+
+FULL_THRESHOLD = 0.9
+REBALANCE_TARGET = 0.8
+OCCUPANCY_WEIGHT_KM = 200.0
+OVERFULL_PENALTY_KM = 1000.0
+UNKNOWN_DISTANCE_KM = 10000.0
+
+
+class WarehouseChoice(NamedTuple):
+    warehouse_id: int
+    distance_km: float
+    occupancy: float  # after admitting the order
+    score: float
+
+
+class Transfer(NamedTuple):
+    """Suggested move of orders between two warehouses."""
+    from_warehouse_id: int
+    to_warehouse_id: int
+    order_ids: list
+
+
+class WarehouseAllocator:
+    """Warehouse scores for a snapshot of the warehouses; assign() and rebalance() update its loads."""
+
+    def __init__(self, warehouses, matrix):
+        """
+        :param warehouses: Warehouse objects (every status; only active ones receive orders)
+        :param matrix: RouteMatrix (RouteService.route_matrix())
+        """
+        self.matrix = matrix
+        self.ids = [warehouse.id for warehouse in warehouses]
+        self.provinces = [warehouse.province for warehouse in warehouses]
+        self.capacity = np.array([
+            warehouse.capacity if (warehouse.capacity or 0) > 0 else np.inf for warehouse in warehouses
+        ], dtype=float)
+        self.load = np.array([warehouse.current_load or 0 for warehouse in warehouses], dtype=float)
+        self.active = np.array([warehouse.status == 'active' for warehouse in warehouses], dtype=bool)
+        self._rows = {}  # (province, inbound) -> distances()
+
+    def distances(self, province, inbound=False):
+        """
+        Distance (km) from a province to every warehouse, or from every warehouse
+        to the province if inbound; np.inf where no route leads.
+        """
+        key = (province, inbound)
+        row = self._rows.get(key)
+        if row is not None:
+            return row
+        code = self.matrix.codes.get(province)
+        row = np.full(len(self.ids), UNKNOWN_DISTANCE_KM)
+        if code is not None:
+            for i, warehouse_province in enumerate(self.provinces):
+                other = self.matrix.codes.get(warehouse_province)
+                if other is not None:
+                    distance = self.matrix.distance_km[(other, code) if inbound else (code, other)]
+                    row[i] = np.inf if np.isnan(distance) else distance  # NaN: unreachable
+        row[[i for i, warehouse_province in enumerate(self.provinces) if warehouse_province == province]] = 0.0
+        self._rows[key] = row
+        return row
+
+    def _scores(self, distances):
+        """Scores and occupancies of admitting one more order; np.inf where it cannot go."""
+        occupancy = (self.load + 1) / self.capacity
+        scores = distances + OCCUPANCY_WEIGHT_KM * occupancy + OVERFULL_PENALTY_KM * (occupancy > FULL_THRESHOLD)
+        scores[~self.active | (self.load + 1 > self.capacity)] = np.inf
+        return scores, occupancy
+
+    def rank(self, province, limit=None):
+        """Candidate warehouses for one order from province, best first (WarehouseChoice list)."""
+        distances = self.distances(province)
+        scores, occupancy = self._scores(distances)
+        order = np.argsort(scores, kind="stable")
+        choices = [
+            WarehouseChoice(self.ids[i], float(distances[i]), float(occupancy[i]), float(scores[i]))
+            for i in order if np.isfinite(scores[i])
+        ]
+        return choices[:limit] if limit else choices
+
+    def assign(self, provinces):
+        """
+        Pick a warehouse for each order in turn, counting earlier picks in the loads.
+        :param provinces: Pickup province of each order
+        :return: List of warehouse IDs (None where no warehouse has room or a route)
+        """
+        picks = []
+        for province in provinces:
+            scores, _ = self._scores(self.distances(province))
+            best = int(np.argmin(scores))
+            if scores[best] == np.inf:
+                picks.append(None)
+                continue
+            self.load[best] += 1
+            picks.append(self.ids[best])
+        return picks
+
+    def rebalance(self, orders, threshold=FULL_THRESHOLD, target=REBALANCE_TARGET):
+        """
+        Suggest transfers out of warehouses above `threshold` occupancy.
+        :param orders: {warehouse_id: [(order_id, receiver_province), ...]} - the movable orders
+        :return: List of Transfer, largest first
+        """
+        occupancy = self.load / self.capacity
+        moves = {}
+        for source in np.flatnonzero(occupancy > threshold):
+            candidates = orders.get(self.ids[source], [])
+            excess = int(self.load[source] - np.floor(target * self.capacity[source]))
+            if excess <= 0 or not candidates:
+                continue
+            # Targets must stay at or below the target occupancy
+            room = np.floor(target * self.capacity) - self.load
+            room[~self.active] = 0
+            room[source] = 0
+            if not (room > 0).any():
+                continue
+
+            # The detour only depends on the receiver province: compute it once per province
+            leg = self.distances(self.provinces[source])  # source -> each warehouse
+            detours = {}
+            for receiver in sorted({receiver for _, receiver in candidates}, key=str):
+                onward = self.distances(receiver, inbound=True)  # each warehouse -> receiver
+                direct = onward[source] if np.isfinite(onward[source]) else UNKNOWN_DISTANCE_KM
+                detour = leg + onward - direct
+                detour[~self.active] = np.inf
+                detour[source] = np.inf
+                detours[receiver] = detour
+            # Orders whose best detour is smallest move first
+            candidates = sorted(candidates, key=lambda item: (float(detours[item[1]].min()), item[0]))
+            for order_id, receiver in candidates:
+                if excess <= 0:
+                    break
+                detour = np.where(room > 0, detours[receiver], np.inf)
+                best = int(np.argmin(detour))
+                if not np.isfinite(detour[best]):
+                    continue
+                room[best] -= 1
+                self.load[best] += 1
+                self.load[source] -= 1
+                excess -= 1
+                moves.setdefault((self.ids[source], self.ids[best]), []).append(order_id)
+        return sorted((Transfer(src, dst, ids) for (src, dst), ids in moves.items()),
+                      key=lambda transfer: (-len(transfer.order_ids), transfer.from_warehouse_id))
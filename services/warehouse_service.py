@@ -1,9 +1,11 @@
 # services/warehouse_service.py
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from database.db_connection import SessionLocal
+from sqlalchemy import func, insert
+from database.unit_of_work import get_session, unit_of_work
 from models.warehouse import Warehouse, OrderWarehouseHistory
 from models.order import Order
+from services.batching import chunked
+from services.order_cache import order_cache
 from datetime import datetime
 
 
@@ -12,7 +14,7 @@ class WarehouseService:
 
     def get_all_warehouses(self):
         """Get all warehouses."""
-        session: Session = SessionLocal()
+        session: Session = get_session()
         try:
             return session.query(Warehouse).order_by(Warehouse.name).all()
         finally:
@@ -20,7 +22,7 @@ class WarehouseService:
 
     def get_warehouse_by_id(self, warehouse_id):
         """Get warehouse by ID."""
-        session: Session = SessionLocal()
+        session: Session = get_session()
         try:
             return session.query(Warehouse).filter(Warehouse.id == warehouse_id).first()
         finally:
@@ -28,7 +30,7 @@ class WarehouseService:
 
     def create_warehouse(self, data):
         """Create new warehouse."""
-        session: Session = SessionLocal()
+        session: Session = get_session()
         try:
             warehouse = Warehouse(
                 name=data.get('name'),
@@ -48,7 +50,7 @@ class WarehouseService:
 
     def update_warehouse(self, warehouse_id, data):
         """Update warehouse."""
-        session: Session = SessionLocal()
+        session: Session = get_session()
         try:
             warehouse = session.query(Warehouse).filter(Warehouse.id == warehouse_id).first()
             if warehouse:
@@ -68,7 +70,7 @@ class WarehouseService:
 
     def delete_warehouse(self, warehouse_id):
         """Delete warehouse."""
-        session: Session = SessionLocal()
+        session: Session = get_session()
         try:
             warehouse = session.query(Warehouse).filter(Warehouse.id == warehouse_id).first()
             if warehouse:
@@ -90,33 +92,97 @@ class WarehouseService:
             session.close()
 
     def get_warehouse_stats(self, warehouse_id):
-        """Get warehouse statistics."""
-        session: Session = SessionLocal()
+        """Get warehouse statistics (see get_all_warehouse_stats)."""
+        return self.get_all_warehouse_stats([warehouse_id]).get(warehouse_id)
+
+    def get_all_warehouse_stats(self, warehouse_ids=None, include_item_types=True):
+        """
+        Get statistics for all warehouses (or only warehouse_ids).
+        Occupancy comes from the maintained counters; the item-type breakdown
+        is one grouped query over orders and can be skipped.
+        :return: Dict {warehouse_id: {order_count, total_weight, capacity, capacity_pct, status, item_types}},
+                 item_types being {item_type: order count}
+        """
+        session: Session = get_session()
         try:
-            warehouse = session.query(Warehouse).filter(Warehouse.id == warehouse_id).first()
-            if not warehouse:
-                return None
+            query = session.query(Warehouse)
+            if warehouse_ids is not None:
+                query = query.filter(Warehouse.id.in_(warehouse_ids))
 
-            # Count orders in warehouse
-            order_count = session.query(Order).filter(
-                Order.current_warehouse_id == warehouse_id
-            ).count()
+            stats = {
+                wh.id: {
+                    'order_count': wh.current_load,
+                    'total_weight': wh.current_weight,
+                    'capacity': wh.capacity,
+                    'capacity_pct': wh.get_capacity_pct(),
+                    'status': wh.status,
+                    'item_types': {}
+                }
+                for wh in query.all()
+            }
 
-            # Calculate capacity percentage
-            capacity_pct = (order_count / warehouse.capacity * 100) if warehouse.capacity > 0 else 0
+            if include_item_types and stats:
+                # Orders per (warehouse, item type), counted from ix_orders_warehouse_item_type
+                breakdown = session.query(
+                    Order.current_warehouse_id, Order.item_type, func.count(Order.id)
+                ).filter(Order.current_warehouse_id.isnot(None))
+                if warehouse_ids is not None:
+                    breakdown = breakdown.filter(Order.current_warehouse_id.in_(warehouse_ids))
+                breakdown = breakdown.group_by(Order.current_warehouse_id, Order.item_type)
 
-            return {
-                'order_count': order_count,
-                'capacity': warehouse.capacity,
-                'capacity_pct': round(capacity_pct, 1),
-                'status': warehouse.status
-            }
+                for warehouse_id, item_type, count in breakdown.all():
+                    if warehouse_id in stats:
+                        item_type = item_type or 'normal'
+                        item_types = stats[warehouse_id]['item_types']
+                        item_types[item_type] = item_types.get(item_type, 0) + count
+            return stats
+        except Exception as e:
+            print(f"Error getting warehouse stats: {e}")
+            return {}
+        finally:
+            session.close()
+
+    def reconcile_warehouse_load(self, repair=False):
+        """
+        Compare the occupancy counters with a fresh count over orders.
+        :param repair: Recompute the counters of every warehouse when drift is found
+        :return: List of dicts {warehouse_id, name, current_load, actual_load,
+                 current_weight, actual_weight} for warehouses that drifted
+        """
+        from sqlalchemy import text
+        from database import warehouse_load
+
+        session: Session = get_session()
+        try:
+            drift = []
+            for wh_id, name, load, weight, actual_load, actual_weight in session.execute(
+                text(warehouse_load.ACTUAL_LOAD_SQL)
+            ):
+                # Weights are floats summed incrementally; ignore rounding residue
+                if load != actual_load or abs((weight or 0.0) - actual_weight) > 0.01:
+                    drift.append({
+                        'warehouse_id': wh_id,
+                        'name': name,
+                        'current_load': load,
+                        'actual_load': actual_load,
+                        'current_weight': weight,
+                        'actual_weight': actual_weight
+                    })
+
+            if drift and repair:
+                warehouse_load.recount(session.connection())
+                session.commit()
+            return drift
+        except Exception as e:
+            session.rollback()
+            print(f"Error reconciling warehouse load: {e}")
+            return []
         finally:
             session.close()
 
     def get_orders_in_warehouse(self, warehouse_id):
         """Get all orders currently in a warehouse."""
-        session: Session = SessionLocal()
+        session: Session = get_session()
         try:
             return session.query(Order).filter(
                 Order.current_warehouse_id == warehouse_id
@@ -126,7 +192,7 @@ class WarehouseService:
 
     def assign_order_to_warehouse(self, order_id, warehouse_id, note=""):
         """Assign an order to a warehouse."""
-        session: Session = SessionLocal()
+        session: Session = get_session()
         try:
             order = session.query(Order).filter(Order.id == order_id).first()
             if not order:
@@ -134,6 +200,12 @@ class WarehouseService:
 
             old_warehouse_id = order.current_warehouse_id
 
+            warehouse = session.query(Warehouse).filter(Warehouse.id == warehouse_id).first()
+            if not warehouse:
+                return False, "Không tìm thấy kho"
+            if old_warehouse_id != warehouse_id and warehouse.is_full():
+                return False, f"Kho đã đầy ({warehouse.current_load}/{warehouse.capacity} đơn)"
+
             # Record history if moving from another warehouse
             if old_warehouse_id and old_warehouse_id != warehouse_id:
                 history_out = OrderWarehouseHistory(
@@ -157,6 +229,7 @@ class WarehouseService:
             session.add(history_in)
 
             session.commit()
+            order_cache.invalidate([order_id])
             return True, "Gán đơn vào kho thành công"
         except Exception as e:
             session.rollback()
@@ -164,9 +237,276 @@ class WarehouseService:
         finally:
             session.close()
 
+    def assign_orders_to_warehouse(self, order_ids, warehouse_id, note="", check_capacity=True):
+        """
+        Move many orders into a warehouse in one transaction: orders are read and
+        updated per chunk of IDs and the history rows are bulk-inserted.
+        :param check_capacity: Admit orders only while the warehouse has room
+        :return: (success, message, results) - results maps order_id to
+                 {'success', 'message', 'old_warehouse_id'}; orders already in the
+                 warehouse count as successful but are not moved
+        """
+        session: Session = get_session()
+        try:
+            warehouse = session.query(Warehouse).filter(Warehouse.id == warehouse_id).first()
+            if not warehouse:
+                return False, "Không tìm thấy kho", {}
+
+            current = self._current_warehouses(session, order_ids)
+            free_slots = None
+            if check_capacity and (warehouse.capacity or 0) > 0:
+                free_slots = warehouse.capacity - (warehouse.current_load or 0)
+
+            results = {}
+            placements = {}
+            for order_id in dict.fromkeys(order_ids):
+                if order_id not in current:
+                    results[order_id] = self._move_result(False, "Không tìm thấy đơn hàng", None)
+                    continue
+                old_warehouse_id = current[order_id]
+                if old_warehouse_id == warehouse_id:
+                    results[order_id] = self._move_result(True, "Đơn đã ở trong kho", old_warehouse_id)
+                    continue
+                if free_slots is not None and free_slots <= 0:
+                    results[order_id] = self._move_result(
+                        False, f"Kho đã đầy ({warehouse.capacity}/{warehouse.capacity} đơn)", old_warehouse_id
+                    )
+                    continue
+                if free_slots is not None:
+                    free_slots -= 1
+                placements[order_id] = (old_warehouse_id, warehouse_id)
+                results[order_id] = self._move_result(True, "Đã chuyển kho", old_warehouse_id)
+
+            self._move_orders(session, placements, note)
+            session.commit()
+            order_cache.invalidate(placements)
+
+            success = all(result['success'] for result in results.values())
+            return success, f"Đã chuyển {len(placements)}/{len(results)} đơn vào kho {warehouse.name}", results
+        except Exception as e:
+            session.rollback()
+            return False, f"Lỗi: {e}", {}
+        finally:
+            session.close()
+
+    # Orders that may still be placed in or moved between warehouses
+    ALLOCATABLE_STATUSES = ("New", "Processing")
+
+    def _allocator(self, session):
+        """WarehouseAllocator over the current warehouses and the shared route matrix."""
+        from services.route_service import RouteService
+        from services.warehouse_allocation import WarehouseAllocator
+        warehouses = session.query(Warehouse).order_by(Warehouse.id).all()
+        return WarehouseAllocator(warehouses, RouteService.route_matrix())
+
+    def suggest_warehouses(self, province, limit=None):
+        """
+        Warehouses for an order picked up in province, best first: nearest by the
+        route matrix, least full, active and with room (see warehouse_allocation).
+        :return: List of WarehouseChoice (warehouse_id, distance_km, occupancy, score)
+        """
+        session: Session = get_session()
+        try:
+            return self._allocator(session).rank(province, limit)
+        except Exception as e:
+            print(f"Error suggesting warehouses: {e}")
+            return []
+        finally:
+            session.close()
+
+    def get_allocator(self):
+        """
+        Snapshot of the warehouses for ranking them many times without querying again,
+        e.g. while the sender province is typed in AddOrderDialog.
+        :return: WarehouseAllocator, or None on error
+        """
+        session: Session = get_session()
+        try:
+            return self._allocator(session)
+        except Exception as e:
+            print(f"Error loading warehouses: {e}")
+            return None
+        finally:
+            session.close()
+
+    def auto_assign_orders(self, order_ids=None, statuses=ALLOCATABLE_STATUSES, dry_run=False):
+        """
+        Put orders that are in no warehouse into the best warehouse for their sender
+        province, in one transaction. Each pick counts towards the load of the next.
+        :param order_ids: Orders to place (default: every order in `statuses` without a warehouse)
+        :param dry_run: Only compute the assignment
+        :return: (success, message, assignments) - assignments maps order_id to warehouse_id
+        """
+        with unit_of_work("auto_assign_orders") as unit:
+            session: Session = get_session()
+            try:
+                if order_ids is None:
+                    rows = session.query(Order.id, Order.sender_province).filter(
+                        Order.current_warehouse_id.is_(None), Order.status.in_(statuses)
+                    ).order_by(Order.id).all()
+                else:
+                    # Look up by primary key and filter here: with the extra conditions
+                    # SQLite prefers the status index and scans far more rows
+                    rows = []
+                    for chunk in chunked(sorted(set(order_ids))):
+                        rows.extend(
+                            (order_id, province) for order_id, province, warehouse_id, status in session.query(
+                                Order.id, Order.sender_province, Order.current_warehouse_id, Order.status
+                            ).filter(Order.id.in_(chunk)).order_by(Order.id)
+                            if warehouse_id is None and status in statuses
+                        )
+                picks = self._allocator(session).assign([province for _, province in rows])
+            except Exception as e:
+                session.rollback()
+                return False, f"Lỗi: {e}", {}
+            finally:
+                session.close()
+
+            assignments = {order_id: pick for (order_id, _), pick in zip(rows, picks) if pick is not None}
+            unplaced = len(rows) - len(assignments)
+            if not dry_run:
+                by_warehouse = {}
+                for order_id, warehouse_id in assignments.items():
+                    by_warehouse.setdefault(warehouse_id, []).append(order_id)
+                for warehouse_id, ids in sorted(by_warehouse.items()):
+                    success, message, _ = self.assign_orders_to_warehouse(ids, warehouse_id, note="Tự động phân kho")
+                    if not success:
+                        # Roll back the placements already flushed in this unit too
+                        unit.failed = True
+                        return False, f"{message} - đã huỷ, không đơn nào được phân kho", {}
+        if unit.failed:
+            return False, "Lỗi: không thể phân kho", {}
+
+        message = f"{'Sẽ phân' if dry_run else 'Đã phân'} {len(assignments)} đơn vào kho"
+        if unplaced:
+            message += f", {unplaced} đơn không còn kho phù hợp"
+        return True, message, assignments
+
+    def suggest_rebalancing(self, threshold=None, target=None, statuses=ALLOCATABLE_STATUSES):
+        """
+        Transfers that bring warehouses above `threshold` occupancy (default 90%)
+        down to `target` (default 80%), moving the orders that detour least.
+        :return: List of Transfer (from_warehouse_id, to_warehouse_id, order_ids)
+        """
+        from services.warehouse_allocation import FULL_THRESHOLD, REBALANCE_TARGET
+        threshold = FULL_THRESHOLD if threshold is None else threshold
+        target = REBALANCE_TARGET if target is None else target
+        session: Session = get_session()
+        try:
+            allocator = self._allocator(session)
+            overfull = [
+                warehouse_id for warehouse_id, load, capacity in zip(allocator.ids, allocator.load, allocator.capacity)
+                if load > threshold * capacity
+            ]
+            orders = {}
+            for chunk in chunked(overfull):
+                rows = session.query(Order.id, Order.current_warehouse_id, Order.receiver_province).filter(
+                    Order.current_warehouse_id.in_(chunk), Order.status.in_(statuses)
+                ).order_by(Order.id)
+                for order_id, warehouse_id, receiver in rows:
+                    orders.setdefault(warehouse_id, []).append((order_id, receiver))
+            return allocator.rebalance(orders, threshold, target)
+        except Exception as e:
+            print(f"Error planning warehouse rebalancing: {e}")
+            return []
+        finally:
+            session.close()
+
+    def apply_rebalancing(self, transfers):
+        """
+        Carry out suggested transfers in one transaction.
+        :return: (success, message)
+        """
+        moved = 0
+        with unit_of_work("apply_rebalancing") as unit:
+            for transfer in transfers:
+                note = f"Cân bằng tải từ kho #{transfer.from_warehouse_id}"
+                success, message, results = self.assign_orders_to_warehouse(
+                    transfer.order_ids, transfer.to_warehouse_id, note=note
+                )
+                if not success:
+                    # Roll back the transfers already flushed in this unit too
+                    unit.failed = True
+                    return False, f"{message} - đã huỷ, không đơn nào được chuyển"
+                moved += sum(1 for result in results.values() if result['old_warehouse_id'] != transfer.to_warehouse_id)
+        if unit.failed:
+            return False, "Lỗi: không thể cân bằng kho"
+        return True, f"Đã chuyển {moved} đơn giữa {len(transfers)} cặp kho"
+
+    def restore_order_warehouses(self, placements, note="Hoàn tác chuyển kho"):
+        """
+        Put orders back into given warehouses in one transaction (no capacity check).
+        :param placements: Dict {order_id: warehouse_id or None}; None takes the order out of any warehouse
+        :return: (success, message)
+        """
+        session: Session = get_session()
+        try:
+            current = self._current_warehouses(session, list(placements))
+            moves = {
+                order_id: (current[order_id], warehouse_id)
+                for order_id, warehouse_id in placements.items()
+                if order_id in current and current[order_id] != warehouse_id
+            }
+            self._move_orders(session, moves, note)
+            session.commit()
+            order_cache.invalidate(moves)
+            return True, f"Đã chuyển {len(moves)} đơn"
+        except Exception as e:
+            session.rollback()
+            return False, f"Lỗi: {e}"
+        finally:
+            session.close()
+
+    @staticmethod
+    def _move_result(success, message, old_warehouse_id):
+        return {'success': success, 'message': message, 'old_warehouse_id': old_warehouse_id}
+
+    def _current_warehouses(self, session, order_ids):
+        """Map order_id -> current_warehouse_id for the orders that exist."""
+        current = {}
+        for chunk in chunked(set(order_ids)):
+            current.update(session.query(Order.id, Order.current_warehouse_id).filter(Order.id.in_(chunk)).all())
+        return current
+
+    def _move_orders(self, session, moves, note=""):
+        """
+        Apply {order_id: (old_warehouse_id, new_warehouse_id)} inside the caller's
+        transaction: one UPDATE per target warehouse and chunk, plus bulk history rows.
+        """
+        if not moves:
+            return
+        now = datetime.now()
+        by_target = {}
+        history = []
+        for order_id, (old_warehouse_id, new_warehouse_id) in moves.items():
+            by_target.setdefault(new_warehouse_id, []).append(order_id)
+            if old_warehouse_id:
+                history.append({
+                    'order_id': order_id,
+                    'warehouse_id': old_warehouse_id,
+                    'action': 'out',
+                    'note': f"Chuyển đến kho ID {new_warehouse_id}" if new_warehouse_id else (note or "Xuất kho"),
+                    'timestamp': now
+                })
+            if new_warehouse_id:
+                history.append({
+                    'order_id': order_id,
+                    'warehouse_id': new_warehouse_id,
+                    'action': 'in',
+                    'note': note or "Nhập kho",
+                    'timestamp': now
+                })
+
+        for warehouse_id, ids in by_target.items():
+            for chunk in chunked(ids):
+                session.query(Order).filter(Order.id.in_(chunk)).update(
+                    {Order.current_warehouse_id: warehouse_id}, synchronize_session=False
+                )
+        session.execute(insert(OrderWarehouseHistory), history)
+
     def get_order_warehouse_history(self, order_id):
         """Get warehouse movement history for an order."""
-        session: Session = SessionLocal()
+        session: Session = get_session()
         try:
             return session.query(OrderWarehouseHistory).filter(
                 OrderWarehouseHistory.order_id == order_id
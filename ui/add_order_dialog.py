@@ -44,6 +44,10 @@ class AddOrderDialog(BaseDialog):
         self.btn_auto_calc = None
         self.chk_cod = None
         self.spin_cod_amount = None
+        self._warehouse_picked = False  # The user chose a warehouse: stop preselecting suggestions
+        self._warehouses = None  # Loaded once per dialog by _load_warehouses
+        self._allocator = None
+        self._ranked_province = None
 
         self.transport_service = TransportService()
         self.setup_ui()
@@ -90,8 +94,8 @@ class AddOrderDialog(BaseDialog):
 
         # Warehouse
         self.cmb_warehouse = QComboBox()
-        self.cmb_warehouse.addItem("-- Chọn kho --", None)
         self._load_warehouses()
+        self.cmb_warehouse.activated.connect(self._on_warehouse_picked)
         form.addRow("Kho lưu trữ:", self.cmb_warehouse)
 
         self.tabs.addTab(tab, "📋 Cơ bản")
@@ -125,6 +129,8 @@ class AddOrderDialog(BaseDialog):
         self.cmb_sender_province.setCompleter(completer_sender)
         self.cmb_sender_province.currentTextChanged.connect(self.on_sender_province_changed)
         self.cmb_sender_province.currentTextChanged.connect(self.auto_calculate_cost)
+        self.cmb_sender_province.currentTextChanged.connect(self._load_warehouses)
+        self._load_warehouses(self.cmb_sender_province.currentText())
         form.addRow("Tỉnh/Thành:", self.cmb_sender_province)
 
         # Ward/Commune dropdown (dependent on province)
@@ -390,13 +396,44 @@ class AddOrderDialog(BaseDialog):
                 completer.setFilterMode(Qt.MatchFlag.MatchContains)
                 self.cmb_receiver_ward.setCompleter(completer)
 
-    def _load_warehouses(self):
-        """Load warehouses into dropdown."""
-        from services.warehouse_service import WarehouseService
-        warehouses = WarehouseService().get_all_warehouses()
-        for wh in warehouses:
-            if wh.status == 'active':
-                self.cmb_warehouse.addItem(f"{wh.name} ({wh.province})", wh.id)
+    def _load_warehouses(self, province=None):
+        """
+        Load warehouses into dropdown. Given the sender province, list the suggested
+        ones first (nearest, least full) and preselect the best unless the user picked one.
+        The warehouses are queried once per dialog; a province change only re-ranks them.
+        """
+        if self._warehouses is None:
+            from services.warehouse_service import WarehouseService
+            service = WarehouseService()
+            self._warehouses = {
+                wh.id: wh for wh in service.get_all_warehouses() if wh.status == 'active' and not wh.is_full()
+            }
+            self._allocator = service.get_allocator()
+        elif province == self._ranked_province or (province and province not in VIETNAM_PROVINCES):
+            return  # Unchanged, or a half-typed name
+        self._ranked_province = province
+        warehouses = self._warehouses
+        ranked = self._allocator.rank(province) if province and self._allocator else []
+        choices = [c for c in ranked if c.warehouse_id in warehouses]
+        suggested = {c.warehouse_id: c for c in choices}
+        picked = self.cmb_warehouse.currentData() if self._warehouse_picked else None
+
+        self.cmb_warehouse.clear()
+        self.cmb_warehouse.addItem("-- Chọn kho --", None)
+        for wh_id in list(suggested) + [wh_id for wh_id in warehouses if wh_id not in suggested]:
+            wh = warehouses[wh_id]
+            label = f"{wh.name} ({wh.province})"
+            if wh_id in suggested:
+                label += f" - {suggested[wh_id].distance_km:.0f} km, đầy {wh.get_capacity_pct()}%"
+            self.cmb_warehouse.addItem(label, wh_id)
+
+        selected = picked if self._warehouse_picked else (choices[0].warehouse_id if choices else None)
+        index = self.cmb_warehouse.findData(selected)
+        if index >= 0:
+            self.cmb_warehouse.setCurrentIndex(index)
+
+    def _on_warehouse_picked(self, _index):
+        self._warehouse_picked = True
 
     def auto_calculate_cost(self):
         """Calculate shipping cost based on route and weight."""
@@ -414,16 +451,23 @@ class AddOrderDialog(BaseDialog):
         self.lbl_route_info.setText(f"Tuyến: {origin} → {dest}")
 
         route_service = RouteService()
-        route = route_service.find_route(origin, dest)
-
-        if route:
-            cost = route.calculate_shipping_cost(weight)
-            self.spin_cost.setValue(cost)
-            self.lbl_route_info.setText(f"Tuyến: {origin} → {dest} ({route.distance_km:.0f}km)")
+        # Pricing index and route matrix lookups: no query per province/weight change
+        tariff = route_service.get_tariff(origin, dest)
+        estimate = route_service.route_estimate(origin, dest)
+        self.spin_cost.setValue(route_service.calculate_shipping_cost(origin, dest, weight))
+
+        if tariff:
+            self.lbl_route_info.setText(
+                f"Tuyến: {origin} → {dest} ({tariff.distance_km:.0f}km, ~{tariff.est_hours:.0f} giờ)"
+            )
             self.lbl_route_info.setStyleSheet("color: #4CAF50; font-style: italic;")
+        elif estimate:
+            planned = route_service.plan_route(origin, dest)
+            self.lbl_route_info.setText(
+                f"Tuyến: {origin} → {dest} (qua {', '.join(planned.via)}, "
+                f"{planned.distance_km:.0f}km, ~{estimate.est_hours:.0f} giờ)"
+            )
+            self.lbl_route_info.setStyleSheet("color: #2196F3; font-style: italic;")
         else:
-            # Default cost if no route found
-            default_cost = weight * 10000  # 10,000 VND/kg
-            self.spin_cost.setValue(default_cost)
             self.lbl_route_info.setText(f"Tuyến: {origin} → {dest} (Chưa có giá cước)")
             self.lbl_route_info.setStyleSheet("color: #FF9800; font-style: italic;")
@@ -13,18 +13,18 @@ class DashboardTab(QWidget):
         self.canvas = FigureCanvas(self.figure)
         self.layout.addWidget(self.canvas)
 
-    def update_chart(self, orders):
+    def update_chart(self, summary):
         """
-        Receive list of orders, process data, and redraw the chart.
+        Receive per-status summary {status: (count, revenue)} and redraw the chart.
         """
         # 1. Process Data: Count orders by Status
         status_counts = {}
         total_revenue = 0.0
 
-        for order in orders:
-            status = order.status or "Unknown"
-            status_counts[status] = status_counts.get(status, 0) + 1
-            total_revenue += order.shipping_cost
+        for status, (count, revenue) in summary.items():
+            status = status or "Unknown"
+            status_counts[status] = status_counts.get(status, 0) + count
+            total_revenue += revenue or 0.0
 
         # 2. Prepare data for plotting
         labels = list(status_counts.keys())
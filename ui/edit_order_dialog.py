@@ -225,17 +225,24 @@ class EditOrderDialog(BaseDialog):
         self.lbl_route_info.setText(f"Tuyến: {origin} → {dest}")
 
         route_service = RouteService()
-        route = route_service.find_route(origin, dest)
-
-        if route:
-            cost = route.calculate_shipping_cost(weight)
-            self.spin_cost.setValue(cost)
-            self.lbl_route_info.setText(f"Tuyến: {origin} → {dest} ({route.distance_km:.0f}km)")
+        # Pricing index and route matrix lookups: no query per province/weight change
+        tariff = route_service.get_tariff(origin, dest)
+        estimate = route_service.route_estimate(origin, dest)
+        self.spin_cost.setValue(route_service.calculate_shipping_cost(origin, dest, weight))
+
+        if tariff:
+            self.lbl_route_info.setText(
+                f"Tuyến: {origin} → {dest} ({tariff.distance_km:.0f}km, ~{tariff.est_hours:.0f} giờ)"
+            )
             self.lbl_route_info.setStyleSheet("color: #4CAF50; font-style: italic;")
+        elif estimate:
+            planned = route_service.plan_route(origin, dest)
+            self.lbl_route_info.setText(
+                f"Tuyến: {origin} → {dest} (qua {', '.join(planned.via)}, "
+                f"{planned.distance_km:.0f}km, ~{estimate.est_hours:.0f} giờ)"
+            )
+            self.lbl_route_info.setStyleSheet("color: #2196F3; font-style: italic;")
         else:
-            # Default cost if no route found
-            default_cost = weight * 10000  # 10,000 VND/kg
-            self.spin_cost.setValue(default_cost)
             self.lbl_route_info.setText(f"Tuyến: {origin} → {dest} (Chưa có giá cước)")
             self.lbl_route_info.setStyleSheet("color: #FF9800; font-style: italic;")
 
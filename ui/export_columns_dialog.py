@@ -0,0 +1,82 @@
+# ui/export_columns_dialog.py
+from PyQt6.QtWidgets import (QVBoxLayout, QHBoxLayout, QLabel, QListWidget, QListWidgetItem,
+                             QPushButton, QDialogButtonBox)
+from PyQt6.QtCore import Qt
+from services.report_service import ReportService
+from ui.base_dialog import BaseDialog
+from ui.constants import LIST_STYLE, HEADER_STYLE_SMALL, BUTTON_STYLE_SECONDARY_SMALL
+
+
+class ExportColumnsDialog(BaseDialog):
+    """Dialog to choose the columns (and filter scope) of an Excel export."""
+
+    def __init__(self, parent=None, has_filters=False):
+        super().__init__(parent, title="Xuất Excel", min_width=380, min_height=520)
+        self.has_filters = has_filters
+        self.setup_ui()
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setSpacing(12)
+        layout.setContentsMargins(20, 20, 20, 20)
+
+        header = QLabel("📊 Chọn cột cần xuất")
+        header.setStyleSheet(HEADER_STYLE_SMALL)
+        layout.addWidget(header)
+
+        # Column list with checkboxes
+        self.list_columns = QListWidget()
+        self.list_columns.setStyleSheet(LIST_STYLE)
+        for key, (title, _) in ReportService.EXPORT_COLUMNS.items():
+            item = QListWidgetItem(title)
+            item.setData(Qt.ItemDataRole.UserRole, key)
+            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+            checked = key in ReportService.DEFAULT_COLUMNS
+            item.setCheckState(Qt.CheckState.Checked if checked else Qt.CheckState.Unchecked)
+            self.list_columns.addItem(item)
+        self.list_columns.itemChanged.connect(self.update_ok_button)
+        layout.addWidget(self.list_columns)
+
+        # Select all / none
+        select_layout = QHBoxLayout()
+        btn_all = QPushButton("Chọn tất cả")
+        btn_none = QPushButton("Bỏ chọn")
+        for btn in (btn_all, btn_none):
+            btn.setStyleSheet(BUTTON_STYLE_SECONDARY_SMALL)
+            select_layout.addWidget(btn)
+        btn_all.clicked.connect(lambda: self.set_all_checked(True))
+        btn_none.clicked.connect(lambda: self.set_all_checked(False))
+        layout.addLayout(select_layout)
+
+        # Export only the orders shown by the current filter
+        self.chk_filtered = self.create_checkbox("Chỉ xuất các đơn theo bộ lọc hiện tại", checked=self.has_filters)
+        self.chk_filtered.setEnabled(self.has_filters)
+        layout.addWidget(self.chk_filtered)
+
+        self.buttons = QDialogButtonBox(
+            QDialogButtonBox.StandardButton.Ok |
+            QDialogButtonBox.StandardButton.Cancel
+        )
+        self.buttons.button(QDialogButtonBox.StandardButton.Ok).setText("Xuất")
+        self.buttons.button(QDialogButtonBox.StandardButton.Cancel).setText("Huỷ")
+        self.buttons.accepted.connect(self.accept)
+        self.buttons.rejected.connect(self.reject)
+        layout.addWidget(self.buttons)
+
+    def set_all_checked(self, checked):
+        state = Qt.CheckState.Checked if checked else Qt.CheckState.Unchecked
+        for row in range(self.list_columns.count()):
+            self.list_columns.item(row).setCheckState(state)
+
+    def update_ok_button(self):
+        """At least one column must be selected."""
+        self.buttons.button(QDialogButtonBox.StandardButton.Ok).setEnabled(bool(self.get_columns()))
+
+    def get_columns(self):
+        """Return the checked EXPORT_COLUMNS keys in sheet order."""
+        items = (self.list_columns.item(row) for row in range(self.list_columns.count()))
+        return [item.data(Qt.ItemDataRole.UserRole) for item in items
+                if item.checkState() == Qt.CheckState.Checked]
+
+    def use_filters(self):
+        return self.chk_filtered.isChecked()
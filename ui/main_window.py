@@ -1,6 +1,6 @@
 # ui/main_window.py
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout,
-                             QPushButton, QTableWidget, QHBoxLayout,
+                             QPushButton, QTableView, QHBoxLayout,
                              QHeaderView, QLabel, QLineEdit, QComboBox,
                              QListWidget, QListWidgetItem, QStackedWidget, QSplitter)
 from PyQt6.QtCore import pyqtSignal, Qt
@@ -189,44 +189,26 @@ class MainWindow(QMainWindow):
         self.filter_panel.setVisible(False)
         layout.addWidget(self.filter_panel)
 
-        # Table with new columns
-        self.table = QTableWidget()
-        self.table.setColumnCount(7)
-        self.table.setHorizontalHeaderLabels([
-            "Mã đơn", "Trạng thái", "Người gửi → Người nhận",
-            "Tuyến đường", "Số kiện / KL", "Tổng phí", "Thời gian tạo"
-        ])
+        # Table with new columns (model is attached by MainController)
+        self.table = QTableView()
 
-        # Set column widths
-        header = self.table.horizontalHeader()
-        header.setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)  # Mã đơn
-        header.setSectionResizeMode(1, QHeaderView.ResizeMode.ResizeToContents)  # Trạng thái
-        header.setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)  # Người gửi → Người nhận
-        header.setSectionResizeMode(3, QHeaderView.ResizeMode.ResizeToContents)  # Tuyến đường
-        header.setSectionResizeMode(4, QHeaderView.ResizeMode.ResizeToContents)  # Số kiện / KL
-        header.setSectionResizeMode(5, QHeaderView.ResizeMode.ResizeToContents)  # Tổng phí
-        header.setSectionResizeMode(6, QHeaderView.ResizeMode.ResizeToContents)  # Thời gian tạo
-
-        # Set minimum widths for stretch columns
-        self.table.setColumnWidth(2, 350)  # Người gửi → Người nhận (Wider)
-
-        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.table.setSelectionMode(QTableWidget.SelectionMode.ExtendedSelection)
+        self.table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QTableView.SelectionMode.ExtendedSelection)
         self.table.setAlternatingRowColors(True)
         self.table.setShowGrid(True)
-        self.table.setSortingEnabled(True)  # Enable sorting by clicking headers
 
-        # Set row height
+        # Set row height (fixed, so the view never measures rows it doesn't paint)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
         self.table.verticalHeader().setDefaultSectionSize(40)
         self.table.verticalHeader().setVisible(False)
         self.table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 gridline-color: #ccc;
                 border: 1px solid #bbb;
                 background-color: white;
                 alternate-background-color: #f9f9f9;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 6px;
                 border-bottom: 1px solid #ddd;
             }
@@ -265,13 +247,36 @@ class MainWindow(QMainWindow):
         btn_layout = QHBoxLayout()
         self.btn_add = QPushButton("➕ Thêm đơn hàng")
         self.btn_scan_ai = QPushButton("📷 Scan với OCR.space")
+        self.btn_import = QPushButton("📥 Nhập đơn hàng loạt")
         self.btn_export = QPushButton("📊 Xuất Excel")
 
         btn_layout.addWidget(self.btn_add)
         btn_layout.addWidget(self.btn_scan_ai)
+        btn_layout.addWidget(self.btn_import)
         btn_layout.addWidget(self.btn_export)
         layout.addLayout(btn_layout)
 
+    def set_order_model(self, model):
+        """Attach the order table model and set up its columns."""
+        self.table.setModel(model)
+
+        # Set column widths
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)  # Mã đơn
+        header.setSectionResizeMode(1, QHeaderView.ResizeMode.ResizeToContents)  # Trạng thái
+        header.setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)  # Người gửi → Người nhận
+        header.setSectionResizeMode(3, QHeaderView.ResizeMode.ResizeToContents)  # Tuyến đường
+        header.setSectionResizeMode(4, QHeaderView.ResizeMode.ResizeToContents)  # Số kiện / KL
+        header.setSectionResizeMode(5, QHeaderView.ResizeMode.ResizeToContents)  # Tổng phí
+        header.setSectionResizeMode(6, QHeaderView.ResizeMode.ResizeToContents)  # Thời gian tạo
+
+        # Set minimum widths for stretch columns
+        self.table.setColumnWidth(2, 350)  # Người gửi → Người nhận (Wider)
+
+        # Default order: oldest first, like the database order before
+        header.setSortIndicator(6, Qt.SortOrder.AscendingOrder)
+        self.table.setSortingEnabled(True)  # Enable sorting by clicking headers
+
     def toggle_filter_panel(self):
         """Toggle visibility of filter panel."""
         is_visible = self.btn_toggle_filter.isChecked()
@@ -0,0 +1,170 @@
+# ui/order_table_model.py
+"""
+Lazy table model for the main order list.
+Rows are fetched from OrderService page by page as the view scrolls,
+and cell text is only formatted for the rows Qt actually paints.
+"""
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+
+class OrderTableModel(QAbstractTableModel):
+    """Paged, sortable model backing the order QTableView."""
+
+    HEADERS = [
+        "Mã đơn", "Trạng thái", "Người gửi → Người nhận",
+        "Tuyến đường", "Số kiện / KL", "Tổng phí", "Thời gian tạo"
+    ]
+
+    # Column index -> OrderService sort key
+    SORT_KEYS = ["tracking_code", "status", "parties", "route", "package", "total", "created_at"]
+
+    STATUS_DISPLAY = {
+        'New': 'Mới tạo',
+        'Processing': 'Đang xử lý',
+        'Shipping': 'Đang giao',
+        'Delivered': 'Đã giao',
+        'Cancelled': 'Đã huỷ'
+    }
+
+    def __init__(self, service, page_size=200, parent=None):
+        super().__init__(parent)
+        self.service = service
+        self.page_size = page_size
+        self.filters = {}
+        self.sort_key = "created_at"
+        self.descending = False
+        self._rows = []
+        self._total = 0
+
+    # --- Data loading ---
+
+    def set_filters(self, filters=None, total=None, first_page=None):
+        """
+        Reset the model to a new filter and load the first page.
+        :param first_page: Rows of the first page if the caller already fetched them
+        """
+        self.filters = dict(filters or {})
+        if first_page is None:
+            self._reload(total)
+            return
+        self.beginResetModel()
+        self._rows = list(first_page)
+        self._total = self.service.count_orders(**self.filters) if total is None else total
+        self.endResetModel()
+
+    def refresh(self):
+        """Reload from the first page, keeping filter and sort order."""
+        self._reload()
+
+    def _reload(self, total=None):
+        self.beginResetModel()
+        self._rows = []
+        self._total = self.service.count_orders(**self.filters) if total is None else total
+        self.endResetModel()
+        self.fetchMore(QModelIndex())
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return False
+        return len(self._rows) < self._total
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        # Creation-time order pages by keyset cursor, other sorts by offset
+        cursor = None
+        if self.sort_key == "created_at" and self._rows:
+            cursor = (self._rows[-1].created_at, self._rows[-1].id)
+        rows = self.service.get_order_rows(
+            offset=len(self._rows),
+            limit=self.page_size,
+            sort_key=self.sort_key,
+            descending=self.descending,
+            cursor=cursor,
+            **self.filters
+        )
+        if not rows:
+            # Table shrank under us (e.g. deleted elsewhere) - stop paging
+            self._total = len(self._rows)
+            return
+        start = len(self._rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(rows) - 1)
+        self._rows.extend(rows)
+        self.endInsertRows()
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        """Sort on the database side and restart paging."""
+        if column < 0 or column >= len(self.SORT_KEYS):
+            return
+        self.sort_key = self.SORT_KEYS[column]
+        self.descending = order == Qt.SortOrder.DescendingOrder
+        self._reload(self._total)
+
+    # --- Row helpers used by controllers ---
+
+    def total_count(self):
+        return self._total
+
+    def order_id_at(self, row):
+        """Get order ID for a view row."""
+        if 0 <= row < len(self._rows):
+            return self._rows[row].id
+        return None
+
+    def tracking_code_at(self, row):
+        """Get tracking code for a view row."""
+        if 0 <= row < len(self._rows):
+            return self._rows[row].tracking_code
+        return None
+
+    # --- QAbstractTableModel interface ---
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+
+        order = self._rows[index.row()]
+        column = index.column()
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._format_cell(order, column)
+        if role == Qt.ItemDataRole.UserRole and column == 0:
+            return order.id
+        if role == Qt.ItemDataRole.TextAlignmentRole and column != 2:
+            return Qt.AlignmentFlag.AlignCenter
+        return None
+
+    def _format_cell(self, order, column):
+        """Format one cell the same way the old QTableWidget rows were built."""
+        if column == 0:
+            return order.tracking_code
+        if column == 1:
+            return self.STATUS_DISPLAY.get(order.status, order.status)
+        if column == 2:
+            return f"{order.sender_name or 'N/A'} → {order.receiver_name or 'N/A'}"
+        if column == 3:
+            return f"{order.sender_province or 'N/A'} → {order.receiver_province or 'N/A'}"
+        if column == 4:
+            return f"{order.package_count or 1} kiện / {order.weight or 0.0:.1f} kg"
+        if column == 5:
+            total = order.shipping_cost or 0.0
+            if order.has_cod:
+                total += order.cod_amount or 0.0
+            cost_text = f"{total:,.0f} VND"
+            if order.has_cod:
+                cost_text += " (COD)"
+            return cost_text
+        if column == 6:
+            return order.created_at.strftime("%d/%m/%Y %H:%M") if order.created_at else "N/A"
+        return None
@@ -114,9 +114,9 @@ class RouteTab(QWidget):
 
         # Table
         self.table = QTableWidget()
-        self.table.setColumnCount(7)
+        self.table.setColumnCount(8)
         self.table.setHorizontalHeaderLabels([
-            "ID", "Xuất phát", "Đích", "Khoảng cách", "Thời gian", "Giá cơ bản", "Số đơn"
+            "ID", "Xuất phát", "Đích", "Khoảng cách", "Thời gian", "Giá cơ bản", "Số đơn", "Doanh thu"
         ])
 
         # Consistent layout with other tabs
@@ -131,6 +131,7 @@ class RouteTab(QWidget):
         header.setSectionResizeMode(4, QHeaderView.ResizeMode.ResizeToContents)
         header.setSectionResizeMode(5, QHeaderView.ResizeMode.ResizeToContents)
         header.setSectionResizeMode(6, QHeaderView.ResizeMode.ResizeToContents)
+        header.setSectionResizeMode(7, QHeaderView.ResizeMode.ResizeToContents)
 
         # Set minimum widths
         self.table.setColumnWidth(1, 150)
@@ -204,6 +205,11 @@ class RouteTab(QWidget):
             count_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
             self.table.setItem(row_idx, 6, count_item)
 
+            # Revenue
+            revenue_item = QTableWidgetItem(f"{stat['revenue']:,.0f} VND")
+            revenue_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+            self.table.setItem(row_idx, 7, revenue_item)
+
         self.lbl_footer.setText(f"Tổng: {len(stats)} tuyến")
 
     def add_route(self):
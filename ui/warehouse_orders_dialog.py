@@ -34,7 +34,9 @@ class WarehouseOrdersDialog(BaseDialog):
         header_layout.addStretch()
 
         # Stats
-        stats = self.service.get_warehouse_stats(self.warehouse_id)
+        stats = self.service.get_all_warehouse_stats(
+            [self.warehouse_id], include_item_types=False
+        ).get(self.warehouse_id)
         if stats:
             stats_label = QLabel(f"📦 {stats['order_count']}/{stats['capacity']} ({stats['capacity_pct']:.0f}%)")
             stats_label.setStyleSheet(INFO_STYLE)
@@ -72,14 +72,14 @@ class WarehouseSelectDialog(BaseDialog):
 
     def add_warehouse_item(self, wh):
         """Add warehouse item to list."""
-        stats = self.service.get_warehouse_stats(wh.id)
-        order_count = stats['order_count'] if stats else 0
-        capacity_pct = stats['capacity_pct'] if stats else 0
-
-        text = f"{wh.name}\n📍 {wh.province or 'N/A'} | 📦 {order_count}/{wh.capacity} ({capacity_pct:.0f}%)"
+        text = f"{wh.name}\n📍 {wh.province or 'N/A'} | 📦 {wh.current_load}/{wh.capacity} ({wh.get_capacity_pct():.0f}%)"
+        if wh.is_full():
+            text += " - Đã đầy"
 
         item = QListWidgetItem(text)
         item.setData(Qt.ItemDataRole.UserRole, wh.id)
+        if wh.is_full():
+            item.setFlags(item.flags() & ~Qt.ItemFlag.ItemIsEnabled)
         self.list_warehouses.addItem(item)
 
     def filter_warehouses(self, search_text):
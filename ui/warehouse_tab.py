@@ -4,10 +4,12 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                               QHeaderView, QFormLayout, QMessageBox, QMenu)
 from PyQt6.QtCore import Qt
 from services.warehouse_service import WarehouseService
+from database.unit_of_work import unit_of_work
 from ui.base_dialog import BaseDialog
 from ui.constants import (BUTTON_STYLE_GREEN,
                           BUTTON_STYLE_GRAY, TABLE_STYLE,
-                          HEADER_STYLE_LARGE, FOOTER_STYLE)
+                          HEADER_STYLE_LARGE, FOOTER_STYLE,
+                          ITEM_TYPE_REVERSE_MAP)
 
 
 
@@ -155,7 +157,9 @@ class WarehouseTab(QWidget):
 
     def load_warehouses(self):
         """Load all warehouses into table."""
-        warehouses = self.service.get_all_warehouses()
+        with unit_of_work("warehouses.load"):
+            warehouses = self.service.get_all_warehouses()
+            all_stats = self.service.get_all_warehouse_stats()
 
         self.table.setRowCount(0)
         for row_idx, wh in enumerate(warehouses):
@@ -183,10 +187,15 @@ class WarehouseTab(QWidget):
             self.table.setItem(row_idx, 3, capacity_item)
 
             # Current orders
-            stats = self.service.get_warehouse_stats(wh.id)
+            stats = all_stats.get(wh.id)
             order_count = stats['order_count'] if stats else 0
             order_item = QTableWidgetItem(str(order_count))
             order_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+            if stats and stats['item_types']:
+                order_item.setToolTip("\n".join(
+                    f"{ITEM_TYPE_REVERSE_MAP.get(item_type, item_type)}: {count}"
+                    for item_type, count in sorted(stats['item_types'].items())
+                ))
             self.table.setItem(row_idx, 4, order_item)
 
             # Status